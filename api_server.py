@@ -1,21 +1,41 @@
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, request, jsonify, send_file, send_from_directory, Response, stream_with_context
 from flask_cors import CORS
+import asyncio
+import math
 import os
 import json
 import subprocess
 import tempfile
+import threading
 import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-import threading
 import shutil
 import re
+from datetime import datetime
 
 # Import the scraper modules
-from youtube_scraper import run_youtube_scraper, process_youtube_data, create_output_folder, save_data
-from instagram_scraper import run_instagram_scraper, create_output_folder as create_instagram_output_folder, save_data as save_instagram_data, process_instagram_data
+from youtube_scraper import stream_youtube_data, stream_youtube_batch, extract_channel_handle, process_youtube_data
+from instagram_scraper import stream_instagram_data, stream_instagram_batch, create_output_folder as create_instagram_output_folder, process_instagram_data
 
 # Import configuration
 from config import APIFY_API_TOKEN, YOUTUBE_DATA_DIR, INSTAGRAM_DATA_DIR, API_PORT, DEBUG_MODE
+from config import SCRAPE_WORKERS, SCRAPE_QUEUE_DEPTH, SCRAPE_ESTIMATED_JOB_SECONDS, TASK_DB_PATH
+from config import YOUTUBE_CACHE_TTL, INSTAGRAM_CACHE_TTL, PARTIAL_RESULTS_DIR
+from config import TASK_EVENTS_POLL_INTERVAL, TASK_EVENTS_MAX_SECONDS, TASK_LONG_POLL_MAX_WAIT
+from config import TASK_WAIT_MAX_CLIENTS, TASK_WAIT_RETRY_AFTER
+from config import BATCH_MAX_ACCOUNTS, BATCH_ACTOR_RUNS, DATASET_CACHE_MAX_BYTES, DELTA_SCRAPES
+
+from data_store import load_manifest, is_dataset_file
+from dataset_cache import DatasetCache, DatasetIndex, dataset_etag, SORT_DIRECTIONS
+from summaries import load_summary
+from snapshot_store import get_snapshot_store
+from delta import DeltaBase
+from records import as_dict
+from http_client import pool_stats
+from task_queue import ScrapeQueue, QueueFullError
+from task_store import TaskStore, new_task_id
 
 app = Flask(__name__, static_folder='data')
 CORS(app)  # Enable CORS for all routes
@@ -25,18 +45,165 @@ os.makedirs(YOUTUBE_DATA_DIR, exist_ok=True)
 os.makedirs(INSTAGRAM_DATA_DIR, exist_ok=True)
 os.makedirs('data/youtube', exist_ok=True)
 os.makedirs('data/instagram', exist_ok=True)
+os.makedirs(PARTIAL_RESULTS_DIR, exist_ok=True)
+
+# Task registry shared by all server processes
+tasks = TaskStore(TASK_DB_PATH)
+stale_task_count = tasks.fail_stale_tasks()
+if stale_task_count:
+    print(f"⚠️ Marked {stale_task_count} tasks of stopped server processes as failed")
+
+# Parsed datasets and their sort orders, for paged queries on /api/data/<path>
+dataset_cache = DatasetCache(DATASET_CACHE_MAX_BYTES)
+
+# Deletes superseded dataset folders off the scrape path
+prune_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='prune')
+
+# Event streams and long polls sleep on a server thread, so only this many may wait at once
+task_wait_slots = threading.BoundedSemaphore(TASK_WAIT_MAX_CLIENTS)
+
+# Bounded job queue shared by all scrape endpoints, jobs run on one background event loop
+scrape_queue = ScrapeQueue(SCRAPE_WORKERS, SCRAPE_QUEUE_DEPTH, SCRAPE_ESTIMATED_JOB_SECONDS)
+
+def enqueue_scrape(task_id, job, message, scrape_key):
+    """
+    Queue a scrape job and build the HTTP response for it
+    
+    Identical scrapes that are already queued or running are coalesced: the
+    caller gets the existing task_id instead of a new actor run.
+    
+    Args:
+        task_id (str): The task identifier
+        job (callable): The scrape coroutine function to run
+        message (str): Human readable description of the job
+        scrape_key (str): Normalized identity of the scrape target
+    
+    Returns:
+        tuple: Flask response and status code
+    """
+    # Record the task before submitting so a fast worker cannot be overwritten
+    tasks[task_id] = {
+        'status': 'queued',
+        'message': message
+    }
+    
+    owner_id = tasks.claim_inflight(scrape_key, task_id)
+    if owner_id:
+        tasks.pop(task_id, None)
+        owner = tasks.get(owner_id, {})
+        print(f"Joining in-flight scrape {owner_id} for {scrape_key}")
+        return jsonify({
+            'task_id': owner_id,
+            'status': owner.get('status', 'queued'),
+            'message': owner.get('message', message),
+            'deduplicated': True
+        }), 202
+    
+    async def run_job():
+        try:
+            await job()
+        finally:
+            tasks.release_inflight(scrape_key, task_id)
+            remove_partial_results(task_id)
+    
+    try:
+        queue_info = scrape_queue.submit(task_id, run_job)
+    except QueueFullError as e:
+        tasks.pop(task_id, None)
+        tasks.release_inflight(scrape_key, task_id)
+        response = jsonify({
+            'error': 'Too many scrape requests in progress, please try again later',
+            'retry_after': e.retry_after
+        })
+        response.headers['Retry-After'] = str(e.retry_after)
+        return response, 429
+    
+    # Keep the enqueue-time estimate on the record for workers that do not own the queue
+    tasks.update(task_id, queue_info, expected_status='queued')
+    
+    return jsonify({
+        'task_id': task_id,
+        'status': 'queued',
+        'message': message,
+        **queue_info
+    }), 202
+
+def partial_results_path(task_id):
+    """Path of the JSON lines file that collects a running task's items."""
+    return os.path.join(PARTIAL_RESULTS_DIR, f"{task_id}.jsonl")
+
+def make_progress_recorder(task_id, process_items):
+    """
+    Build an on_progress callback for the scrapers
+    
+    New items are processed, appended to the task's partial results file and
+    the item count and percent-of-limit are written to the task record. The
+    callback blocks on disk and SQLite, so DatasetProgress runs it in a worker
+    thread rather than on the scrape event loop.
+    
+    Args:
+        task_id (str): The task identifier
+        process_items (callable): Turns a list of raw items into processed items
+    
+    Returns:
+        callable: Callback taking (new_items, item_count, percent)
+    """
+    path = partial_results_path(task_id)
+    
+    def record_progress(new_items, item_count, percent):
+        with open(path, 'a', encoding='utf-8') as f:
+            for item in process_items(new_items):
+                f.write(json.dumps(as_dict(item), ensure_ascii=False) + "\n")
+        tasks.update(task_id, {
+            'progress': {'item_count': item_count, 'percent': percent}
+        }, expected_status='running')
+    
+    return record_progress
 
-# In-memory cache for running tasks
-tasks = {}
+def read_partial_results(task_id, offset=0):
+    """Read the items collected so far for a task, starting at offset."""
+    path = partial_results_path(task_id)
+    items = []
+    if not os.path.exists(path):
+        return items
+    with open(path, 'r', encoding='utf-8') as f:
+        for index, line in enumerate(f):
+            if index < offset:
+                continue
+            try:
+                items.append(json.loads(line))
+            except ValueError:
+                # The last line may still be in the middle of being written
+                break
+    return items
+
+def remove_partial_results(task_id):
+    """Delete a task's partial results once the final dataset is saved."""
+    try:
+        os.remove(partial_results_path(task_id))
+    except OSError:
+        pass
+
+def youtube_scrape_key(url_or_query):
+    """Normalize a YouTube URL or query so equivalent requests share one scrape."""
+    channel_handle = extract_channel_handle(url_or_query)
+    if channel_handle:
+        return f"youtube:@{channel_handle.lower()}"
+    return f"youtube:{url_or_query.strip().rstrip('/').lower()}"
+
+def instagram_scrape_key(username):
+    """Normalize an Instagram username so equivalent requests share one scrape."""
+    return f"instagram:{username.strip().lstrip('@').lower()}"
 
 # Function to delete previous data files for the same account
-def delete_previous_data(directory, account_name):
+def delete_previous_data(directory, account_name, keep_folder=None):
     """
     Delete previous data folders for a specific account
     
     Args:
         directory (str): The base directory (YOUTUBE_DATA_DIR or INSTAGRAM_DATA_DIR)
         account_name (str): The channel name or username to match
+        keep_folder (str): Folder to keep, usually the one that was just saved
     
     Returns:
         int: Number of folders deleted
@@ -52,6 +219,8 @@ def delete_previous_data(directory, account_name):
         
         for item in os.listdir(directory):
             folder_path = os.path.join(directory, item)
+            if keep_folder and os.path.normpath(folder_path) == os.path.normpath(keep_folder):
+                continue
             if os.path.isdir(folder_path) and pattern.match(item):
                 print(f"Deleting previous data folder: {folder_path}")
                 shutil.rmtree(folder_path, ignore_errors=True)
@@ -61,9 +230,154 @@ def delete_previous_data(directory, account_name):
     
     return deleted_count
 
+def schedule_prune(directory, account_name, keep_folder):
+    """
+    Delete older data folders of an account on the prune thread
+    
+    The scrape job does not wait for the deletion. Every saved dataset is
+    recorded in the snapshot store, so pruning folders loses no history.
+    """
+    def prune():
+        deleted_count = delete_previous_data(directory, account_name, keep_folder=keep_folder)
+        if deleted_count > 0:
+            print(f"Deleted {deleted_count} previous data folder(s) for {account_name}")
+    
+    prune_executor.submit(prune)
+
+def find_fresh_data(directory, account_name, max_age):
+    """
+    Find the newest saved dataset for an account if it is younger than max_age
+    
+    Args:
+        directory (str): The base directory (YOUTUBE_DATA_DIR or INSTAGRAM_DATA_DIR)
+        account_name (str): The channel name or username to match (case-insensitive)
+        max_age (int): Maximum age in seconds for the data to count as fresh
+    
+    Returns:
+        tuple: (json_path, age_in_seconds) or (None, None) if nothing fresh exists
+    """
+    if not max_age or not os.path.exists(directory):
+        return None, None
+    
+    pattern = re.compile(f"^{re.escape(account_name)}_(\\d{{4}}-\\d{{2}}-\\d{{2}}_\\d{{2}}-\\d{{2}}-\\d{{2}})$", re.IGNORECASE)
+    folders = []
+    for item in os.listdir(directory):
+        match = pattern.match(item)
+        if match:
+            folders.append((datetime.strptime(match.group(1), "%Y-%m-%d_%H-%M-%S"), item))
+    
+    # Newest first; folders still being written or left empty by a delta scrape have no dataset yet
+    now = datetime.now()
+    for created, item in sorted(folders, reverse=True):
+        age = (now - created).total_seconds()
+        if age > max_age:
+            break
+        folder_path = os.path.join(directory, item)
+        json_files = [f for f in os.listdir(folder_path) if is_dataset_file(f)]
+        if json_files:
+            return os.path.join(folder_path, json_files[0]), age
+    
+    return None, None
+
+def manifest_item_count(json_path):
+    """Item count the dataset manifest records for json_path, or None if it has no entry for it."""
+    directory = os.path.dirname(os.path.dirname(json_path))
+    wanted = os.path.normpath(json_path)
+    for entry in load_manifest(directory)['datasets'].values():
+        if os.path.normpath(entry.get('file_path') or '') == wanted:
+            return entry.get('item_count')
+    return None
+
+def cached_task_record(json_path, age, message, data):
+    """
+    Build a completed task record from a fresh dataset already on disk
+    
+    The item count comes from the dataset manifest, so the dataset itself is
+    never opened.
+    
+    Args:
+        json_path (str): Path of the cached JSON dataset
+        age (float): Age of the cached dataset in seconds
+        message (str): Human readable result message
+        data (dict): Platform specific result fields
+    
+    Returns:
+        dict: The task record, or None if the manifest does not list the dataset
+    """
+    item_count = manifest_item_count(json_path)
+    if item_count is None:
+        print(f"No manifest entry for cached data {json_path}")
+        return None
+    
+    print(f"✅ Served {json_path} from cache ({int(age)}s old)")
+    return {
+        'status': 'completed',
+        'message': message,
+        'data': {
+            **data,
+            'item_count': item_count,
+            'file_path': os.path.relpath(json_path),
+            'cached': True,
+            'cache_age_seconds': int(age)
+        }
+    }
+
+def complete_from_cache(task_id, json_path, age, message, data):
+    """
+    Record a task that is answered from a fresh dataset already on disk
+    
+    Returns:
+        tuple: Flask response and status code, or None if the manifest does not list the dataset
+    """
+    task = cached_task_record(json_path, age, message, data)
+    if task is None:
+        return None
+    tasks[task_id] = task
+    return jsonify({'task_id': task_id, **task}), 200
+
+def request_flag(data, name, default=False):
+    """Read a boolean flag from a scrape request body or query string."""
+    value = data.get(name, request.args.get(name, default))
+    if isinstance(value, str):
+        return value.lower() in ('1', 'true', 'yes')
+    return bool(value)
+
+def is_force_refresh(data):
+    """Check the force flag in a scrape request body or query string."""
+    return request_flag(data, 'force')
+
+def is_delta_scrape(data):
+    """Check the delta flag (scrape only items newer than the stored dataset), defaulting to DELTA_SCRAPES."""
+    return request_flag(data, 'delta', DELTA_SCRAPES)
+
+def load_delta_base(platform, account):
+    """
+    Load the current dataset of an account as the base of a delta scrape
+    
+    Returns:
+        DeltaBase: The stored dataset, or None if the account has no usable dataset yet
+    """
+    entry = find_manifest_entry(platform, account)
+    if entry is None or not os.path.isfile(entry['file_path']):
+        print(f"No stored dataset for {account}, running a full scrape")
+        return None
+    return DeltaBase.load(platform, entry['file_path'])
+
+def scrape_result_message(label, name, result):
+    """Completion message of a scrape, mentioning the new items of a delta scrape."""
+    if 'new_item_count' in result:
+        return f"Added {result['new_item_count']} new {label} item(s) for {name}"
+    return f'Successfully scraped {label} data for {name}'
+
 @app.route('/api/health', methods=['GET'])
 def health_check():
-    return jsonify({'status': 'ok', 'message': 'API server is running'})
+    return jsonify({
+        'status': 'ok',
+        'message': 'API server is running',
+        'queue': scrape_queue.stats(),
+        'http_pool': pool_stats(),
+        'dataset_cache': dataset_cache.stats()
+    })
 
 @app.route('/api/scrape/youtube', methods=['POST'])
 def scrape_youtube():
@@ -74,26 +388,48 @@ def scrape_youtube():
         return jsonify({'error': 'Missing URL or query parameter'}), 400
     
     # Generate a unique task ID
-    task_id = f"youtube_{int(time.time())}"
+    task_id = new_task_id("youtube")
+    
+    # Answer from a recent scrape of the same channel unless a refresh is forced
+    cached_handle = extract_channel_handle(url_or_query)
+    if cached_handle and not is_force_refresh(data):
+        json_path, age = find_fresh_data(YOUTUBE_DATA_DIR, cached_handle, YOUTUBE_CACHE_TTL)
+        if json_path:
+            response = complete_from_cache(
+                task_id, json_path, age,
+                f'Loaded recent YouTube data for {cached_handle}',
+                {'channel_name': cached_handle}
+            )
+            if response:
+                return response
+    
+    delta = is_delta_scrape(data)
     
-    # Start scraping in a background thread
-    def run_scraper():
+    # Scrape on the background event loop
+    async def run_scraper():
         try:
             print(f"🔄 Starting YouTube scraper for: {url_or_query}")
+            tasks[task_id] = {
+                'status': 'running',
+                'message': f'Started YouTube scraping for: {url_or_query}'
+            }
             
             # Try to extract channel handle from URL if it's a channel URL
-            channel_handle = None
-            if "youtube.com/" in url_or_query and "@" in url_or_query:
-                handle_match = re.search(r'youtube\.com/(@[^/\s?]+)', url_or_query)
-                if handle_match:
-                    channel_handle = handle_match.group(1)
-                    channel_handle = channel_handle[1:] if channel_handle.startswith('@') else channel_handle
-                    print(f"Detected channel handle from URL: {channel_handle}")
+            channel_handle = extract_channel_handle(url_or_query)
+            if channel_handle:
+                print(f"Detected channel handle from URL: {channel_handle}")
             
-            # Run the scraper to get raw data
-            raw_data = run_youtube_scraper(APIFY_API_TOKEN, url_or_query)
+            # Delta scrapes need a channel whose stored dataset the new videos are merged into
+            delta_base = None
+            if delta and channel_handle:
+                delta_base = await asyncio.to_thread(load_delta_base, 'youtube', channel_handle)
             
-            if not raw_data:
+            # Run the scraper, processing and saving the dataset page by page
+            run_info = {}
+            on_progress = make_progress_recorder(task_id, lambda items: process_youtube_data(items)[0])
+            result = await stream_youtube_data(APIFY_API_TOKEN, url_or_query, run_info, channel_handle, on_progress, delta_base)
+            
+            if result is None:
                 tasks[task_id] = {
                     'status': 'error',
                     'message': 'Failed to retrieve YouTube data',
@@ -101,48 +437,37 @@ def scrape_youtube():
                 }
                 return
             
-            if len(raw_data) == 0:
+            if result['item_count'] == 0:
                 tasks[task_id] = {
                     'status': 'completed',
                     'message': 'YouTube scraper completed but found no data',
                     'data': {
                         'item_count': 0,
-                        'error_message': 'No data items were found for the provided URL/query'
+                        'error_message': 'No data items were found for the provided URL/query',
+                        **run_info
                     }
                 }
                 return
             
-            # Process data into standardized format and get channel name
-            processed_data, channel_name = process_youtube_data(raw_data)
-            
-            # If we detected a channel handle from the URL, prioritize that name
-            if channel_handle and channel_handle not in channel_name:
-                print(f"Prioritizing detected channel handle '{channel_handle}' for folder name")
-                channel_name = channel_handle
+            channel_name = result['channel_name']
+            json_file = result['json_path']
             
-            # Delete previous data for the same channel
-            deleted_count = delete_previous_data(YOUTUBE_DATA_DIR, channel_name)
-            if deleted_count > 0:
-                print(f"Deleted {deleted_count} previous data folder(s) for {channel_name}")
-            
-            # Create output folder
-            output_folder = create_output_folder(channel_name)
-            
-            # Save the processed data
-            saved_files = save_data(processed_data, output_folder, channel_name, ["json"])
+            # Older folders of the channel are superseded, their metrics are kept in the snapshot store
+            schedule_prune(YOUTUBE_DATA_DIR, channel_name, keep_folder=os.path.dirname(json_file))
             
             # Update task status
-            json_file = saved_files.get("json")
-            relative_path = os.path.relpath(json_file) if json_file else None
+            relative_path = os.path.relpath(json_file)
             
             tasks[task_id] = {
                 'status': 'completed',
-                'message': f'Successfully scraped YouTube data for {channel_name}',
+                'message': scrape_result_message('YouTube', channel_name, result),
                 'data': {
                     'channel_name': channel_name,
-                    'item_count': len(processed_data),
+                    'item_count': result['item_count'],
                     'file_path': relative_path,
-                    'previous_data_deleted': deleted_count
+                    'delta': delta_base is not None,
+                    'new_item_count': result.get('new_item_count'),
+                    **run_info
                 }
             }
         except Exception as e:
@@ -157,22 +482,7 @@ def scrape_youtube():
                 'details': error_details
             }
     
-    # Start the thread
-    thread = threading.Thread(target=run_scraper)
-    thread.daemon = True
-    thread.start()
-    
-    # Initialize task status
-    tasks[task_id] = {
-        'status': 'running',
-        'message': f'Started YouTube scraping for: {url_or_query}'
-    }
-    
-    return jsonify({
-        'task_id': task_id,
-        'status': 'running',
-        'message': f'Started YouTube scraping for: {url_or_query}'
-    })
+    return enqueue_scrape(task_id, run_scraper, f'Queued YouTube scraping for: {url_or_query}', youtube_scrape_key(url_or_query))
 
 @app.route('/api/scrape/instagram', methods=['POST'])
 def scrape_instagram():
@@ -183,25 +493,44 @@ def scrape_instagram():
         return jsonify({'error': 'Missing username parameter'}), 400
     
     # Generate a unique task ID
-    task_id = f"instagram_{int(time.time())}"
+    task_id = new_task_id("instagram")
+    
+    # Answer from a recent scrape of the same account unless a refresh is forced
+    if not is_force_refresh(data):
+        json_path, age = find_fresh_data(INSTAGRAM_DATA_DIR, username, INSTAGRAM_CACHE_TTL)
+        if json_path:
+            response = complete_from_cache(
+                task_id, json_path, age,
+                f'Loaded recent Instagram data for {username}',
+                {'username': username}
+            )
+            if response:
+                return response
     
-    # Start scraping in a background thread
-    def run_scraper():
+    delta = is_delta_scrape(data)
+    
+    # Scrape on the background event loop
+    async def run_scraper():
         try:
             print(f"🔄 Starting Instagram scraper for: {username}")
-            
-            # Delete previous data for the same username
-            deleted_count = delete_previous_data(INSTAGRAM_DATA_DIR, username)
-            if deleted_count > 0:
-                print(f"Deleted {deleted_count} previous data folder(s) for {username}")
+            tasks[task_id] = {
+                'status': 'running',
+                'message': f'Started Instagram scraping for: {username}'
+            }
             
             # Create output folder
             output_folder = create_instagram_output_folder(username)
             
-            # Run the scraper
-            data = run_instagram_scraper(APIFY_API_TOKEN, username)
+            delta_base = None
+            if delta:
+                delta_base = await asyncio.to_thread(load_delta_base, 'instagram', username)
             
-            if not data:
+            # Run the scraper, processing and saving the dataset page by page
+            run_info = {}
+            on_progress = make_progress_recorder(task_id, lambda items: process_instagram_data(items, username))
+            result = await stream_instagram_data(APIFY_API_TOKEN, username, output_folder, run_info, on_progress, delta_base)
+            
+            if result is None:
                 tasks[task_id] = {
                     'status': 'error',
                     'message': f'Failed to retrieve Instagram data for {username}',
@@ -209,43 +538,40 @@ def scrape_instagram():
                 }
                 return
                 
-            if len(data) == 0:
+            if result['item_count'] == 0:
                 tasks[task_id] = {
                     'status': 'completed',
                     'message': f'Instagram scraper completed but found no data for {username}',
                     'data': {
                         'username': username,
                         'item_count': 0,
-                        'error_message': 'No data items were found for the provided username'
+                        'error_message': 'No data items were found for the provided username',
+                        **run_info
                     }
                 }
                 return
             
-            # Check for request error messages
-            error_messages = []
-            if isinstance(data[0], dict) and 'requestErrorMessages' in data[0]:
-                error_messages = data[0]['requestErrorMessages']
-            
-            # Process the data
-            processed_data = process_instagram_data(data, username)
+            error_messages = result['error_messages']
             
-            # Save the data
-            saved_files = save_instagram_data(processed_data, output_folder, username, ["json"])
+            # Older folders of the account are superseded, their metrics are kept in the snapshot store.
+            # A delta scrape without new posts keeps the stored dataset instead of output_folder.
+            schedule_prune(INSTAGRAM_DATA_DIR, username, keep_folder=os.path.dirname(result['json_path']))
             
             # Update task status
-            json_file = saved_files.get("json")
-            relative_path = os.path.relpath(json_file) if json_file else None
+            relative_path = os.path.relpath(result['json_path'])
             
             tasks[task_id] = {
                 'status': 'completed',
-                'message': f'Successfully scraped Instagram data for {username}',
+                'message': scrape_result_message('Instagram', username, result),
                 'data': {
                     'username': username,
-                    'item_count': len(processed_data),
+                    'item_count': result['item_count'],
                     'file_path': relative_path,
-                    'previous_data_deleted': deleted_count,
+                    'delta': delta_base is not None,
+                    'new_item_count': result.get('new_item_count'),
                     'had_errors': len(error_messages) > 0,
-                    'error_count': len(error_messages)
+                    'error_count': len(error_messages),
+                    **run_info
                 }
             }
         except Exception as e:
@@ -260,31 +586,533 @@ def scrape_instagram():
                 'details': error_details
             }
     
-    # Start the thread
-    thread = threading.Thread(target=run_scraper)
-    thread.daemon = True
-    thread.start()
+    return enqueue_scrape(task_id, run_scraper, f'Queued Instagram scraping for: {username}', instagram_scrape_key(username))
+
+INSTAGRAM_USERNAME_PATTERN = re.compile(r'^[A-Za-z0-9._]+$')
+
+def parse_batch_account(entry):
+    """
+    Work out the platform and account of one batch entry
     
-    # Initialize task status
-    tasks[task_id] = {
-        'status': 'running',
-        'message': f'Started Instagram scraping for: {username}'
+    Entries are YouTube channel URLs, Instagram usernames, or objects with
+    'platform' and 'account'. Batches split the dataset by channel handle, so
+    YouTube entries must be channel URLs that contain an @handle.
+    
+    Returns:
+        tuple: (platform, account), or (None, None) if the entry cannot be batched
+    """
+    if isinstance(entry, dict):
+        platform = str(entry.get('platform', '')).lower()
+        account = entry.get('account')
+    else:
+        platform = None
+        account = entry
+    
+    if not isinstance(account, str) or not account.strip():
+        return None, None
+    account = account.strip()
+    
+    if platform is None:
+        platform = 'youtube' if ('youtube.com' in account or 'youtu.be' in account) else 'instagram'
+    
+    if platform == 'youtube' and extract_channel_handle(account):
+        return 'youtube', account
+    if platform == 'instagram' and INSTAGRAM_USERNAME_PATTERN.match(account.lstrip('@')):
+        return 'instagram', account.lstrip('@')
+    return None, None
+
+def split_into_groups(items, max_groups):
+    """Split items into at most max_groups groups of nearly equal size, keeping their order."""
+    if not items:
+        return []
+    size = math.ceil(len(items) / max_groups)
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+async def finish_batch_child(platform, name, result, run_info):
+    """Build the final task record of one account scraped as part of a batch."""
+    label = 'YouTube' if platform == 'youtube' else 'Instagram'
+    name_field = 'channel_name' if platform == 'youtube' else 'username'
+    
+    if result is None:
+        return {
+            'status': 'error',
+            'message': f'Failed to retrieve {label} data for {name}',
+            'details': 'No data was returned from the batch actor run.'
+        }
+    
+    if result['item_count'] == 0:
+        return {
+            'status': 'completed',
+            'message': f'{label} scraper completed but found no data for {name}',
+            'data': {
+                name_field: name,
+                'item_count': 0,
+                'error_message': 'No data items were found for this account',
+                **run_info
+            }
+        }
+    
+    directory = YOUTUBE_DATA_DIR if platform == 'youtube' else INSTAGRAM_DATA_DIR
+    json_path = result['json_path']
+    schedule_prune(directory, name, keep_folder=os.path.dirname(json_path))
+    
+    data = {
+        name_field: name,
+        'item_count': result['item_count'],
+        'file_path': os.path.relpath(json_path),
+        **run_info
     }
+    if platform == 'instagram':
+        data['had_errors'] = len(result['error_messages']) > 0
+        data['error_count'] = len(result['error_messages'])
     
-    return jsonify({
-        'task_id': task_id,
-        'status': 'running',
-        'message': f'Started Instagram scraping for: {username}'
+    return {
+        'status': 'completed',
+        'message': f'Successfully scraped {label} data for {name}',
+        'data': data
+    }
+
+def make_batch_job(parent_id, platform, group):
+    """
+    Build the scrape job for one multi-account actor run of a batch
+    
+    Args:
+        parent_id (str): The batch task
+        platform (str): 'youtube' or 'instagram'
+        group (list): (child_id, account, name, scrape_key) tuples covered by the run
+    
+    Returns:
+        callable: Coroutine function for the scrape queue
+    """
+    async def run_group():
+        run_info = {}
+        try:
+            tasks.update(parent_id, {'status': 'running'}, expected_status='queued')
+            for child_id, _, name, _ in group:
+                tasks.update(child_id, {'status': 'running', 'message': f'Started {platform} scraping for: {name}'})
+            
+            if platform == 'youtube':
+                results = await stream_youtube_batch(APIFY_API_TOKEN, [account for _, account, _, _ in group], run_info)
+            else:
+                results = await stream_instagram_batch(APIFY_API_TOKEN, [name for _, _, name, _ in group], run_info)
+            
+            for child_id, _, name, _ in group:
+                result = results.get(name) if results is not None else None
+                record = await finish_batch_child(platform, name, result, run_info)
+                tasks[child_id] = {**record, 'parent_id': parent_id}
+        except Exception as e:
+            import traceback
+            error_details = traceback.format_exc()
+            print(f"❌ Error in batch scrape {parent_id}: {str(e)}")
+            print(error_details)
+            
+            for child_id, _, _, _ in group:
+                if tasks.get(child_id, {}).get('status') in ('queued', 'running'):
+                    tasks[child_id] = {
+                        'status': 'error',
+                        'message': f'Error: {str(e)}',
+                        'details': error_details,
+                        'parent_id': parent_id
+                    }
+        finally:
+            for child_id, _, _, scrape_key in group:
+                tasks.release_inflight(scrape_key, child_id)
+            
+            # Recording the run also bumps the batch version for event streams
+            parent = tasks.get(parent_id, {})
+            runs = parent.get('runs', []) + [{'platform': platform, 'accounts': len(group), **run_info}]
+            tasks.update(parent_id, {'runs': runs})
+            refresh_batch_status(parent_id)
+    
+    return run_group
+
+def refresh_batch_status(parent_id, parent=None):
+    """
+    Attach live child statuses to a batch task and complete it once every child is done
+    
+    Args:
+        parent_id (str): The batch task
+        parent (dict): The batch record if already loaded
+    
+    Returns:
+        dict: The batch record with child statuses, or None if it does not exist
+    """
+    if parent is None:
+        parent = tasks.get(parent_id)
+        if parent is None:
+            return None
+    
+    children = []
+    counts = {}
+    for child in parent.get('children', []):
+        record = tasks.get(child['task_id'], {})
+        status = record.get('status', 'unknown')
+        entry = {**child, 'status': status, 'message': record.get('message')}
+        if record.get('data'):
+            entry['item_count'] = record['data'].get('item_count')
+            entry['file_path'] = record['data'].get('file_path')
+        children.append(entry)
+        counts[status] = counts.get(status, 0) + 1
+    
+    unfinished = counts.get('queued', 0) + counts.get('running', 0)
+    if parent.get('status') in ('queued', 'running') and unfinished == 0:
+        message = f"Batch finished: {counts.get('completed', 0)} completed, {len(children) - counts.get('completed', 0)} failed"
+        if tasks.update(parent_id, {'status': 'completed', 'message': message}, expected_status=parent['status']):
+            parent = {**parent, 'status': 'completed', 'message': message}
+    
+    return {**parent, 'children': children, 'child_counts': counts}
+
+@app.route('/api/scrape/batch', methods=['POST'])
+def scrape_batch():
+    """
+    Scrape many YouTube channels and Instagram accounts with a few actor runs
+    
+    Body: {"accounts": [...], "force": false}. The accounts of each platform
+    are split into at most BATCH_ACTOR_RUNS multi-URL actor runs and the
+    datasets are split back into one folder per account. Every account gets
+    a child task; the returned batch task reports all of them.
+    """
+    data = request.json or {}
+    entries = data.get('accounts')
+    
+    if not isinstance(entries, list) or not entries:
+        return jsonify({'error': 'Missing accounts list'}), 400
+    if len(entries) > BATCH_MAX_ACCOUNTS:
+        return jsonify({'error': f'A batch can contain at most {BATCH_MAX_ACCOUNTS} accounts'}), 400
+    
+    parsed = []
+    invalid = []
+    for entry in entries:
+        platform, account = parse_batch_account(entry)
+        if platform is None:
+            invalid.append(entry)
+        else:
+            parsed.append((platform, account))
+    if invalid:
+        return jsonify({
+            'error': 'Batch entries must be YouTube channel URLs with an @handle or Instagram usernames',
+            'invalid': invalid
+        }), 400
+    
+    force = is_force_refresh(data)
+    parent_id = new_task_id("batch")
+    tasks[parent_id] = {
+        'status': 'queued',
+        'message': f'Queued batch scrape of {len(parsed)} accounts',
+        'children': []
+    }
+    
+    children = []
+    to_scrape = {'youtube': [], 'instagram': []}
+    for platform, account in parsed:
+        child_id = new_task_id(platform)
+        if platform == 'youtube':
+            name = extract_channel_handle(account)
+            directory, ttl, scrape_key = YOUTUBE_DATA_DIR, YOUTUBE_CACHE_TTL, youtube_scrape_key(account)
+            cache_message, cache_data = f'Loaded recent YouTube data for {name}', {'channel_name': name}
+        else:
+            name = account
+            directory, ttl, scrape_key = INSTAGRAM_DATA_DIR, INSTAGRAM_CACHE_TTL, instagram_scrape_key(account)
+            cache_message, cache_data = f'Loaded recent Instagram data for {name}', {'username': name}
+        child = {'task_id': child_id, 'platform': platform, 'account': name}
+        
+        # Answer from a recent scrape of the same account unless a refresh is forced
+        if not force:
+            json_path, age = find_fresh_data(directory, name, ttl)
+            if json_path:
+                record = cached_task_record(json_path, age, cache_message, cache_data)
+                if record:
+                    tasks[child_id] = {**record, 'parent_id': parent_id}
+                    children.append(child)
+                    continue
+        
+        tasks[child_id] = {'status': 'queued', 'message': f'Queued {platform} scraping for: {name}', 'parent_id': parent_id}
+        owner_id = tasks.claim_inflight(scrape_key, child_id)
+        if owner_id:
+            # Already being scraped (possibly earlier in this batch), report that task instead
+            tasks.pop(child_id, None)
+            children.append({**child, 'task_id': owner_id, 'deduplicated': True})
+            continue
+        
+        children.append(child)
+        to_scrape[platform].append((child_id, account, name, scrape_key))
+    
+    actor_runs = 0
+    retry_after = None
+    for platform, accounts in to_scrape.items():
+        for index, group in enumerate(split_into_groups(accounts, BATCH_ACTOR_RUNS)):
+            try:
+                scrape_queue.submit(f"{parent_id}:{platform}:{index}", make_batch_job(parent_id, platform, group))
+                actor_runs += 1
+            except QueueFullError as e:
+                retry_after = e.retry_after
+                for child_id, _, name, scrape_key in group:
+                    tasks[child_id] = {
+                        'status': 'error',
+                        'message': 'Too many scrape requests in progress, please try again later',
+                        'retry_after': e.retry_after,
+                        'parent_id': parent_id
+                    }
+                    tasks.release_inflight(scrape_key, child_id)
+    
+    tasks.update(parent_id, {'children': children, 'actor_runs': actor_runs})
+    batch = refresh_batch_status(parent_id)
+    
+    if actor_runs == 0 and retry_after is not None:
+        response = jsonify({'task_id': parent_id, **batch, 'retry_after': retry_after})
+        response.headers['Retry-After'] = str(retry_after)
+        return response, 429
+    
+    status_code = 202 if batch['status'] in ('queued', 'running') else 200
+    return jsonify({'task_id': parent_id, **batch}), status_code
+
+def with_queue_info(task_id, task):
+    """Add the live queue position and ETA to a queued or running task record."""
+    # Queue position and ETA change as other jobs finish, so compute them on read
+    if task.get('status') in ('queued', 'running'):
+        queue_info = scrape_queue.estimate(task_id)
+        if queue_info:
+            task = {**task, **queue_info}
+    return task
+
+def too_many_waiters():
+    """503 response telling a stream or long-poll client to come back later."""
+    response = jsonify({
+        'error': 'Too many clients are waiting for task updates, try again shortly',
+        'retry_after': TASK_WAIT_RETRY_AFTER
     })
+    response.headers['Retry-After'] = str(TASK_WAIT_RETRY_AFTER)
+    return response, 503
+
+def wait_for_task_change(task_id, since_version, timeout):
+    """
+    Block until a task's version differs from since_version or timeout passes
+    
+    Returns:
+        tuple: (record, version), or (None, None) if the task does not exist
+    """
+    deadline = time.time() + timeout
+    task, version = tasks.get_versioned(task_id)
+    while task and version == since_version and task.get('status') in ('queued', 'running') and time.time() < deadline:
+        time.sleep(TASK_EVENTS_POLL_INTERVAL)
+        task, version = tasks.get_versioned(task_id)
+    return task, version
 
 @app.route('/api/tasks/<task_id>', methods=['GET'])
 def get_task_status(task_id):
-    task = tasks.get(task_id)
+    # Long-poll fallback for clients without EventSource: ?wait=<seconds>&since=<version>
+    wait = min(request.args.get('wait', 0, type=int), TASK_LONG_POLL_MAX_WAIT)
+    since = request.args.get('since', type=int)
+    if wait > 0 and since is not None:
+        if not task_wait_slots.acquire(blocking=False):
+            return too_many_waiters()
+        try:
+            task, version = wait_for_task_change(task_id, since, wait)
+        finally:
+            task_wait_slots.release()
+    else:
+        task, version = tasks.get_versioned(task_id)
+    
     if not task:
         return jsonify({'error': 'Task not found'}), 404
     
+    if 'children' in task:
+        task = refresh_batch_status(task_id, task)
+    task = {**with_queue_info(task_id, task), 'version': version}
+    
+    # Items collected so far by a running scrape, optionally from an offset
+    if request.args.get('partial', '').lower() in ('1', 'true', 'yes'):
+        offset = request.args.get('offset', 0, type=int)
+        task = {**task, 'partial_offset': offset, 'partial_items': read_partial_results(task_id, offset)}
+    
     return jsonify(task)
 
+def format_sse(event, data, event_id=None):
+    """Format one server-sent event."""
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data, ensure_ascii=False)}")
+    return "\n".join(lines) + "\n\n"
+
+@app.route('/api/tasks/<task_id>/events', methods=['GET'])
+def task_events(task_id):
+    """
+    Stream task updates as server-sent events
+    
+    Emits 'status' when the task status changes, 'progress' when only its
+    progress changes and 'result' with the final record, after which the
+    stream closes. Streams are capped at TASK_EVENTS_MAX_SECONDS; browsers
+    reconnect automatically and Last-Event-ID avoids resending old updates.
+    Every stream holds a server thread, so at most TASK_WAIT_MAX_CLIENTS
+    streams and long polls run at once and further clients get a 503.
+    """
+    if not tasks.get(task_id):
+        return jsonify({'error': 'Task not found'}), 404
+    
+    if not task_wait_slots.acquire(blocking=False):
+        return too_many_waiters()
+    
+    last_event_id = request.headers.get('Last-Event-ID', type=int)
+    
+    def generate():
+        started = time.time()
+        last_sent = started
+        last_version = last_event_id
+        last_status = None
+        yield f"retry: {int(TASK_EVENTS_POLL_INTERVAL * 1000)}\n\n"
+        
+        while time.time() - started < TASK_EVENTS_MAX_SECONDS:
+            task, version = tasks.get_versioned(task_id)
+            if task is None:
+                yield format_sse('error', {'error': 'Task not found'})
+                return
+            if 'children' in task:
+                task = refresh_batch_status(task_id, task)
+            
+            status = task.get('status')
+            finished = status not in ('queued', 'running')
+            if version != last_version or finished:
+                if finished:
+                    event = 'result'
+                elif status != last_status:
+                    event = 'status'
+                else:
+                    event = 'progress'
+                yield format_sse(event, {**with_queue_info(task_id, task), 'task_id': task_id, 'version': version}, version)
+                last_version = version
+                last_status = status
+                last_sent = time.time()
+                if finished:
+                    return
+            elif time.time() - last_sent >= 15:
+                # Comment lines keep proxies from closing an idle connection
+                yield ": keepalive\n\n"
+                last_sent = time.time()
+            
+            time.sleep(TASK_EVENTS_POLL_INTERVAL)
+    
+    response = Response(stream_with_context(generate()), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+    # Runs when the stream ends or the client goes away
+    response.call_on_close(task_wait_slots.release)
+    return response
+
+# Precompressed siblings written at save time, in order of preference
+PRECOMPRESSED_ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+def send_dataset(path):
+    """
+    Stream a JSON dataset straight from disk
+    
+    A precompressed sibling is sent when the client accepts its encoding and
+    it is not older than the dataset. send_file handles Range requests and
+    If-None-Match/If-Modified-Since.
+    """
+    stat = os.stat(path)
+    etag = dataset_etag(stat)
+    send_path = path
+    encoding = None
+    for candidate, suffix in PRECOMPRESSED_ENCODINGS:
+        if request.accept_encodings[candidate] <= 0:
+            continue
+        try:
+            variant_stat = os.stat(path + suffix)
+        except OSError:
+            continue
+        if variant_stat.st_mtime_ns >= stat.st_mtime_ns:
+            send_path = path + suffix
+            encoding = candidate
+            break
+    
+    response = send_file(
+        os.path.abspath(send_path),
+        mimetype='application/json',
+        conditional=True,
+        # Each encoding is a different representation and needs its own ETag
+        etag=f"{etag}-{encoding}" if encoding else etag
+    )
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    # Let browsers keep the file but revalidate it on every use
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+DATA_QUERY_PARAMS = ('offset', 'limit', 'sort', 'fields')
+
+def parse_data_query():
+    """
+    Read offset, limit, sort=field:dir and fields=a,b from the query string
+    
+    Returns:
+        tuple: (query dict, error message); the query is None when no query parameter was given
+    """
+    if not any(param in request.args for param in DATA_QUERY_PARAMS):
+        return None, None
+    
+    offset = request.args.get('offset', 0, type=int)
+    limit = request.args.get('limit', type=int)
+    if offset < 0 or (limit is not None and limit < 0):
+        return None, 'offset and limit must be non-negative integers'
+    if 'limit' in request.args and limit is None:
+        return None, 'limit must be a non-negative integer'
+    
+    sort = None
+    if request.args.get('sort'):
+        field, _, direction = request.args['sort'].partition(':')
+        direction = (direction or 'asc').lower()
+        if not field or direction not in SORT_DIRECTIONS:
+            return None, 'sort must look like field:asc or field:desc'
+        sort = (field, direction)
+    
+    fields = None
+    if request.args.get('fields'):
+        fields = [field.strip() for field in request.args['fields'].split(',') if field.strip()]
+    
+    return {'offset': offset, 'limit': limit, 'sort': sort, 'fields': fields}, None
+
+def load_dataset_index(path):
+    """Parse a JSON dataset for the query cache (called on cache misses)."""
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    return DatasetIndex(data if isinstance(data, list) else None)
+
+def query_dataset(path, query):
+    """
+    Answer a paged, sorted and projected query on a JSON dataset
+    
+    The parsed dataset and its sort orders stay in the LRU cache, so repeated
+    queries only slice prebuilt index lists.
+    """
+    stat = os.stat(path)
+    # Same dataset version and same query give the same bytes
+    query_key = request.query_string.decode('utf-8', errors='replace')
+    etag = f"{dataset_etag(stat)}-q{zlib.crc32(query_key.encode('utf-8')):x}"
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
+    
+    index = dataset_cache.get(path, stat, lambda: load_dataset_index(path))
+    if index.items is None:
+        return jsonify({'error': 'Only list datasets support offset, limit, sort and fields'}), 400
+    
+    rows = index.query(**query)
+    response = jsonify({
+        'items': rows,
+        'total': len(index.items),
+        'offset': query['offset'],
+        'limit': query['limit']
+    })
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
 @app.route('/api/data/<path:filename>', methods=['GET'])
 def get_data(filename):
     # Security check to prevent directory traversal
@@ -331,32 +1159,15 @@ def get_data(filename):
     print(f"Serving file: {file} from directory: {directory}")
     
     try:
-        # Explicitly load and return JSON to ensure proper formatting
+        # JSON datasets are already valid JSON on disk, send the bytes as they are
+        # unless the client asked for a page of rows
         if file.endswith('.json'):
-            with open(path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                print(f"Successfully loaded JSON data with {len(data) if isinstance(data, list) else 'non-list'} items")
-                
-                # Add debug info about the first few items
-                if isinstance(data, list) and len(data) > 0:
-                    first_item = data[0]
-                    if isinstance(first_item, dict):
-                        keys = list(first_item.keys())
-                        print(f"First item keys: {keys[:10]}{'...' if len(keys) > 10 else ''}")
-                        
-                        # Check if important keys are present
-                        if 'youtube' in path.lower():
-                            important_keys = ['channel_name', 'title', 'views', 'likes']
-                            missing = [k for k in important_keys if k not in first_item]
-                            if missing:
-                                print(f"⚠️ Missing important YouTube keys: {missing}")
-                        elif 'instagram' in path.lower():
-                            important_keys = ['username', 'ownerUsername', 'likesCount']
-                            missing = [k for k in important_keys if k not in first_item]
-                            if missing:
-                                print(f"⚠️ Missing important Instagram keys: {missing}")
-                
-                return jsonify(data)
+            query, error = parse_data_query()
+            if error:
+                return jsonify({'error': error}), 400
+            if query:
+                return query_dataset(path, query)
+            return send_dataset(path)
         
         # For non-JSON files, use send_from_directory
         return send_from_directory(directory, file)
@@ -364,106 +1175,92 @@ def get_data(filename):
         print(f"❌ Error serving file {path}: {str(e)}")
         return jsonify({'error': f'Error reading file: {str(e)}'}), 500
 
+def manifest_listing(directory, name_field):
+    """List the current dataset of every account in a platform manifest, newest first."""
+    listing = []
+    for entry in load_manifest(directory)['datasets'].values():
+        # Folders removed by hand drop out of the list
+        if not os.path.isfile(entry['file_path']):
+            continue
+        listing.append({
+            name_field: entry['account'],
+            'item_count': entry['item_count'],
+            'file_path': entry['file_path'],
+            'created': entry['created'],
+            'data': entry['preview']
+        })
+    return sorted(listing, key=lambda x: x['created'], reverse=True)
+
 @app.route('/api/data/list', methods=['GET'])
 def list_data():
-    youtube_data = []
-    instagram_data = []
-    
-    # Keep track of processed channels/users to avoid duplicates
-    processed_youtube_channels = set()
-    processed_instagram_users = set()
-    
-    # List YouTube data - optimized to prioritize newest data
-    if os.path.exists(YOUTUBE_DATA_DIR):
-        # Get all folders sorted by creation time (newest first)
-        youtube_folders = []
-        for root, dirs, files in os.walk(YOUTUBE_DATA_DIR):
-            if root == YOUTUBE_DATA_DIR:  # Only process top-level folders
-                for folder in dirs:
-                    folder_path = os.path.join(YOUTUBE_DATA_DIR, folder)
-                    creation_time = os.path.getctime(folder_path)
-                    try:
-                        channel_name = folder.split('_')[0]
-                        youtube_folders.append((folder_path, channel_name, creation_time))
-                    except IndexError:
-                        continue
-        
-        # Sort by creation time (newest first)
-        youtube_folders.sort(key=lambda x: x[2], reverse=True)
-        
-        # Process folders, but only include the most recent data for each channel
-        for folder_path, channel_name, _ in youtube_folders:
-            if channel_name in processed_youtube_channels:
-                continue
-                
-            json_files = [f for f in os.listdir(folder_path) if f.endswith('.json')]
-            if not json_files:
-                continue
-                
-            json_path = os.path.join(folder_path, json_files[0])
-            try:
-                with open(json_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    if data and len(data) > 0:
-                        youtube_data.append({
-                            'channel_name': channel_name,
-                            'item_count': len(data),
-                            'file_path': json_path,
-                            'created': os.path.getctime(json_path),
-                            'data': data[:5]  # Preview of first 5 items
-                        })
-                        processed_youtube_channels.add(channel_name)
-            except Exception as e:
-                print(f"Error loading YouTube data from {json_path}: {str(e)}")
-    
-    # List Instagram data - optimized to prioritize newest data
-    if os.path.exists(INSTAGRAM_DATA_DIR):
-        # Get all folders sorted by creation time (newest first)
-        instagram_folders = []
-        for root, dirs, files in os.walk(INSTAGRAM_DATA_DIR):
-            if root == INSTAGRAM_DATA_DIR:  # Only process top-level folders
-                for folder in dirs:
-                    folder_path = os.path.join(INSTAGRAM_DATA_DIR, folder)
-                    creation_time = os.path.getctime(folder_path)
-                    try:
-                        username = folder.split('_')[0]
-                        instagram_folders.append((folder_path, username, creation_time))
-                    except IndexError:
-                        continue
-        
-        # Sort by creation time (newest first)
-        instagram_folders.sort(key=lambda x: x[2], reverse=True)
-        
-        # Process folders, but only include the most recent data for each username
-        for folder_path, username, _ in instagram_folders:
-            if username in processed_instagram_users:
-                continue
-                
-            json_files = [f for f in os.listdir(folder_path) if f.endswith('.json')]
-            if not json_files:
-                continue
-                
-            json_path = os.path.join(folder_path, json_files[0])
-            try:
-                with open(json_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    if data and len(data) > 0:
-                        instagram_data.append({
-                            'username': username,
-                            'item_count': len(data),
-                            'file_path': json_path,
-                            'created': os.path.getctime(json_path),
-                            'data': data[:5]  # Preview of first 5 items
-                        })
-                        processed_instagram_users.add(username)
-            except Exception as e:
-                print(f"Error loading Instagram data from {json_path}: {str(e)}")
-    
+    # Answered from the manifests written when datasets are saved, no dataset file is opened
     return jsonify({
-        'youtube': sorted(youtube_data, key=lambda x: x['created'], reverse=True),
-        'instagram': sorted(instagram_data, key=lambda x: x['created'], reverse=True)
+        'youtube': manifest_listing(YOUTUBE_DATA_DIR, 'channel_name'),
+        'instagram': manifest_listing(INSTAGRAM_DATA_DIR, 'username')
     })
 
+PLATFORM_DIRS = {
+    'youtube': YOUTUBE_DATA_DIR,
+    'instagram': INSTAGRAM_DATA_DIR
+}
+
+def find_manifest_entry(platform, account):
+    """Manifest entry of an account's current dataset, matching the name case-insensitively, or None."""
+    datasets = load_manifest(PLATFORM_DIRS[platform])['datasets']
+    entry = datasets.get(account)
+    if entry is None:
+        wanted = account.lstrip('@').lower()
+        entry = next((e for name, e in datasets.items() if name.lower() == wanted), None)
+    return entry
+
+@app.route('/api/summary/<platform>/<account>', methods=['GET'])
+def get_summary(platform, account):
+    """
+    Serve the precomputed summary of an account's current dataset
+    
+    Totals, top items, engagement ratios and date histograms are computed when
+    the dataset is saved, so the dashboard loads a few kilobytes instead of
+    every item. Account names are matched case-insensitively.
+    """
+    if platform not in PLATFORM_DIRS:
+        return jsonify({'error': 'platform must be youtube or instagram'}), 400
+    
+    entry = find_manifest_entry(platform, account)
+    if entry is None or not os.path.isfile(entry['file_path']):
+        return jsonify({'error': f'No data found for {account}'}), 404
+    
+    try:
+        summary = load_summary(platform, entry['account'], entry['file_path'])
+    except (OSError, ValueError) as e:
+        print(f"❌ Error building summary for {entry['file_path']}: {str(e)}")
+        return jsonify({'error': f'Error reading data: {str(e)}'}), 500
+    
+    response = jsonify({**summary, 'file_path': entry['file_path']})
+    response.add_etag()
+    response.headers['Cache-Control'] = 'no-cache'
+    return response.make_conditional(request)
+
+@app.route('/api/history/<platform>/<account>', methods=['GET'])
+def get_history(platform, account):
+    """
+    Growth curve of an account from the snapshot store
+    
+    Returns the totals of every recorded scrape, oldest first. Add ?item=<id>
+    to get the samples of a single video or post instead.
+    """
+    if platform not in PLATFORM_DIRS:
+        return jsonify({'error': 'platform must be youtube or instagram'}), 400
+    
+    store = get_snapshot_store()
+    item_id = request.args.get('item')
+    if item_id:
+        return jsonify({'platform': platform, 'item': item_id, 'samples': store.item_history(platform, item_id)})
+    
+    # Scrapes are recorded under the name of the dataset
+    entry = find_manifest_entry(platform, account)
+    name = entry['account'] if entry else account
+    return jsonify({'platform': platform, 'account': name, 'scrapes': store.account_history(platform, name)})
+
 @app.route('/api/config', methods=['GET'])
 def get_config():
     # Return only non-sensitive configuration
@@ -0,0 +1,261 @@
+import asyncio
+import inspect
+import threading
+import time
+from collections import deque
+
+from config import APIFY_RUN_DEADLINE, APIFY_RATE_LIMIT, APIFY_RATE_BURST, APIFY_DATASET_PAGE_SIZE, APIFY_PROGRESS_INTERVAL
+from http_client import timeout_for, send_request
+from rate_limiter import TokenBucket
+
+APIFY_BASE_URL = "https://api.apify.com/v2"
+
+# Run statuses after which an actor run will not change any more
+TERMINAL_STATUSES = ('SUCCEEDED', 'FAILED', 'TIMED-OUT', 'ABORTED')
+
+# Apify caps the waitForFinish long-poll parameter at 60 seconds
+MAX_WAIT_FOR_FINISH = 60
+MIN_WAIT_FOR_FINISH = 5
+
+# Shared pacing for every Apify API call made by this process
+apify_limiter = TokenBucket(APIFY_RATE_LIMIT, APIFY_RATE_BURST)
+
+# Recent run durations per actor, used to size the long-poll window
+_run_history = {}
+_run_history_lock = threading.Lock()
+
+
+class RunOutcome:
+    """Result of waiting for an actor run to finish."""
+
+    def __init__(self, run_data, timed_out):
+        self.run_data = run_data or {}
+        self.timed_out = timed_out
+
+    @property
+    def status(self):
+        return self.run_data.get('status')
+
+    @property
+    def dataset_id(self):
+        return self.run_data.get('defaultDatasetId')
+
+    @property
+    def succeeded(self):
+        return self.status == 'SUCCEEDED'
+
+    @property
+    def partial(self):
+        """True when the dataset may be incomplete (deadline hit or run did not succeed)."""
+        return not self.succeeded
+
+    def describe(self):
+        if self.timed_out:
+            return f"deadline reached while the run was still {self.status or 'unknown'}, results are partial"
+        if self.succeeded:
+            return "run succeeded"
+        return f"run finished with status {self.status}, results may be partial"
+
+    def as_dict(self):
+        return {
+            'run_status': self.status,
+            'timed_out': self.timed_out,
+            'partial': self.partial
+        }
+
+
+class DatasetProgress:
+    """Poll callback that follows a running actor's dataset and reports new items.
+
+    Pass an instance as on_poll to wait_for_run. After every status request it
+    fetches the items added since the last check and calls
+    on_items(new_items, item_count, percent), where percent is measured against
+    the run's item limit (None when the limit is unknown). on_items runs in a
+    worker thread, so it may write files and task records without stalling
+    the other jobs on the event loop.
+    """
+
+    def __init__(self, session, api_token, item_limit, on_items):
+        self.session = session
+        self.api_token = api_token
+        self.item_limit = item_limit
+        self.on_items = on_items
+        self.item_count = 0
+
+    async def __call__(self, run_data):
+        dataset_id = run_data.get('defaultDatasetId')
+        if not dataset_id:
+            return
+        try:
+            response = await apify_request(self.session, 'GET', f"{APIFY_BASE_URL}/datasets/{dataset_id}/items", endpoint='dataset', params={
+                'token': self.api_token,
+                'offset': self.item_count,
+                'limit': APIFY_DATASET_PAGE_SIZE
+            })
+            if response.status_code != 200:
+                return
+            new_items = response.json()
+            if not new_items:
+                return
+            self.item_count += len(new_items)
+            percent = None
+            if self.item_limit:
+                percent = min(100, round(self.item_count * 100 / self.item_limit))
+            await asyncio.to_thread(self.on_items, new_items, self.item_count, percent)
+        except Exception as e:
+            # Progress is best effort and must never break the run itself
+            print(f"⚠️ Failed to fetch partial results: {str(e)}")
+
+
+async def apify_request(session, method, url, endpoint='default', **kwargs):
+    """Send a request to the Apify API once the shared rate limiter allows it.
+
+    endpoint selects the timeout from HTTP_READ_TIMEOUTS unless an explicit
+    timeout is passed, so a hung socket can never pin a scrape job.
+    """
+    kwargs.setdefault('timeout', timeout_for(endpoint))
+    # Retries after 429/5xx count against the quota too, so every attempt takes a token
+    return await send_request(session, method, url, before_attempt=apify_limiter.acquire_async, **kwargs)
+
+
+def record_run_duration(actor_id, seconds):
+    """Remember how long a finished run of actor_id took."""
+    with _run_history_lock:
+        _run_history.setdefault(actor_id, deque(maxlen=20)).append(seconds)
+
+
+def expected_run_duration(actor_id):
+    """Median duration of recent runs of actor_id, or None if there is no history."""
+    with _run_history_lock:
+        durations = sorted(_run_history.get(actor_id, ()))
+    if not durations:
+        return None
+    return durations[len(durations) // 2]
+
+
+def _next_wait(actor_id, elapsed, previous_wait):
+    """
+    Pick the waitForFinish window for the next status request
+
+    While the run is younger than its usual duration, the window ends near the
+    expected finish time. Once it overruns its history the window doubles up to
+    the Apify maximum. Completion is reported as soon as it happens either way,
+    the window only controls how often a still-running run is checked.
+    """
+    expected = expected_run_duration(actor_id)
+    if expected is None:
+        return MAX_WAIT_FOR_FINISH
+    if elapsed < expected:
+        return min(max(expected - elapsed, MIN_WAIT_FOR_FINISH), MAX_WAIT_FOR_FINISH)
+    return min(max(previous_wait * 2, MIN_WAIT_FOR_FINISH), MAX_WAIT_FOR_FINISH)
+
+
+async def wait_for_run(session, api_token, run_id, actor_id=None, deadline=APIFY_RUN_DEADLINE, on_poll=None):
+    """
+    Wait for an actor run to finish using Apify's waitForFinish long polling
+
+    Args:
+        session (aiohttp.ClientSession): HTTP session to use
+        api_token (str): Apify API token
+        run_id (str): The actor run to wait for
+        actor_id (str): Actor of the run, used for duration history
+        deadline (int): Hard limit in seconds before giving up on the run
+        on_poll (callable): Optional callback (or coroutine function) receiving the run data after every status request
+
+    Returns:
+        RunOutcome: Final run data and whether the deadline was reached
+    """
+    status_url = f"{APIFY_BASE_URL}/actor-runs/{run_id}"
+    started = time.time()
+    run_data = {}
+    wait = 0
+    error_backoff = 1
+
+    while True:
+        elapsed = time.time() - started
+        remaining = deadline - elapsed
+        if remaining <= 0:
+            outcome = RunOutcome(run_data, timed_out=True)
+            print(f"⏱️ Run {run_id}: {outcome.describe()}")
+            return outcome
+
+        wait = int(min(_next_wait(actor_id, elapsed, wait), remaining))
+        if on_poll:
+            # Progress callbacks need regular check-ins even while the run is busy
+            wait = min(wait, APIFY_PROGRESS_INTERVAL)
+        try:
+            status_response = await apify_request(
+                session, 'GET', status_url,
+                params={'token': api_token, 'waitForFinish': wait},
+                # The server holds long-poll requests open for up to `wait` seconds
+                timeout=timeout_for('status', extra_read=wait)
+            )
+        except Exception as e:
+            print(f"❌ Failed to get run status: {str(e)}")
+            status_response = None
+
+        if status_response is None or status_response.status_code != 200:
+            if status_response is not None:
+                print(f"❌ Failed to get run status: {status_response.status_code}")
+            # Back off on errors so a failing API is not hammered
+            await asyncio.sleep(min(error_backoff, max(remaining, 0)))
+            error_backoff = min(error_backoff * 2, 30)
+            continue
+        error_backoff = 1
+
+        run_data = status_response.json().get('data', {})
+        status = run_data.get('status')
+        print(f"Run status: {status} ({int(time.time() - started)}s elapsed)")
+
+        if on_poll:
+            result = on_poll(run_data)
+            if inspect.isawaitable(result):
+                await result
+
+        if status in TERMINAL_STATUSES:
+            if actor_id and status == 'SUCCEEDED':
+                record_run_duration(actor_id, time.time() - started)
+            outcome = RunOutcome(run_data, timed_out=False)
+            if outcome.partial:
+                print(f"⚠️ Run {run_id}: {outcome.describe()}")
+            return outcome
+
+
+async def iter_dataset_pages(session, api_token, dataset_id, page_size=APIFY_DATASET_PAGE_SIZE):
+    """
+    Download a dataset page by page with offset/limit pagination
+
+    Only one page is held in memory at a time, so callers can process and
+    write each page before the next one is requested. Use with ``async for``.
+
+    Args:
+        session (aiohttp.ClientSession): HTTP session to use
+        api_token (str): Apify API token
+        dataset_id (str): The dataset to read
+        page_size (int): Items requested per page
+
+    Yields:
+        list: The items of one page
+
+    Raises:
+        RuntimeError: If a page request fails
+    """
+    items_url = f"{APIFY_BASE_URL}/datasets/{dataset_id}/items"
+    offset = 0
+    while True:
+        response = await apify_request(session, 'GET', items_url, endpoint='dataset', params={
+            'token': api_token,
+            'offset': offset,
+            'limit': page_size
+        })
+        if response.status_code != 200:
+            raise RuntimeError(f"Failed to get dataset items: {response.status_code}")
+
+        page = response.json()
+        if not page:
+            return
+        yield page
+
+        offset += len(page)
+        if len(page) < page_size:
+            return
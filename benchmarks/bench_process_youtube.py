@@ -0,0 +1,90 @@
+"""Benchmark process_youtube_data on synthetic payloads of growing size.
+
+Run from the repository root:
+
+    python benchmarks/bench_process_youtube.py
+    python benchmarks/bench_process_youtube.py --sizes 1000 10000 100000 --repeat 5
+
+Time per item should stay flat as the item count grows (linear scaling).
+"""
+import argparse
+import contextlib
+import io
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from youtube_scraper import process_youtube_data  # noqa: E402
+
+# A few payload shapes seen from the actors: flat counts, nested statistics, snippet objects
+def make_item(index, rng):
+    shape = index % 3
+    item = {
+        'id': f"video{index}",
+        'url': f"https://www.youtube.com/watch?v=video{index}",
+        'title': f"Video number {index}",
+        'channelUrl': 'https://www.youtube.com/@benchmark',
+        'duration': '00:03:21'
+    }
+    if shape == 0:
+        item.update({
+            'type': 'video',
+            'date': '2025-04-25T04:08:14.000Z',
+            'viewCount': rng.randint(0, 10 ** 7),
+            'likes': rng.randint(0, 10 ** 5),
+            'commentCount': str(rng.randint(0, 10 ** 4))
+        })
+    elif shape == 1:
+        item.update({
+            'channelTitle': 'Benchmark',
+            'channelId': 'UCbenchmark',
+            'publishedAt': '2025-04-25T04:08:14Z',
+            'viewCount': f"{rng.randint(0, 10 ** 7):,}",
+            'statistics': {'likeCount': str(rng.randint(0, 10 ** 5))},
+            'thumbnails': {'high': {'url': 'https://i.ytimg.com/vi/x/hqdefault.jpg'}}
+        })
+    else:
+        item.update({
+            'author': 'Benchmark',
+            'authorId': 'UCbenchmark',
+            'snippet': {'likeCount': rng.randint(0, 10 ** 5), 'channelTitle': 'Benchmark'},
+            'subscriberCount': 123456
+        })
+    return item
+
+
+def time_run(items, repeat):
+    best = None
+    for _ in range(repeat):
+        # resolve_channel_identity reports what it found, keep the output readable
+        with contextlib.redirect_stdout(io.StringIO()):
+            started = time.perf_counter()
+            process_youtube_data(items)
+            elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark process_youtube_data')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000], help='Item counts to time')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per size, the fastest is reported')
+    parser.add_argument('--seed', type=int, default=42, help='Seed for the synthetic payloads')
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    print(f"{'items':>10} {'seconds':>10} {'us/item':>10} {'vs first':>10}")
+    baseline = None
+    for size in args.sizes:
+        items = [make_item(index, rng) for index in range(size)]
+        elapsed = time_run(items, args.repeat)
+        per_item = elapsed / size * 1e6
+        baseline = baseline or per_item
+        print(f"{size:>10} {elapsed:>10.3f} {per_item:>10.2f} {per_item / baseline:>9.2f}x")
+
+
+if __name__ == '__main__':
+    main()
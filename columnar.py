@@ -0,0 +1,199 @@
+import array
+import json
+import os
+import shutil
+
+try:
+    import numpy
+except ImportError:  # Optional: without numpy no columnar copy is written
+    numpy = None
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # Optional: Parquet output is used when pyarrow is installed
+    pyarrow = None
+
+from config import COLUMNAR_FORMAT
+from schema import SCHEMAS, as_epoch_seconds
+
+# Columns of the columnar copy and their kind. Counts are float64 with NaN for
+# missing values, timestamps are seconds since the epoch (UTC) and strings are
+# dictionary encoded as int32 codes into one string table (-1 when missing).
+COLUMNS = (
+    ('account', 'string'),
+    ('id', 'string'),
+    ('url', 'string'),
+    ('content_type', 'string'),
+    ('title', 'string'),
+    ('published', 'timestamp'),
+    ('likes', 'number'),
+    ('comments', 'number'),
+    ('views', 'number')
+)
+
+NPY_SUFFIX = ".columns"  # Directory of <column>.npy files plus columns.json
+PARQUET_SUFFIX = ".parquet"
+NPY_META_NAME = "columns.json"
+
+# numpy's NaT, used for missing timestamps
+MISSING_TIMESTAMP = -2 ** 63
+
+
+def columnar_format():
+    """Format selected by COLUMNAR_FORMAT that can be written here ('parquet', 'npy' or None)."""
+    if numpy is None:
+        return None
+    if COLUMNAR_FORMAT == 'auto':
+        return 'parquet' if pyarrow is not None else 'npy'
+    if COLUMNAR_FORMAT == 'parquet' and pyarrow is not None:
+        return 'parquet'
+    if COLUMNAR_FORMAT == 'npy':
+        return 'npy'
+    return None
+
+
+def _base_path(json_path):
+    return json_path[:-len('.json')] if json_path.endswith('.json') else json_path
+
+
+class ColumnarBuilder:
+    """Collect dataset items into typed column buffers and write them as a columnar copy.
+
+    Items are reduced to flat machine values as they arrive (page by page while
+    streaming), so no list of dicts is needed to build the columns. save()
+    writes <name>.parquet or a <name>.columns directory of .npy files next to
+    the dataset, both of which can be memory-mapped by readers.
+    """
+
+    def __init__(self, platform, account, fmt):
+        self.platform = platform
+        self.account = account
+        self.format = fmt
+        schema = SCHEMAS[platform]
+        self._getters = {name: schema.getter(name) for name, _ in COLUMNS if name != 'account'}
+        self.rows = 0
+        self.strings = []
+        self._string_codes = {}
+        self._buffers = {}
+        for name, kind in COLUMNS:
+            self._buffers[name] = array.array({'string': 'i', 'timestamp': 'q', 'number': 'd'}[kind])
+
+    def _code(self, value):
+        if value is None:
+            return -1
+        value = str(value)
+        code = self._string_codes.get(value)
+        if code is None:
+            code = self._string_codes[value] = len(self.strings)
+            self.strings.append(value)
+        return code
+
+    def add(self, item):
+        if not isinstance(item, dict):
+            return
+        buffers = self._buffers
+        for name, kind in COLUMNS:
+            if name == 'account':
+                buffers[name].append(self._code(self.account))
+                continue
+            value = self._getters[name](item)
+            if kind == 'string':
+                buffers[name].append(self._code(value))
+            elif kind == 'timestamp':
+                seconds = as_epoch_seconds(value)
+                buffers[name].append(MISSING_TIMESTAMP if seconds is None else seconds)
+            else:
+                buffers[name].append(float('nan') if value is None else float(value))
+        self.rows += 1
+
+    def add_many(self, items):
+        for item in items:
+            self.add(item)
+
+    def _numpy_columns(self):
+        columns = {}
+        for name, kind in COLUMNS:
+            values = numpy.frombuffer(self._buffers[name], dtype={'string': numpy.int32, 'timestamp': numpy.int64, 'number': numpy.float64}[kind])
+            columns[name] = values.view('datetime64[s]') if kind == 'timestamp' else values
+        return columns
+
+    def save(self, json_path):
+        """Write the columnar copy next to the dataset at json_path. Failures are reported but never break the save."""
+        try:
+            if self.format == 'parquet':
+                self._save_parquet(_base_path(json_path) + PARQUET_SUFFIX)
+            elif self.format == 'npy':
+                self._save_npy(_base_path(json_path) + NPY_SUFFIX)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Failed to write columnar copy of {json_path}: {str(e)}")
+
+    def _save_npy(self, path):
+        tmp_path = f"{path}.tmp"
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        os.makedirs(tmp_path)
+        for name, values in self._numpy_columns().items():
+            numpy.save(os.path.join(tmp_path, f"{name}.npy"), values)
+        with open(os.path.join(tmp_path, NPY_META_NAME), 'w', encoding='utf-8') as f:
+            json.dump({
+                'platform': self.platform,
+                'account': self.account,
+                'rows': self.rows,
+                'columns': dict(COLUMNS),
+                'strings': self.strings
+            }, f, ensure_ascii=False)
+        # A directory cannot replace another one in a single step
+        shutil.rmtree(path, ignore_errors=True)
+        os.replace(tmp_path, path)
+
+    def _save_parquet(self, path):
+        strings = pyarrow.array(self.strings, type=pyarrow.string())
+        arrays = []
+        for name, values in self._numpy_columns().items():
+            if values.dtype == numpy.int32:
+                arrays.append(pyarrow.DictionaryArray.from_arrays(pyarrow.array(values, mask=values < 0), strings))
+            elif values.dtype.kind == 'M':
+                # NaT becomes null
+                arrays.append(pyarrow.array(values, from_pandas=True).cast(pyarrow.timestamp('s', tz='UTC')))
+            else:
+                arrays.append(pyarrow.array(values, from_pandas=True))
+        table = pyarrow.Table.from_arrays(arrays, names=[name for name, _ in COLUMNS])
+        tmp_path = f"{path}.tmp"
+        pyarrow.parquet.write_table(table, tmp_path)
+        os.replace(tmp_path, path)
+
+
+def columnar_builder(platform, account):
+    """Return a ColumnarBuilder for the configured format, or None when columnar output is off or unavailable."""
+    fmt = columnar_format()
+    if fmt is None:
+        return None
+    return ColumnarBuilder(platform, account, fmt)
+
+
+def open_columns(json_path):
+    """
+    Memory-map the columnar copy of a dataset
+
+    Args:
+        json_path (str): Path of the JSON dataset
+
+    Returns:
+        pyarrow.Table for a Parquet copy, or a dict {'rows', 'columns', 'strings'}
+        for a .npy copy, where columns maps names to read-only memory-mapped
+        arrays (string columns hold codes into strings). None if there is no copy.
+    """
+    base = _base_path(json_path)
+    if pyarrow is not None and os.path.isfile(base + PARQUET_SUFFIX):
+        return pyarrow.parquet.read_table(base + PARQUET_SUFFIX, memory_map=True)
+
+    directory = base + NPY_SUFFIX
+    if numpy is None or not os.path.isdir(directory):
+        return None
+    with open(os.path.join(directory, NPY_META_NAME), 'r', encoding='utf-8') as f:
+        meta = json.load(f)
+    columns = {
+        name: numpy.load(os.path.join(directory, f"{name}.npy"), mmap_mode='r')
+        for name in meta['columns']
+    }
+    return {'rows': meta['rows'], 'columns': columns, 'strings': meta['strings']}
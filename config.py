@@ -9,4 +9,99 @@ INSTAGRAM_DATA_DIR = "instagram_data"
 
 # API server settings
 API_PORT = 5000
-DEBUG_MODE = True 
\ No newline at end of file
+DEBUG_MODE = True 
+
+# Scrape job scheduler settings
+SCRAPE_WORKERS = 4  # Scrape jobs that run at the same time (coroutines on one event loop, cheap to raise)
+SCRAPE_QUEUE_DEPTH = 20  # Jobs that may wait for a free worker before requests get HTTP 429
+SCRAPE_ESTIMATED_JOB_SECONDS = 300  # Initial job duration guess used for queue ETAs
+
+# Task registry shared by all gunicorn workers (SQLite in WAL mode)
+TASK_DB_PATH = "data/tasks.db"
+
+# Every process refreshes the heartbeat of the queued and running tasks it owns this
+# often (seconds). Tasks whose owner died or stopped beating for TASK_HEARTBEAT_TIMEOUT
+# are marked as errors and stop blocking new scrapes of their account
+TASK_HEARTBEAT_INTERVAL = 30
+TASK_HEARTBEAT_TIMEOUT = 120
+
+# History of every scrape (entities plus one metric sample per item and scrape), SQLite in WAL mode
+SNAPSHOT_DB_PATH = "data/snapshots.db"
+
+# How long (seconds) a saved scrape is reused before a new actor run is started.
+# Send force=true with a scrape request to bypass the cache. 0 disables caching.
+YOUTUBE_CACHE_TTL = 3600
+INSTAGRAM_CACHE_TTL = 3600
+
+# Delta scrapes ask the actors only for items newer than the stored dataset and merge
+# them in by id. Default for scrape requests that do not send "delta"
+DELTA_SCRAPES = False
+
+# Keep the full actor payload of every item in saved datasets. Without it YouTube
+# datasets hold the standardized fields and Instagram datasets the post fields the
+# dashboard reads; with it YouTube items get a "raw" object and Instagram items
+# keep every actor field
+YOUTUBE_KEEP_RAW = False
+INSTAGRAM_KEEP_RAW = False
+
+# Apify actor used for YouTube scraping. Leave as None to search the account's
+# actors (cached for YOUTUBE_ACTOR_CACHE_TTL seconds) or pin an actor ID here.
+YOUTUBE_ACTOR_ID = None
+YOUTUBE_ACTOR_CACHE_TTL = 6 * 3600
+
+# Hard limit (seconds) for waiting on an Apify actor run before using partial results
+APIFY_RUN_DEADLINE = 600
+
+# Pacing for Apify API calls (token bucket): sustained requests per second and burst size
+APIFY_RATE_LIMIT = 10
+APIFY_RATE_BURST = 20
+
+# Items fetched per request when downloading an Apify dataset
+APIFY_DATASET_PAGE_SIZE = 500
+
+# Seconds between partial-result checks while an actor run is still running
+APIFY_PROGRESS_INTERVAL = 10
+
+# Items collected by running scrapes, served by GET /api/tasks/<id>?partial=true
+PARTIAL_RESULTS_DIR = "data/partial"
+
+# Task progress push (GET /api/tasks/<id>/events) and long-poll fallback (?wait=&since=)
+TASK_EVENTS_POLL_INTERVAL = 1  # Seconds between task store checks for a change
+TASK_EVENTS_MAX_SECONDS = 300  # Streams close after this long; clients reconnect
+TASK_LONG_POLL_MAX_WAIT = 30
+# Every open stream or long poll holds one server thread, so the number waiting at once is
+# capped below the gunicorn thread count, keeping a reserve for the other API requests
+SERVER_THREADS = 16  # Must match --threads in Procfile and render.yaml
+TASK_WAIT_RESERVED_THREADS = 4
+TASK_WAIT_MAX_CLIENTS = max(1, SERVER_THREADS - TASK_WAIT_RESERVED_THREADS)  # Per server process
+TASK_WAIT_RETRY_AFTER = 5  # Seconds clients over the limit are told to wait (503 Retry-After)
+
+# Shared HTTP client for Apify calls
+HTTP_POOL_SIZE = SCRAPE_WORKERS * 2 + 4  # Kept-alive connections per host (status polls plus progress checks per job)
+HTTP_CONNECT_TIMEOUT = 10
+HTTP_READ_TIMEOUTS = {
+    'default': 30,
+    'actors': 30,  # Actor list lookup
+    'start': 60,  # Starting an actor run
+    'status': 15,  # Run status, plus the waitForFinish long-poll window
+    'dataset': 120  # Dataset pages
+}
+
+# Batch scraping: accounts accepted per request, and actor runs per platform a batch is split into
+BATCH_MAX_ACCOUNTS = 250
+BATCH_ACTOR_RUNS = 4
+
+# In-memory cache of parsed datasets for paged /api/data/<path> queries, bounded by their estimated
+# in-memory size (parsed items plus sort orders, typically 2-4x the file size)
+DATASET_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+# Items kept per ranking (likes, comments, views) in the precomputed dataset summaries
+SUMMARY_TOP_N = 10
+
+# Columnar copy of every dataset for fast numeric scans, written next to the JSON:
+# "parquet" (needs pyarrow), "npy" (a <name>.columns folder of .npy files, needs numpy),
+# "auto" to pick parquet when pyarrow is installed and npy otherwise, or None to skip it
+COLUMNAR_FORMAT = "auto"
+
+# HTML reports are split into linked pages of this many rows (<name>.html, <name>.page-2.html, ...)
+HTML_REPORT_PAGE_SIZE = 5000
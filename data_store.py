@@ -0,0 +1,286 @@
+import gzip
+import json
+import os
+import re
+import shutil
+import threading
+import time
+
+try:
+    import brotli
+except ImportError:  # Optional: without it only the gzip variant is written
+    brotli = None
+
+try:
+    import fcntl
+except ImportError:  # Windows: manifest writes are only serialized within one process
+    fcntl = None
+
+from records import as_dict
+
+MANIFEST_NAME = "manifest.json"
+
+# Precomputed aggregates stored next to each dataset (<name>.summary.json)
+SUMMARY_SUFFIX = ".summary.json"
+
+# Items of each dataset kept in the manifest for list previews
+PREVIEW_SIZE = 5
+
+# Dataset folders are named <account>_<YYYY-MM-DD_HH-MM-SS>
+DATASET_FOLDER_PATTERN = re.compile(r"^(.+)_(\d{4}-\d{2}-\d{2}_\d{2}-\d{2}-\d{2})$")
+
+_manifest_thread_lock = threading.Lock()
+_manifest_cache = {}  # manifest path -> ((mtime_ns, size), manifest)
+
+
+class JsonArrayWriter:
+    """Write a JSON array to disk one item at a time.
+
+    The output has the same layout as json.dump(items, f, ensure_ascii=False,
+    indent=2), but only the item being written is held in memory. Data goes to
+    a temporary file that replaces the target path on close(), so readers
+    never see a half-written dataset.
+
+    sidecars are objects with add(item) and save(json_path), such as
+    summaries.SummaryBuilder. They see every item as it is written and save
+    their output next to the dataset on close(). Items written with
+    carried_over=True (stored items a delta scrape keeps) skip sidecars that
+    set records_history, so their old metrics are not recorded as a new sample.
+
+    Items may be dicts or records.Record objects, which are serialized
+    through to_dict() one at a time.
+    """
+
+    def __init__(self, path, sidecars=()):
+        self.path = path
+        self.count = 0
+        self.preview = []  # First PREVIEW_SIZE items, for the dataset manifest
+        self.sidecars = [sidecar for sidecar in sidecars if sidecar is not None]
+        self._tmp_path = f"{path}.tmp"
+        self._file = open(self._tmp_path, 'w', encoding='utf-8')
+        self._file.write("[")
+
+    def write(self, item, carried_over=False):
+        item = as_dict(item)
+        text = json.dumps(item, ensure_ascii=False, indent=2)
+        self._file.write("\n" if self.count == 0 else ",\n")
+        self._file.write("\n".join("  " + line for line in text.split("\n")))
+        if self.count < PREVIEW_SIZE:
+            self.preview.append(item)
+        for sidecar in self.sidecars:
+            if not (carried_over and getattr(sidecar, 'records_history', False)):
+                sidecar.add(item)
+        self.count += 1
+
+    def write_many(self, items, carried_over=False):
+        for item in items:
+            self.write(item, carried_over)
+
+    def close(self):
+        self._file.write("\n]" if self.count else "]")
+        self._file.close()
+        os.replace(self._tmp_path, self.path)
+        write_compressed_variants(self.path)
+        for sidecar in self.sidecars:
+            sidecar.save(self.path)
+
+    def abort(self):
+        self._file.close()
+        if os.path.exists(self._tmp_path):
+            os.remove(self._tmp_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
+
+
+def is_dataset_file(name):
+    """True for a JSON dataset file name, False for summaries and other JSON siblings."""
+    return name.endswith('.json') and not name.endswith(SUMMARY_SUFFIX)
+
+
+def write_json_atomic(path, data):
+    """Write data as JSON to a temporary file and move it over path in one step."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def write_compressed_variants(path):
+    """
+    Write precompressed siblings of a dataset (<path>.gz and, with brotli installed, <path>.br)
+
+    The API serves these directly to clients that accept the encoding, so
+    datasets are compressed once at save time instead of on every request.
+    Failures are reported but never break the save itself.
+    """
+    try:
+        tmp_path = f"{path}.gz.tmp"
+        with open(path, 'rb') as src, gzip.open(tmp_path, 'wb', compresslevel=9) as dst:
+            shutil.copyfileobj(src, dst)
+        os.replace(tmp_path, f"{path}.gz")
+
+        if brotli is not None:
+            with open(path, 'rb') as src:
+                compressed = brotli.compress(src.read(), mode=brotli.MODE_TEXT)
+            tmp_path = f"{path}.br.tmp"
+            with open(tmp_path, 'wb') as dst:
+                dst.write(compressed)
+            os.replace(tmp_path, f"{path}.br")
+    except OSError as e:
+        print(f"⚠️ Failed to write compressed copies of {path}: {str(e)}")
+
+
+class _ManifestLock:
+    """Serialize manifest updates between threads and, where flock exists, processes."""
+
+    def __init__(self, directory):
+        self.path = os.path.join(directory, f"{MANIFEST_NAME}.lock")
+        self._file = None
+
+    def __enter__(self):
+        _manifest_thread_lock.acquire()
+        if fcntl:
+            self._file = open(self.path, 'a')
+            fcntl.flock(self._file, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._file:
+            fcntl.flock(self._file, fcntl.LOCK_UN)
+            self._file.close()
+        _manifest_thread_lock.release()
+        return False
+
+
+def _read_manifest_file(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def record_dataset(directory, account, json_path, item_count, preview):
+    """
+    Register a saved dataset as the current one for an account
+
+    The manifest (<directory>/manifest.json) keeps one entry per account with
+    everything the data list needs, so listing never has to open datasets.
+
+    Args:
+        directory (str): Platform data directory, e.g. YOUTUBE_DATA_DIR
+        account (str): Channel name or username the dataset belongs to
+        json_path (str): Path of the saved JSON dataset
+        item_count (int): Number of items in the dataset
+        preview (list): First items of the dataset
+    """
+    manifest_path = os.path.join(directory, MANIFEST_NAME)
+    try:
+        with _ManifestLock(directory):
+            manifest = _read_manifest_file(manifest_path)
+            if manifest is None:
+                manifest = _scan_datasets(directory)
+            manifest['datasets'][account] = {
+                'account': account,
+                'item_count': item_count,
+                'file_path': json_path,
+                'created': time.time(),
+                'preview': preview[:PREVIEW_SIZE]
+            }
+            manifest['updated'] = time.time()
+            write_json_atomic(manifest_path, manifest)
+    except OSError as e:
+        # The dataset itself is saved, a stale manifest is rebuilt later
+        print(f"⚠️ Failed to update {manifest_path}: {str(e)}")
+
+
+def finish_dataset(writer, account):
+    """
+    Close a streamed dataset and register it as the account's current one
+
+    This compresses the dataset, saves its sidecars and locks the manifest,
+    so async callers run it with asyncio.to_thread instead of on their loop.
+
+    Args:
+        writer (JsonArrayWriter): Writer of the dataset, in <directory>/<folder>/
+        account (str): Channel name or username the dataset belongs to
+    """
+    writer.close()
+    record_dataset(os.path.dirname(os.path.dirname(writer.path)), account, writer.path, writer.count, writer.preview)
+
+
+def _scan_datasets(directory):
+    """Build a manifest from the dataset folders on disk (newest folder per account)."""
+    newest = {}
+    for folder in os.listdir(directory):
+        match = DATASET_FOLDER_PATTERN.match(folder)
+        folder_path = os.path.join(directory, folder)
+        if not match or not os.path.isdir(folder_path):
+            continue
+        account, stamp = match.groups()
+        if account not in newest or stamp > newest[account][0]:
+            newest[account] = (stamp, folder_path)
+
+    datasets = {}
+    for account, (_, folder_path) in newest.items():
+        json_files = [f for f in os.listdir(folder_path) if is_dataset_file(f)]
+        if not json_files:
+            continue
+        json_path = os.path.join(folder_path, json_files[0])
+        try:
+            with open(json_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Error loading data from {json_path}: {str(e)}")
+            continue
+        if not isinstance(data, list) or not data:
+            continue
+        datasets[account] = {
+            'account': account,
+            'item_count': len(data),
+            'file_path': json_path,
+            'created': os.path.getctime(json_path),
+            'preview': data[:PREVIEW_SIZE]
+        }
+    return {'datasets': datasets, 'updated': time.time()}
+
+
+def load_manifest(directory):
+    """
+    Return the dataset manifest of a platform directory
+
+    The parsed manifest is cached in memory until the file's mtime or size
+    changes. A missing manifest is rebuilt from the folders on disk once.
+
+    Returns:
+        dict: {'datasets': {account: entry}, 'updated': timestamp}
+    """
+    manifest_path = os.path.join(directory, MANIFEST_NAME)
+    if not os.path.isdir(directory):
+        return {'datasets': {}, 'updated': None}
+
+    try:
+        stat = os.stat(manifest_path)
+    except FileNotFoundError:
+        with _ManifestLock(directory):
+            if not os.path.exists(manifest_path):
+                print(f"Building dataset manifest for {directory}")
+                write_json_atomic(manifest_path, _scan_datasets(directory))
+        stat = os.stat(manifest_path)
+
+    signature = (stat.st_mtime_ns, stat.st_size)
+    cached = _manifest_cache.get(manifest_path)
+    if cached and cached[0] == signature:
+        return cached[1]
+
+    manifest = _read_manifest_file(manifest_path) or {'datasets': {}, 'updated': None}
+    _manifest_cache[manifest_path] = (signature, manifest)
+    return manifest
@@ -0,0 +1,205 @@
+import sys
+import threading
+from collections import OrderedDict
+
+SORT_DIRECTIONS = ('asc', 'desc')
+
+# Items measured to estimate the in-memory size of a parsed dataset
+SIZE_SAMPLE = 64
+
+# Approximate bytes a memoized sort order takes per item (list slot plus int object)
+ORDER_BYTES_PER_ITEM = 36
+
+
+def dataset_etag(stat):
+    """Strong ETag for a file, derived from its modification time and size."""
+    return f"{stat.st_mtime_ns:x}-{stat.st_size:x}"
+
+
+def field_getter(field):
+    """Build a getter for a field name, where dots select nested keys (e.g. 'statistics.likeCount')."""
+    parts = field.split('.')
+    if len(parts) == 1:
+        return lambda item: item.get(field) if isinstance(item, dict) else None
+
+    def get(item):
+        for part in parts:
+            if not isinstance(item, dict):
+                return None
+            item = item.get(part)
+        return item
+    return get
+
+
+def _deep_size(value):
+    # Dict keys are left out: the JSON decoder shares them between items
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(_deep_size(item) for item in value.values())
+    elif isinstance(value, list):
+        size += sum(_deep_size(item) for item in value)
+    return size
+
+
+def estimate_size(items):
+    """Approximate memory held by a list of parsed JSON items, measured on an evenly spaced sample."""
+    if not items:
+        return sys.getsizeof(items)
+    step = max(1, len(items) // SIZE_SAMPLE)
+    sample = items[::step]
+    return sys.getsizeof(items) + sum(_deep_size(item) for item in sample) * len(items) // len(sample)
+
+
+class DatasetIndex:
+    """A parsed dataset plus memoized sort orders for answering page queries."""
+
+    def __init__(self, items):
+        self.items = items
+        self._orders = {}  # (field, direction) -> list of item positions
+        self._lock = threading.Lock()
+        self._items_size = estimate_size(items)
+
+    @property
+    def nbytes(self):
+        """Estimated memory of the parsed items plus the sort orders built so far."""
+        return self._items_size + len(self._orders) * len(self.items or ()) * ORDER_BYTES_PER_ITEM
+
+    def order(self, field, direction):
+        """
+        Item positions sorted by field, built once per field and direction
+
+        Numbers (bools included) come first, then other values compared as
+        text, then items without the field in their original order. Each
+        group is sorted in the requested direction, so a field that mixes
+        counts with text like 'N/A' pages the same way ascending and
+        descending.
+        """
+        key = (field, direction)
+        order = self._orders.get(key)
+        if order is None:
+            get = field_getter(field)
+            numbers = []
+            others = []
+            missing = []
+            for position, item in enumerate(self.items):
+                value = get(item)
+                if value is None or value == '':
+                    missing.append(position)
+                elif isinstance(value, (int, float)):
+                    numbers.append((value, position))
+                else:
+                    others.append((str(value), position))
+            reverse = direction == 'desc'
+            numbers.sort(key=lambda entry: entry[0], reverse=reverse)
+            others.sort(key=lambda entry: entry[0], reverse=reverse)
+            order = [position for _, position in numbers] + [position for _, position in others] + missing
+            with self._lock:
+                self._orders[key] = order
+        return order
+
+    def query(self, offset=0, limit=None, sort=None, fields=None):
+        """
+        Return one page of the dataset
+
+        Args:
+            offset (int): Rows to skip
+            limit (int): Maximum rows to return, None for all remaining rows
+            sort (tuple): (field, direction) or None to keep the stored order
+            fields (list): Fields to keep in every row, None for whole items
+
+        Returns:
+            list: The selected rows
+        """
+        end = None if limit is None else offset + limit
+        if sort:
+            rows = [self.items[position] for position in self.order(*sort)[offset:end]]
+        else:
+            rows = self.items[offset:end]
+        if fields:
+            getters = [(field, field_getter(field)) for field in fields]
+            rows = [{field: get(row) for field, get in getters} for row in rows]
+        return rows
+
+
+class DatasetCache:
+    """Byte-bounded LRU cache of parsed datasets.
+
+    Entries are keyed by (path, mtime, size), so a rewritten file is never
+    served from a stale entry. They are weighed by their nbytes (the estimated
+    in-memory size, re-read on every hit as sort orders are added), or by file
+    size for values without one. The least recently used entries are evicted
+    once the total exceeds max_bytes.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # (path, mtime_ns, size) -> (value, weight)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, path, stat, load):
+        """
+        Return the cached value for a file, loading it on a miss
+
+        Args:
+            path (str): Path of the dataset file
+            stat (os.stat_result): Current stat of the file
+            load (callable): Returns the value to cache for the file
+
+        Returns:
+            The cached or freshly loaded value
+        """
+        key = (path, stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, weight = entry
+                self._entries.move_to_end(key)
+                self.hits += 1
+                new_weight = self._weigh(key, value)
+                if new_weight != weight:
+                    self._entries[key] = (value, new_weight)
+                    self._bytes += new_weight - weight
+                    self._evict()
+                return value
+            self.misses += 1
+
+        # Load outside the lock so one slow file does not block other requests
+        value = load()
+        with self._lock:
+            self._store(key, value)
+        return value
+
+    @staticmethod
+    def _weigh(key, value):
+        return getattr(value, 'nbytes', key[2])
+
+    def _store(self, key, value):
+        # Older versions of the same file can never be hit again
+        for old_key in [k for k in self._entries if k[0] == key[0]]:
+            self._bytes -= self._entries.pop(old_key)[1]
+        weight = self._weigh(key, value)
+        if weight > self.max_bytes:
+            return
+        self._entries[key] = (value, weight)
+        self._bytes += weight
+        self._evict()
+
+    def _evict(self):
+        # The most recently used entry stays even when it alone exceeds the budget
+        while self._bytes > self.max_bytes and len(self._entries) > 1:
+            _, (_, weight) = self._entries.popitem(last=False)
+            self._bytes -= weight
+
+    def stats(self):
+        """Return cache utilization for health checks."""
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses
+            }
@@ -0,0 +1,72 @@
+import json
+from datetime import datetime, timezone
+
+from schema import SCHEMAS, as_epoch_seconds
+
+
+class DeltaBase:
+    """Stored dataset of an account that a delta scrape is merged into.
+
+    The scrape only asks the actor for items newer than the newest stored one
+    (cutoff). Scraped items are written first; mark_seen() records their ids so
+    remaining() can append the stored items they did not replace.
+    """
+
+    def __init__(self, platform, json_path, items):
+        self.platform = platform
+        self.json_path = json_path
+        self.items = items
+        self._get_id = SCHEMAS[platform].getter('id')
+        self._stored_ids = {self.item_id(item) for item in items} - {None}
+        self._seen_ids = set()
+        self.new_item_count = 0
+
+        get_published = SCHEMAS[platform].getter('published')
+        published = [as_epoch_seconds(get_published(item)) for item in items]
+        published = [seconds for seconds in published if seconds is not None]
+        self.cutoff = max(published) if published else None
+
+    @classmethod
+    def load(cls, platform, json_path):
+        """
+        Read the stored dataset at json_path
+
+        Returns:
+            DeltaBase: The stored dataset, or None when it cannot be read or has no dated items
+        """
+        try:
+            with open(json_path, 'r', encoding='utf-8') as f:
+                items = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Cannot use {json_path} for a delta scrape: {str(e)}")
+            return None
+        if not isinstance(items, list):
+            return None
+        base = cls(platform, json_path, [item for item in items if isinstance(item, dict)])
+        if base.cutoff is None:
+            return None
+        return base
+
+    def item_id(self, item):
+        value = self._get_id(item)
+        return None if value is None else str(value)
+
+    def cutoff_iso(self):
+        """Cutoff as an ISO 8601 UTC timestamp, e.g. '2025-04-25T04:08:14Z'."""
+        return datetime.fromtimestamp(self.cutoff, tz=timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+    def mark_seen(self, items):
+        """Record scraped items, which replace stored items with the same id."""
+        for item in items:
+            item_id = self.item_id(item)
+            if item_id is None or item_id in self._seen_ids:
+                continue
+            self._seen_ids.add(item_id)
+            if item_id not in self._stored_ids:
+                self.new_item_count += 1
+
+    def remaining(self):
+        """Stored items that no scraped item replaced, in their stored order."""
+        for item in self.items:
+            if self.item_id(item) not in self._seen_ids:
+                yield item
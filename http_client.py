@@ -0,0 +1,196 @@
+import asyncio
+import json
+import threading
+
+import aiohttp
+
+from config import HTTP_POOL_SIZE, HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUTS
+
+# Transient failures that are retried with exponential backoff
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+MAX_RETRIES = 5
+RETRY_BACKOFF = 1
+
+_session = None
+_session_loop = None
+
+
+class HTTPResponse:
+    """Fully read response, so callers can inspect it after the connection is released."""
+
+    def __init__(self, status_code, body, headers):
+        self.status_code = status_code
+        self.body = body
+        self.headers = headers
+
+    @property
+    def text(self):
+        return self.body.decode('utf-8', errors='replace')
+
+    def json(self):
+        return json.loads(self.body)
+
+
+class _PoolCounters:
+    """Utilization counters for the shared connection pool, fed by aiohttp tracing hooks."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.total_requests = 0
+        self.failed_requests = 0
+
+    async def on_request_start(self, session, context, params):
+        with self._lock:
+            self.in_flight += 1
+            self.total_requests += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+
+    async def on_request_end(self, session, context, params):
+        with self._lock:
+            self.in_flight -= 1
+
+    async def on_request_exception(self, session, context, params):
+        with self._lock:
+            self.in_flight -= 1
+            self.failed_requests += 1
+
+    def trace_config(self):
+        trace = aiohttp.TraceConfig()
+        trace.on_request_start.append(self.on_request_start)
+        trace.on_request_end.append(self.on_request_end)
+        trace.on_request_exception.append(self.on_request_exception)
+        return trace
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'pool_maxsize': HTTP_POOL_SIZE,
+                'in_flight': self.in_flight,
+                'peak_in_flight': self.peak_in_flight,
+                'total_requests': self.total_requests,
+                'failed_requests': self.failed_requests
+            }
+
+
+_counters = _PoolCounters()
+
+
+def get_session():
+    """
+    Return the HTTP session of the running event loop
+
+    aiohttp sessions belong to the loop that created them, so a new session is
+    created when called from a different loop (a CLI run, or the background
+    loop of a freshly forked gunicorn worker). Must be called from a coroutine.
+
+    Returns:
+        aiohttp.ClientSession: Shared session with a pool of kept-alive connections
+    """
+    global _session, _session_loop
+    loop = asyncio.get_running_loop()
+    if _session is None or _session.closed or _session_loop is not loop:
+        # api.apify.com is the only host in practice, so size its pool for
+        # every job making calls at the same time
+        connector = aiohttp.TCPConnector(limit=HTTP_POOL_SIZE, limit_per_host=HTTP_POOL_SIZE)
+        _session = aiohttp.ClientSession(
+            connector=connector,
+            headers={'Connection': 'keep-alive'},
+            trace_configs=[_counters.trace_config()]
+        )
+        _session_loop = loop
+    return _session
+
+
+async def close_session():
+    """Close the session of the running loop, if there is one."""
+    global _session, _session_loop
+    if _session is not None and _session_loop is asyncio.get_running_loop():
+        await _session.close()
+        _session = None
+        _session_loop = None
+
+
+def timeout_for(endpoint, extra_read=0):
+    """
+    Build the timeout for an endpoint kind
+
+    Args:
+        endpoint (str): Key of HTTP_READ_TIMEOUTS, e.g. 'actors', 'start', 'status' or 'dataset'
+        extra_read (float): Seconds added to the read timeout (for long-poll requests)
+
+    Returns:
+        aiohttp.ClientTimeout: Connect and read timeout
+    """
+    read_timeout = HTTP_READ_TIMEOUTS.get(endpoint, HTTP_READ_TIMEOUTS['default'])
+    return aiohttp.ClientTimeout(total=None, sock_connect=HTTP_CONNECT_TIMEOUT, sock_read=read_timeout + extra_read)
+
+
+def _retry_delay(attempt, headers=None):
+    retry_after = (headers or {}).get('Retry-After')
+    if retry_after and retry_after.isdigit():
+        return int(retry_after)
+    return RETRY_BACKOFF * 2 ** attempt
+
+
+async def send_request(session, method, url, timeout, before_attempt=None, **kwargs):
+    """
+    Send a request, retrying connection errors and 429/5xx responses
+
+    Args:
+        session (aiohttp.ClientSession): Session from get_session()
+        method (str): HTTP method
+        url (str): Request URL
+        timeout (aiohttp.ClientTimeout): Timeout from timeout_for()
+        before_attempt (callable): Optional coroutine function awaited before every
+            attempt, retries included (e.g. a rate limiter's acquire_async)
+        **kwargs: Passed on to aiohttp (params, json, ...)
+
+    Returns:
+        HTTPResponse: The last response received
+
+    Raises:
+        aiohttp.ClientError, asyncio.TimeoutError: If every attempt failed without a response
+    """
+    attempt = 0
+    while True:
+        if before_attempt is not None:
+            await before_attempt()
+        try:
+            async with session.request(method, url, timeout=timeout, **kwargs) as response:
+                body = await response.read()
+                result = HTTPResponse(response.status, body, response.headers)
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            if attempt >= MAX_RETRIES:
+                raise
+            await asyncio.sleep(_retry_delay(attempt))
+            attempt += 1
+            continue
+
+        if result.status_code in RETRY_STATUSES and attempt < MAX_RETRIES:
+            await asyncio.sleep(_retry_delay(attempt, result.headers))
+            attempt += 1
+            continue
+        return result
+
+
+def run_sync(coro):
+    """
+    Run a coroutine to completion from synchronous code (CLI entry points)
+
+    The session created for the run is closed before returning. Must not be
+    called from inside a running event loop.
+    """
+    async def runner():
+        try:
+            return await coro
+        finally:
+            await close_session()
+
+    return asyncio.run(runner())
+
+
+def pool_stats():
+    """Return utilization counters of the shared connection pool."""
+    return _counters.snapshot()
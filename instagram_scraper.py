@@ -1,58 +1,308 @@
-import requests
-import json
+import asyncio
 import os
 import time
 import argparse
 import csv
 from datetime import datetime
 import re
-import random
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
 
-def safe_get(obj, key, default=''):
-    """Safely gets a value from a dictionary, handling nested keys and returning a default if not found."""
-    if obj is None:
-        return default
-    
-    # If key contains dots, treat it as a nested lookup
-    if '.' in key:
-        parts = key.split('.')
-        current = obj
-        for part in parts:
-            if isinstance(current, dict) and part in current:
-                current = current[part]
-            else:
-                return default
-        return current
-    
-    # Simple key lookup
-    return obj.get(key, default)
+from apify_api import apify_request, wait_for_run, iter_dataset_pages, DatasetProgress
+from data_store import JsonArrayWriter, record_dataset, finish_dataset
+from http_client import get_session, run_sync
+from summaries import SummaryBuilder
+from columnar import columnar_builder
+from snapshot_store import SnapshotBuilder
+from schema import INSTAGRAM_SCHEMA
+from records import PostRecord, Record
+from reports import ReportTemplate, Section, escape, render_html_report
+from config import INSTAGRAM_KEEP_RAW
 
-def create_session_with_retries():
-    """Create a requests session with retry logic"""
-    session = requests.Session()
-    retries = Retry(
-        total=5,
-        backoff_factor=1,
-        status_forcelist=[429, 500, 502, 503, 504],
-        allowed_methods=["GET", "POST"]
-    )
-    adapter = HTTPAdapter(max_retries=retries)
-    session.mount("https://", adapter)
-    session.mount("http://", adapter)
-    return session
+# Columns of the CSV export: (column, schema field, default)
+CSV_COLUMNS = (
+    ('id', 'id', ''),
+    ('type', 'content_type', ''),
+    ('shortCode', 'short_code', ''),
+    ('caption', 'title', ''),
+    ('commentsCount', 'comments', 0),
+    ('likesCount', 'likes', 0),
+    ('timestamp', 'published', ''),
+    ('ownerUsername', 'owner', ''),
+    ('url', 'url', '')
+)
 
-def run_instagram_scraper(api_token, username):
-    """Run the Instagram scraper using the successful actor and configuration."""
-    session = create_session_with_retries()
-    
+# Values shown for each post in the HTML report
+HTML_COLUMNS = (
+    ('type', 'content_type', 'Post'),
+    ('caption', 'title', ''),
+    ('likes', 'likes', 0),
+    ('comments', 'comments', 0),
+    ('timestamp', 'published', ''),
+    ('username', 'owner', ''),
+    ('url', 'url', '')
+)
+
+csv_row = INSTAGRAM_SCHEMA.row_getter(CSV_COLUMNS)
+html_row = INSTAGRAM_SCHEMA.row_getter(HTML_COLUMNS)
+
+# HTML report page; rows are written straight to the file, see reports.render_html_report.
+# The list view shows the posts newest first, continuing across the pages.
+REPORT_TEMPLATE = ReportTemplate(
+    head="""<!DOCTYPE html>
+<html>
+<head>
+<meta charset='UTF-8'>
+<title>Instagram Data for @$username</title>
+<style>
+:root {
+  --bg-color: #111420;
+  --card-bg: #1e2132;
+  --text-color: #f5f5f5;
+  --primary: #9d4edd;
+  --secondary: #c77dff;
+  --accent1: #ff9e00;
+  --accent2: #ddff00;
+  --muted-text: #a0a0a0;
+  --border-color: #333648;
+}
+body { font-family: 'Segoe UI', Roboto, Arial, sans-serif; margin: 0; padding: 0; background-color: var(--bg-color); color: var(--text-color); }
+.container { max-width: 1200px; margin: 20px auto; background: var(--card-bg); border-radius: 12px; box-shadow: 0 4px 20px rgba(0,0,0,0.2); padding: 25px; }
+h1 { color: var(--primary); margin-bottom: 20px; text-align: center; }
+table { width: 100%; border-collapse: collapse; margin-bottom: 20px; border-radius: 8px; overflow: hidden; }
+th, td { padding: 15px; text-align: left; border-bottom: 1px solid var(--border-color); }
+th { background-color: var(--primary); color: white; font-weight: 600; position: sticky; top: 0; }
+tr:hover { background-color: rgba(157, 78, 221, 0.1); transition: all 0.2s; }
+.caption { max-width: 400px; }
+.stats { display: flex; margin-bottom: 30px; gap: 20px; flex-wrap: wrap; }
+.stat-block { flex: 1; background: var(--card-bg); padding: 20px; border-radius: 12px; text-align: center; border: 1px solid var(--primary); box-shadow: 0 4px 12px rgba(157, 78, 221, 0.2); transition: transform 0.3s, box-shadow 0.3s; }
+.stat-block:hover { transform: translateY(-5px); box-shadow: 0 8px 15px rgba(157, 78, 221, 0.3); }
+.stat-value { font-size: 28px; font-weight: bold; color: var(--accent1); margin-bottom: 10px; }
+.stat-label { font-size: 16px; color: var(--text-color); }
+.tabs { display: flex; margin-bottom: 20px; border-bottom: 1px solid var(--border-color); gap: 10px; }
+.tab { padding: 12px 25px; cursor: pointer; background: none; border: none; font-size: 16px; color: var(--text-color); border-radius: 8px 8px 0 0; transition: all 0.3s; }
+.tab:hover { background-color: rgba(157, 78, 221, 0.2); }
+.tab.active { color: white; background-color: var(--primary); }
+.tab-content { display: none; animation: fadeEffect 0.5s; }
+@keyframes fadeEffect { from {opacity: 0;} to {opacity: 1;} }
+.tab-content.active { display: block; }
+.search-container { margin-bottom: 25px; position: relative; }
+.search-container input { width: 100%; padding: 14px 20px; font-size: 16px; border: 2px solid var(--border-color); border-radius: 8px; background: var(--card-bg); color: var(--text-color); box-sizing: border-box; transition: all 0.3s; }
+.search-container input:focus { outline: none; border-color: var(--secondary); box-shadow: 0 0 0 3px rgba(199, 125, 255, 0.25); }
+.search-container input::placeholder { color: var(--muted-text); }
+.search-container::after { content: '🔍'; position: absolute; right: 15px; top: 50%; transform: translateY(-50%); color: var(--muted-text); font-size: 18px; }
+.list-view { display: flex; flex-direction: column; gap: 20px; }
+.list-item { border: 1px solid var(--border-color); border-radius: 12px; padding: 20px; background: var(--card-bg); transition: all 0.3s; }
+.list-item:hover { transform: translateY(-3px); box-shadow: 0 10px 20px rgba(0,0,0,0.15); border-color: var(--secondary); }
+.list-caption { margin-bottom: 15px; line-height: 1.5; }
+.list-meta { display: flex; flex-wrap: wrap; justify-content: space-between; color: var(--muted-text); font-size: 14px; gap: 10px; }
+.list-meta span, .list-meta a { margin-right: 10px; }
+a { color: var(--accent1); text-decoration: none; transition: color 0.2s; }
+a:hover { color: var(--accent2); text-decoration: none; }
+.tag { display: inline-block; background: var(--primary); color: white; font-size: 12px; padding: 4px 8px; border-radius: 4px; margin-right: 5px; }
+.likes-comments { display: flex; gap: 15px; }
+.likes-comments span { display: flex; align-items: center; }
+.likes-comments span svg { margin-right: 5px; }
+@media (max-width: 768px) {
+  .container { margin: 10px; padding: 15px; }
+  .stats { flex-direction: column; }
+  .tab { padding: 10px 15px; font-size: 14px; }
+  .list-meta { flex-direction: column; }
+}
+</style>
+<script>
+function openTab(evt, tabName) {
+  const tabcontent = document.getElementsByClassName('tab-content');
+  for (let i = 0; i < tabcontent.length; i++) {
+    tabcontent[i].style.display = 'none';
+  }
+  const tablinks = document.getElementsByClassName('tab');
+  for (let i = 0; i < tablinks.length; i++) {
+    tablinks[i].className = tablinks[i].className.replace(' active', '');
+  }
+  document.getElementById(tabName).style.display = 'block';
+  evt.currentTarget.className += ' active';
+  localStorage.setItem('activeInstagramTab', tabName);
+}
+
+function searchTable() {
+  const input = document.getElementById('table-search');
+  const filter = input.value.toUpperCase();
+  const table = document.getElementById('post-table');
+  const tr = table.getElementsByTagName('tr');
+
+  for (let i = 1; i < tr.length; i++) {
+    let found = false;
+    const td = tr[i].getElementsByTagName('td');
+    for (let j = 0; j < td.length; j++) {
+      if (td[j]) {
+        const txtValue = td[j].textContent || td[j].innerText;
+        if (txtValue.toUpperCase().indexOf(filter) > -1) {
+          found = true;
+          break;
+        }
+      }
+    }
+    tr[i].style.display = found ? '' : 'none';
+  }
+}
+
+function searchList() {
+  const input = document.getElementById('list-search');
+  const filter = input.value.toUpperCase();
+  const items = document.getElementsByClassName('list-item');
+
+  for (let i = 0; i < items.length; i++) {
+    const content = items[i].textContent || items[i].innerText;
+    items[i].style.display = content.toUpperCase().indexOf(filter) > -1 ? '' : 'none';
+  }
+}
+
+window.onload = function() {
+  const activeTab = localStorage.getItem('activeInstagramTab') || 'table-view';
+  const tabs = document.getElementsByClassName('tab');
+  for (let i = 0; i < tabs.length; i++) {
+    if (tabs[i].getAttribute('data-tab') === activeTab) {
+      tabs[i].click();
+      break;
+    }
+  }
+  if (!document.querySelector('.tab.active')) {
+    document.querySelector('.tab').click();
+  }
+};
+</script>
+</head>
+<body>
+<div class='container'>
+<h1>Instagram Data for @$username</h1>
+
+<!-- Statistics -->
+<div class='stats'>
+  <div class='stat-block'><div class='stat-value'>$item_count</div><div class='stat-label'>Posts</div></div>
+  <div class='stat-block'><div class='stat-value'>$total_likes</div><div class='stat-label'>Total Likes</div></div>
+  <div class='stat-block'><div class='stat-value'>$total_comments</div><div class='stat-label'>Total Comments</div></div>
+</div>
+
+$page_nav
+
+<!-- Tabs -->
+<div class='tabs'>
+  <button class='tab' data-tab='table-view' onclick="openTab(event, 'table-view')">Table View</button>
+  <button class='tab' data-tab='list-view' onclick="openTab(event, 'list-view')">List View</button>
+</div>
+
+<!-- Table View -->
+<div id='table-view' class='tab-content'>
+  <div class='search-container'>
+    <input type='text' id='table-search' onkeyup="searchTable()" placeholder='Search posts...'>
+  </div>
+  <div style='overflow-x: auto; max-height: 70vh; overflow-y: auto;'>
+  <table id='post-table'>
+    <thead>
+      <tr>
+        <th>Type</th>
+        <th>Caption</th>
+        <th>Likes</th>
+        <th>Comments</th>
+        <th>Date</th>
+        <th>Username</th>
+        <th>Link</th>
+      </tr>
+    </thead>
+    <tbody>
+""",
+    sections=[
+        Section(
+            row="""      <tr>
+        <td>$type</td>
+        <td class='caption'>$caption_preview</td>
+        <td>$likes</td>
+        <td>$comments</td>
+        <td>$date</td>
+        <td><a href='https://instagram.com/$username/' target='_blank'>@$username</a></td>
+        <td><a href='$url' target='_blank'>View</a></td>
+      </tr>
+""",
+            after="""    </tbody>
+  </table>
+  </div>
+</div>
+<div id='list-view' class='tab-content'>
+  <div class='search-container'>
+    <input type='text' id='list-search' onkeyup="searchList()" placeholder='Search posts...'>
+  </div>
+  <div class='list-view'>
+"""
+        ),
+        Section(
+            row="""    <div class='list-item'>
+      <span class='tag'>$type</span>
+      <div class='list-caption'>$caption</div>
+      <div class='list-meta'>
+        <div class='likes-comments'>
+          <span><svg width='16' height='16' viewBox='0 0 24 24' fill='none' xmlns='http://www.w3.org/2000/svg'><path d='M12 21.35l-1.45-1.32C5.4 15.36 2 12.28 2 8.5 2 5.42 4.42 3 7.5 3c1.74 0 3.41.81 4.5 2.09C13.09 3.81 14.76 3 16.5 3 19.58 3 22 5.42 22 8.5c0 3.78-3.4 6.86-8.55 11.54L12 21.35z' fill='var(--accent1)'/></svg> $likes</span>
+          <span><svg width='16' height='16' viewBox='0 0 24 24' fill='none' xmlns='http://www.w3.org/2000/svg'><path d='M21 15a2 2 0 0 1-2 2H7l-4 4V5a2 2 0 0 1 2-2h14a2 2 0 0 1 2 2v10z' fill='var(--secondary)'/></svg> $comments</span>
+        </div>
+        <span>$date</span>
+        <a href='https://instagram.com/$username/' target='_blank'>@$username</a>
+        <a href='$url' target='_blank'>View on Instagram</a>
+      </div>
+    </div>
+""",
+            after="""  </div>
+</div>
+$page_nav
+""",
+            sort_key=lambda row: row['timestamp'],
+            reverse=True
+        )
+    ],
+    foot="""</div>
+</body>
+</html>"""
+)
+
+def format_timestamp(timestamp):
+    """Format an ISO timestamp as 'YYYY-MM-DD HH:MM', other values are returned as they are."""
+    if timestamp and isinstance(timestamp, str):
+        try:
+            return datetime.fromisoformat(timestamp.replace('Z', '+00:00')).strftime("%Y-%m-%d %H:%M")
+        except ValueError:
+            pass
+    return timestamp
+
+def report_row(item):
+    """Escaped values of one post for the HTML report, with the raw timestamp for sorting."""
+    row = html_row(item)
+    caption = escape(row['caption'])
+    return {
+        'type': escape(row['type']),
+        'caption': caption,
+        'caption_preview': caption[:150] + "..." if len(caption) > 150 else caption,
+        'likes': f"{row['likes']:,}",
+        'comments': f"{row['comments']:,}",
+        'date': escape(format_timestamp(row['timestamp'])),
+        'username': escape(row['username']),
+        'url': escape(row['url']),
+        'timestamp': str(row['timestamp'])
+    }
+
+async def start_instagram_run(session, api_token, username, run_info=None, on_progress=None, newer_than=None):
+    """Start the Instagram actor, wait for the run and return its dataset ID (or None on failure).
+    
+    If run_info is a dict it is filled with the run outcome (run_status, timed_out, partial).
+    on_progress(new_items, item_count, percent) is called with raw items while the run is still going.
+    newer_than (ISO 8601 timestamp) asks for posts published after it only.
+    """
+    return await start_instagram_batch_run(session, api_token, [username], run_info, on_progress, newer_than)
+
+async def start_instagram_batch_run(session, api_token, usernames, run_info=None, on_progress=None, newer_than=None):
+    """Start one actor run for one or more usernames and return its dataset ID (or None on failure)."""
     # The actor ID that was successful
     actor_id = "shu8hvrXbJbY3Eb9W"
     
     # The configuration that yielded the most data
     input_config = {
-        "directUrls": [f"https://www.instagram.com/{username}/"],
+        "directUrls": [f"https://www.instagram.com/{username}/" for username in usernames],
         "resultsLimit": 50,  # Reduced from 100 to avoid blocking
         "addParentData": True,
         "expandOwners": True,
@@ -72,15 +322,17 @@ def run_instagram_scraper(api_token, username):
         }
     }
     
-    print(f"Starting Instagram scraper for user: {username}")
-    print(f"Using actor ID: {actor_id}")
+    if newer_than:
+        input_config["onlyPostsNewerThan"] = newer_than
     
-    # Add a random delay before starting
-    time.sleep(random.uniform(1.0, 3.0))
+    print(f"Starting Instagram scraper for user(s): {', '.join(usernames)}")
+    if newer_than:
+        print(f"Delta scrape: only posts newer than {newer_than}")
+    print(f"Using actor ID: {actor_id}")
     
     # Start the actor run
     start_url = f"https://api.apify.com/v2/acts/{actor_id}/runs?token={api_token}"
-    start_response = session.post(start_url, json=input_config)
+    start_response = await apify_request(session, 'POST', start_url, endpoint='start', json=input_config)
     
     if start_response.status_code != 201:
         print(f"❌ Failed to start actor: {start_response.status_code}, {start_response.text}")
@@ -95,47 +347,55 @@ def run_instagram_scraper(api_token, username):
     
     print(f"✅ Actor started, run ID: {run_id}")
     
-    # Poll for run status
-    status_url = f"https://api.apify.com/v2/actor-runs/{run_id}?token={api_token}"
-    max_attempts = 60  # 10 minutes with 10-second intervals
-    
-    for attempt in range(max_attempts):
-        time.sleep(10)  # Wait 10 seconds between checks
-        
-        # Add a bit of randomization to avoid predictable patterns
-        if attempt > 0 and attempt % 5 == 0:
-            time.sleep(random.uniform(2.0, 5.0))
-        
-        status_response = session.get(status_url)
-        if status_response.status_code != 200:
-            print(f"❌ Failed to get run status: {status_response.status_code}")
-            continue
-        
-        status_data = status_response.json()
-        status = status_data.get('data', {}).get('status')
-        
-        print(f"Run status: {status} (attempt {attempt+1}/{max_attempts})")
-        
-        if status in ['SUCCEEDED', 'FAILED', 'TIMED-OUT', 'ABORTED']:
-            break
-    
-    # Even if run failed, try to get any partial data
-    dataset_id = status_data.get('data', {}).get('defaultDatasetId')
+    # Wait for the run to finish, then fetch whatever the dataset holds
+    on_poll = None
+    if on_progress:
+        # resultsLimit applies to every direct URL
+        on_poll = DatasetProgress(session, api_token, input_config.get("resultsLimit") * len(usernames), on_progress)
+    outcome = await wait_for_run(session, api_token, run_id, actor_id, on_poll=on_poll)
+    if run_info is not None:
+        run_info.update(outcome.as_dict())
+    
+    # Even if run failed or timed out, try to get any partial data
+    dataset_id = outcome.dataset_id
     if not dataset_id:
         print("❌ No dataset ID found")
         return None
     
-    # Add delay before requesting data
-    time.sleep(random.uniform(1.0, 3.0))
+    return dataset_id
+
+def get_request_errors(data):
+    """Return the request error messages the actor attaches to the first item."""
+    if data and isinstance(data[0], dict) and 'requestErrorMessages' in data[0]:
+        return data[0]['requestErrorMessages'] or []
+    return []
+
+def print_request_errors(errors):
+    """Print any request error messages for troubleshooting."""
+    if errors and len(errors) > 0:
+        print(f"⚠️ Scraping encountered {len(errors)} request errors:")
+        unique_errors = set(errors)
+        for error in unique_errors:
+            print(f" - {error} ({errors.count(error)} times)")
+
+async def run_instagram_scraper_async(api_token, username, run_info=None):
+    """Run the Instagram scraper using the successful actor and configuration.
     
-    items_url = f"https://api.apify.com/v2/datasets/{dataset_id}/items?token={api_token}"
-    items_response = session.get(items_url)
+    If run_info is a dict it is filled with the run outcome (run_status, timed_out, partial).
+    """
+    session = get_session()
     
-    if items_response.status_code != 200:
-        print(f"❌ Failed to get dataset items: {items_response.status_code}")
+    dataset_id = await start_instagram_run(session, api_token, username, run_info)
+    if not dataset_id:
         return None
     
-    data = items_response.json()
+    data = []
+    try:
+        async for page in iter_dataset_pages(session, api_token, dataset_id):
+            data.extend(page)
+    except RuntimeError as e:
+        print(f"❌ {str(e)}")
+        return None
     
     # Return empty list instead of None if no data was retrieved
     if not data:
@@ -144,17 +404,179 @@ def run_instagram_scraper(api_token, username):
         
     print(f"✅ Retrieved {len(data)} items from the dataset")
     
-    # Print any request error messages for troubleshooting
-    if data and isinstance(data[0], dict) and 'requestErrorMessages' in data[0]:
-        errors = data[0]['requestErrorMessages']
-        if errors and len(errors) > 0:
-            print(f"⚠️ Scraping encountered {len(errors)} request errors:")
-            unique_errors = set(errors)
-            for error in unique_errors:
-                print(f" - {error} ({errors.count(error)} times)")
+    print_request_errors(get_request_errors(data))
     
     return data
 
+def run_instagram_scraper(api_token, username, run_info=None):
+    """Blocking wrapper around run_instagram_scraper_async for the command line."""
+    return run_sync(run_instagram_scraper_async(api_token, username, run_info))
+
+def dataset_sidecars(username):
+    """Aggregates saved with a streamed dataset: summary, columnar copy (if enabled) and history snapshot."""
+    return [SummaryBuilder('instagram', username), columnar_builder('instagram', username), SnapshotBuilder('instagram', username)]
+
+async def stream_instagram_data(api_token, username, output_folder, run_info=None, on_progress=None, delta_base=None):
+    """
+    Run the Instagram scraper and write processed items to disk page by page
+    
+    Each dataset page is processed and appended to the JSON file as soon as it
+    arrives, so memory use is bounded by the page size instead of the dataset size.
+    File writes run in worker threads so other jobs on the loop keep going.
+    
+    With a delta_base only posts newer than the stored dataset are scraped, and
+    the stored posts they do not replace are appended after them.
+    
+    Args:
+        api_token (str): Apify API token
+        username (str): Instagram username to scrape
+        output_folder (str): Folder that receives <username>.json
+        run_info (dict): Optional dict filled with the run outcome
+        on_progress (callable): Optional callback for raw items collected while the run is going
+        delta_base (delta.DeltaBase): Stored dataset of the account to merge new posts into
+    
+    Returns:
+        dict: json_path, item_count and error_messages (json_path is None when
+              no items were scraped), plus new_item_count for delta scrapes, or
+              None if the run or the download failed
+    """
+    session = get_session()
+    
+    newer_than = delta_base.cutoff_iso() if delta_base else None
+    dataset_id = await start_instagram_run(session, api_token, username, run_info, on_progress, newer_than)
+    if not dataset_id:
+        return None
+    
+    writer = JsonArrayWriter(os.path.join(output_folder, f"{username}.json"),
+                             sidecars=dataset_sidecars(username))
+    error_messages = None
+    try:
+        async for page in iter_dataset_pages(session, api_token, dataset_id):
+            if error_messages is None:
+                error_messages = get_request_errors(page)
+            items = process_instagram_data(page, username)
+            if delta_base:
+                # Placeholder items without a post id (e.g. "no posts found") are not merged
+                items = [item for item in items if delta_base.item_id(item) is not None]
+                delta_base.mark_seen(items)
+            await asyncio.to_thread(writer.write_many, items)
+        
+        if writer.count and delta_base:
+            # Stored items are kept in the dataset but not sampled again for the history
+            await asyncio.to_thread(writer.write_many, delta_base.remaining(), True)
+    except RuntimeError as e:
+        print(f"❌ {str(e)}")
+        writer.abort()
+        return None
+    except Exception:
+        writer.abort()
+        raise
+    
+    if writer.count == 0 and delta_base:
+        writer.abort()
+        print(f"✅ No new posts since {newer_than}, keeping {delta_base.json_path}")
+        return {'json_path': delta_base.json_path, 'item_count': len(delta_base.items),
+                'error_messages': error_messages or [], 'new_item_count': 0}
+    
+    if writer.count == 0:
+        writer.abort()
+        print("⚠️ No data items were scraped")
+        return {'json_path': None, 'item_count': 0, 'error_messages': []}
+    
+    await asyncio.to_thread(finish_dataset, writer, username)
+    print(f"✅ Saved {writer.count} items to {writer.path}")
+    print_request_errors(error_messages)
+    
+    result = {'json_path': writer.path, 'item_count': writer.count, 'error_messages': error_messages or []}
+    if delta_base:
+        result['new_item_count'] = delta_base.new_item_count
+    return result
+
+def owner_username_of(item):
+    """Return the lower-cased username an item belongs to, or None."""
+    owner = item.get('ownerUsername')
+    if owner:
+        return owner.lower()
+    # Error items carry no owner, only the URL they were scraped from
+    match = re.search(r'instagram\.com/([^/?#]+)', item.get('inputUrl') or '')
+    return match.group(1).lower() if match else None
+
+async def stream_instagram_batch(api_token, usernames, run_info=None):
+    """
+    Scrape several accounts with one actor run and save each account separately
+    
+    Items are assigned to an account by ownerUsername. Every account gets its
+    own instagram_data/<username>_<timestamp> folder, the same layout a
+    single-account scrape produces.
+    
+    Args:
+        api_token (str): Apify API token
+        usernames (list): Instagram usernames to scrape
+        run_info (dict): Optional dict filled with the run outcome
+    
+    Returns:
+        dict: Username -> {'json_path', 'item_count', 'error_messages'} (json_path is
+              None for accounts without items), or None if the run or the download failed
+    """
+    session = get_session()
+    
+    # Lower-cased username -> username as written in the request
+    accounts = {username.lower(): username for username in usernames}
+    
+    dataset_id = await start_instagram_batch_run(session, api_token, usernames, run_info)
+    if not dataset_id:
+        return None
+    
+    writers = {}
+    error_messages = {}
+    unmatched = 0
+    try:
+        async for page in iter_dataset_pages(session, api_token, dataset_id):
+            by_account = {}
+            for item in page:
+                key = owner_username_of(item) if isinstance(item, dict) else None
+                if key not in accounts:
+                    if len(accounts) != 1:
+                        unmatched += 1
+                        continue
+                    key = next(iter(accounts))
+                by_account.setdefault(key, []).append(item)
+            
+            for key, items in by_account.items():
+                username = accounts[key]
+                if key not in writers:
+                    error_messages[key] = get_request_errors(items)
+                    output_folder = create_output_folder(username)
+                    writers[key] = JsonArrayWriter(os.path.join(output_folder, f"{username}.json"),
+                                                   sidecars=dataset_sidecars(username))
+                await asyncio.to_thread(writers[key].write_many, process_instagram_data(items, username))
+    except RuntimeError as e:
+        print(f"❌ {str(e)}")
+        for writer in writers.values():
+            writer.abort()
+        return None
+    except Exception:
+        for writer in writers.values():
+            writer.abort()
+        raise
+    
+    if unmatched:
+        print(f"⚠️ Skipped {unmatched} items that did not belong to any requested account")
+    
+    results = {}
+    for key, username in accounts.items():
+        writer = writers.get(key)
+        if writer is None:
+            print(f"⚠️ No data items were scraped for {username}")
+            results[username] = {'json_path': None, 'item_count': 0, 'error_messages': []}
+            continue
+        await asyncio.to_thread(finish_dataset, writer, username)
+        print(f"✅ Saved {writer.count} items to {writer.path}")
+        print_request_errors(error_messages[key])
+        results[username] = {'json_path': writer.path, 'item_count': writer.count, 'error_messages': error_messages[key]}
+    
+    return results
+
 def create_output_folder(username):
     """Create output folder for a specific username."""
     timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
@@ -162,35 +584,16 @@ def create_output_folder(username):
     os.makedirs(folder_path, exist_ok=True)
     return folder_path
 
-def process_instagram_data(data, username):
-    """Process Instagram data to ensure username is included in all items."""
-    processed_data = []
+def process_instagram_data(data, username, keep_raw=INSTAGRAM_KEEP_RAW):
+    """Turn raw Instagram items into PostRecords that all carry the username."""
+    # Timestamp for when this data was scraped, shared by the whole batch
+    scrape_date = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     
     print(f"Processing Instagram data for @{username}")
-    for item in data:
-        if not isinstance(item, dict):
-            continue
-            
-        # Create a copy of the item to modify
-        processed_item = item.copy()
-        
-        # Add username to every item if not already present
-        if 'username' not in processed_item:
-            processed_item['username'] = username
-            
-        # Ensure owner username is consistent
-        if 'ownerUsername' not in processed_item or not processed_item['ownerUsername']:
-            processed_item['ownerUsername'] = username
-            
-        # Add platform identifier
-        processed_item['platform'] = 'instagram'
-        
-        # Add timestamp for when this data was scraped
-        processed_item['scrape_date'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        
-        processed_data.append(processed_item)
-    
-    return processed_data
+    return [
+        PostRecord.from_payload(item, username, scrape_date, keep_raw)
+        for item in data if isinstance(item, dict)
+    ]
 
 def save_data(data, folder_path, filename="instagram_data", formats=None):
     """Save data to JSON, CSV, and HTML formats."""
@@ -202,35 +605,20 @@ def save_data(data, folder_path, filename="instagram_data", formats=None):
     
     results = {}
     
-    # Save JSON data
+    # Save JSON data, serialized straight from the records
     if "json" in formats:
         json_path = os.path.join(folder_path, f"{filename}.json")
-        with open(json_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        with JsonArrayWriter(json_path, sidecars=dataset_sidecars(filename) if data else ()) as writer:
+            writer.write_many(data)
+        if writer.count:
+            record_dataset(os.path.dirname(folder_path), filename, json_path, writer.count, writer.preview)
         print(f"✅ Saved JSON data to {json_path}")
         results["json"] = json_path
     
     # Save as CSV
     if "csv" in formats:
         # Flatten the data for CSV (extract common fields)
-        flattened_data = []
-        for item in data:
-            if not isinstance(item, dict):
-                continue
-                
-            flat_item = {}
-            # Extract common fields
-            flat_item["id"] = item.get("id", "")
-            flat_item["type"] = item.get("type", "")
-            flat_item["shortCode"] = item.get("shortCode", "")
-            flat_item["caption"] = item.get("caption", "")
-            flat_item["commentsCount"] = item.get("commentsCount", 0)
-            flat_item["likesCount"] = item.get("likesCount", 0)
-            flat_item["timestamp"] = item.get("timestamp", "")
-            flat_item["ownerUsername"] = item.get("ownerUsername", "")
-            flat_item["url"] = item.get("url", "")
-            
-            flattened_data.append(flat_item)
+        flattened_data = [csv_row(item) for item in data if isinstance(item, (dict, Record))]
         
         # Write to CSV
         if flattened_data:
@@ -249,278 +637,18 @@ def save_data(data, folder_path, filename="instagram_data", formats=None):
             print(f"Starting HTML generation to {html_path}...")
             
             # Prepare data for HTML
-            total_likes = sum(item.get('likesCount', 0) for item in data 
-                             if isinstance(item, dict) and isinstance(item.get('likesCount', 0), (int, float)))
-            total_comments = sum(item.get('commentsCount', 0) for item in data 
-                                if isinstance(item, dict) and isinstance(item.get('commentsCount', 0), (int, float)))
-            
-            # Create HTML content with dark theme
-            html = [
-                "<!DOCTYPE html>",
-                "<html>",
-                "<head>",
-                "<meta charset='UTF-8'>",
-                f"<title>Instagram Data for @{filename}</title>",
-                "<style>",
-                ":root {",
-                "  --bg-color: #111420;",
-                "  --card-bg: #1e2132;",
-                "  --text-color: #f5f5f5;",
-                "  --primary: #9d4edd;",
-                "  --secondary: #c77dff;",
-                "  --accent1: #ff9e00;",
-                "  --accent2: #ddff00;",
-                "  --muted-text: #a0a0a0;",
-                "  --border-color: #333648;",
-                "}",
-                "body { font-family: 'Segoe UI', Roboto, Arial, sans-serif; margin: 0; padding: 0; background-color: var(--bg-color); color: var(--text-color); }",
-                ".container { max-width: 1200px; margin: 20px auto; background: var(--card-bg); border-radius: 12px; box-shadow: 0 4px 20px rgba(0,0,0,0.2); padding: 25px; }",
-                "h1 { color: var(--primary); margin-bottom: 20px; text-align: center; }",
-                "table { width: 100%; border-collapse: collapse; margin-bottom: 20px; border-radius: 8px; overflow: hidden; }",
-                "th, td { padding: 15px; text-align: left; border-bottom: 1px solid var(--border-color); }",
-                "th { background-color: var(--primary); color: white; font-weight: 600; position: sticky; top: 0; }",
-                "tr:hover { background-color: rgba(157, 78, 221, 0.1); transition: all 0.2s; }",
-                ".caption { max-width: 400px; }",
-                ".stats { display: flex; margin-bottom: 30px; gap: 20px; flex-wrap: wrap; }",
-                ".stat-block { flex: 1; background: var(--card-bg); padding: 20px; border-radius: 12px; text-align: center; border: 1px solid var(--primary); box-shadow: 0 4px 12px rgba(157, 78, 221, 0.2); transition: transform 0.3s, box-shadow 0.3s; }",
-                ".stat-block:hover { transform: translateY(-5px); box-shadow: 0 8px 15px rgba(157, 78, 221, 0.3); }",
-                ".stat-value { font-size: 28px; font-weight: bold; color: var(--accent1); margin-bottom: 10px; }",
-                ".stat-label { font-size: 16px; color: var(--text-color); }",
-                ".tabs { display: flex; margin-bottom: 20px; border-bottom: 1px solid var(--border-color); gap: 10px; }",
-                ".tab { padding: 12px 25px; cursor: pointer; background: none; border: none; font-size: 16px; color: var(--text-color); border-radius: 8px 8px 0 0; transition: all 0.3s; }",
-                ".tab:hover { background-color: rgba(157, 78, 221, 0.2); }",
-                ".tab.active { color: white; background-color: var(--primary); }",
-                ".tab-content { display: none; animation: fadeEffect 0.5s; }",
-                "@keyframes fadeEffect { from {opacity: 0;} to {opacity: 1;} }",
-                ".tab-content.active { display: block; }",
-                ".search-container { margin-bottom: 25px; position: relative; }",
-                ".search-container input { width: 100%; padding: 14px 20px; font-size: 16px; border: 2px solid var(--border-color); border-radius: 8px; background: var(--card-bg); color: var(--text-color); box-sizing: border-box; transition: all 0.3s; }",
-                ".search-container input:focus { outline: none; border-color: var(--secondary); box-shadow: 0 0 0 3px rgba(199, 125, 255, 0.25); }",
-                ".search-container input::placeholder { color: var(--muted-text); }",
-                ".search-container::after { content: '🔍'; position: absolute; right: 15px; top: 50%; transform: translateY(-50%); color: var(--muted-text); font-size: 18px; }",
-                ".list-view { display: flex; flex-direction: column; gap: 20px; }",
-                ".list-item { border: 1px solid var(--border-color); border-radius: 12px; padding: 20px; background: var(--card-bg); transition: all 0.3s; }",
-                ".list-item:hover { transform: translateY(-3px); box-shadow: 0 10px 20px rgba(0,0,0,0.15); border-color: var(--secondary); }",
-                ".list-caption { margin-bottom: 15px; line-height: 1.5; }",
-                ".list-meta { display: flex; flex-wrap: wrap; justify-content: space-between; color: var(--muted-text); font-size: 14px; gap: 10px; }",
-                ".list-meta span, .list-meta a { margin-right: 10px; }",
-                "a { color: var(--accent1); text-decoration: none; transition: color 0.2s; }",
-                "a:hover { color: var(--accent2); text-decoration: none; }",
-                ".tag { display: inline-block; background: var(--primary); color: white; font-size: 12px; padding: 4px 8px; border-radius: 4px; margin-right: 5px; }",
-                ".likes-comments { display: flex; gap: 15px; }",
-                ".likes-comments span { display: flex; align-items: center; }",
-                ".likes-comments span svg { margin-right: 5px; }",
-                "@media (max-width: 768px) {",
-                "  .container { margin: 10px; padding: 15px; }",
-                "  .stats { flex-direction: column; }",
-                "  .tab { padding: 10px 15px; font-size: 14px; }",
-                "  .list-meta { flex-direction: column; }",
-                "}",
-                "</style>",
-                "<script>",
-                "function openTab(evt, tabName) {",
-                "  const tabcontent = document.getElementsByClassName('tab-content');",
-                "  for (let i = 0; i < tabcontent.length; i++) {",
-                "    tabcontent[i].style.display = 'none';",
-                "  }",
-                "  const tablinks = document.getElementsByClassName('tab');",
-                "  for (let i = 0; i < tablinks.length; i++) {",
-                "    tablinks[i].className = tablinks[i].className.replace(' active', '');",
-                "  }",
-                "  document.getElementById(tabName).style.display = 'block';",
-                "  evt.currentTarget.className += ' active';",
-                "  localStorage.setItem('activeInstagramTab', tabName);",
-                "}",
-                "",
-                "function searchTable() {",
-                "  const input = document.getElementById('table-search');",
-                "  const filter = input.value.toUpperCase();",
-                "  const table = document.getElementById('post-table');",
-                "  const tr = table.getElementsByTagName('tr');",
-                "",
-                "  for (let i = 1; i < tr.length; i++) {",
-                "    let found = false;",
-                "    const td = tr[i].getElementsByTagName('td');",
-                "    for (let j = 0; j < td.length; j++) {",
-                "      if (td[j]) {",
-                "        const txtValue = td[j].textContent || td[j].innerText;",
-                "        if (txtValue.toUpperCase().indexOf(filter) > -1) {",
-                "          found = true;",
-                "          break;",
-                "        }",
-                "      }",
-                "    }",
-                "    tr[i].style.display = found ? '' : 'none';",
-                "  }",
-                "}",
-                "",
-                "function searchList() {",
-                "  const input = document.getElementById('list-search');",
-                "  const filter = input.value.toUpperCase();",
-                "  const items = document.getElementsByClassName('list-item');",
-                "",
-                "  for (let i = 0; i < items.length; i++) {",
-                "    const content = items[i].textContent || items[i].innerText;",
-                "    items[i].style.display = content.toUpperCase().indexOf(filter) > -1 ? '' : 'none';",
-                "  }",
-                "}",
-                "",
-                "window.onload = function() {",
-                "  const activeTab = localStorage.getItem('activeInstagramTab') || 'table-view';",
-                "  const tabs = document.getElementsByClassName('tab');",
-                "  for (let i = 0; i < tabs.length; i++) {",
-                "    if (tabs[i].getAttribute('data-tab') === activeTab) {",
-                "      tabs[i].click();",
-                "      break;",
-                "    }",
-                "  }",
-                "  if (!document.querySelector('.tab.active')) {",
-                "    document.querySelector('.tab').click();",
-                "  }",
-                "};",
-                "</script>",
-                "</head>",
-                "<body>",
-                "<div class='container'>",
-                f"<h1>Instagram Data for @{filename}</h1>",
-                "",
-                "<!-- Statistics -->",
-                "<div class='stats'>",
-                f"  <div class='stat-block'><div class='stat-value'>{len(data)}</div><div class='stat-label'>Posts</div></div>",
-                f"  <div class='stat-block'><div class='stat-value'>{total_likes:,}</div><div class='stat-label'>Total Likes</div></div>",
-                f"  <div class='stat-block'><div class='stat-value'>{total_comments:,}</div><div class='stat-label'>Total Comments</div></div>",
-                "</div>",
-                "",
-                "<!-- Tabs -->",
-                "<div class='tabs'>",
-                "  <button class='tab' data-tab='table-view' onclick=\"openTab(event, 'table-view')\">Table View</button>",
-                "  <button class='tab' data-tab='list-view' onclick=\"openTab(event, 'list-view')\">List View</button>",
-                "</div>",
-                "",
-                "<!-- Table View -->",
-                "<div id='table-view' class='tab-content'>",
-                "  <div class='search-container'>",
-                "    <input type='text' id='table-search' onkeyup=\"searchTable()\" placeholder='Search posts...'>",
-                "  </div>",
-                "  <div style='overflow-x: auto; max-height: 70vh; overflow-y: auto;'>",
-                "  <table id='post-table'>",
-                "    <thead>",
-                "      <tr>",
-                "        <th>Type</th>",
-                "        <th>Caption</th>",
-                "        <th>Likes</th>",
-                "        <th>Comments</th>",
-                "        <th>Date</th>",
-                "        <th>Username</th>",
-                "        <th>Link</th>",
-                "      </tr>",
-                "    </thead>",
-                "    <tbody>"
-            ]
-            
-            # Add table rows
-            for item in data:
-                if not isinstance(item, dict):
-                    continue
-                
-                # Get values
-                post_type = item.get("type", "Post")
-                caption = item.get("caption", "")
-                likes = item.get("likesCount", 0)
-                comments = item.get("commentsCount", 0)
-                timestamp = item.get("timestamp", "")
-                username = item.get("ownerUsername", "")
-                url = item.get("url", "")
-                
-                # Format values
-                safe_caption = caption.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
-                if len(safe_caption) > 150:
-                    safe_caption = safe_caption[:150] + "..."
-                
-                # Format date
-                formatted_date = timestamp
-                if timestamp and isinstance(timestamp, str):
-                    try:
-                        dt = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
-                        formatted_date = dt.strftime("%Y-%m-%d %H:%M")
-                    except:
-                        pass
-                
-                # Add table row
-                html.append("      <tr>")
-                html.append(f"        <td>{post_type}</td>")
-                html.append(f"        <td class='caption'>{safe_caption}</td>")
-                html.append(f"        <td>{likes:,}</td>")
-                html.append(f"        <td>{comments:,}</td>")
-                html.append(f"        <td>{formatted_date}</td>")
-                html.append(f"        <td><a href='https://instagram.com/{username}/' target='_blank'>@{username}</a></td>")
-                html.append(f"        <td><a href='{url}' target='_blank'>View</a></td>")
-                html.append("      </tr>")
-            
-            html.append("    </tbody>")
-            html.append("  </table>")
-            html.append("  </div>")
-            html.append("</div>")
-            
-            # List View - more efficient version
-            html.append("<div id='list-view' class='tab-content'>")
-            html.append("  <div class='search-container'>")
-            html.append("    <input type='text' id='list-search' onkeyup=\"searchList()\" placeholder='Search posts...'>")
-            html.append("  </div>")
-            html.append("  <div class='list-view'>")
-            
-            # Filter and sort items more efficiently
-            valid_items = [item for item in data if isinstance(item, dict)]
-            sorted_items = sorted(valid_items, key=lambda x: x.get('timestamp', ''), reverse=True)
-            
-            # Add list items
-            for item in sorted_items:
-                caption = item.get("caption", "")
-                likes = item.get("likesCount", 0)
-                comments = item.get("commentsCount", 0)
-                timestamp = item.get("timestamp", "")
-                username = item.get("ownerUsername", "")
-                url = item.get("url", "")
-                post_type = item.get("type", "Post")
-                
-                # Format values
-                safe_caption = caption.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
-                
-                # Format date
-                formatted_date = timestamp
-                if timestamp and isinstance(timestamp, str):
-                    try:
-                        dt = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
-                        formatted_date = dt.strftime("%Y-%m-%d %H:%M")
-                    except:
-                        pass
-                
-                html.append("    <div class='list-item'>")
-                html.append(f"      <span class='tag'>{post_type}</span>")
-                html.append(f"      <div class='list-caption'>{safe_caption}</div>")
-                html.append("      <div class='list-meta'>")
-                html.append("        <div class='likes-comments'>")
-                html.append(f"          <span><svg width='16' height='16' viewBox='0 0 24 24' fill='none' xmlns='http://www.w3.org/2000/svg'><path d='M12 21.35l-1.45-1.32C5.4 15.36 2 12.28 2 8.5 2 5.42 4.42 3 7.5 3c1.74 0 3.41.81 4.5 2.09C13.09 3.81 14.76 3 16.5 3 19.58 3 22 5.42 22 8.5c0 3.78-3.4 6.86-8.55 11.54L12 21.35z' fill='var(--accent1)'/></svg> {likes:,}</span>")
-                html.append(f"          <span><svg width='16' height='16' viewBox='0 0 24 24' fill='none' xmlns='http://www.w3.org/2000/svg'><path d='M21 15a2 2 0 0 1-2 2H7l-4 4V5a2 2 0 0 1 2-2h14a2 2 0 0 1 2 2v10z' fill='var(--secondary)'/></svg> {comments:,}</span>")
-                html.append("        </div>")
-                html.append(f"        <span>{formatted_date}</span>")
-                html.append(f"        <a href='https://instagram.com/{username}/' target='_blank'>@{username}</a>")
-                html.append(f"        <a href='{url}' target='_blank'>View on Instagram</a>")
-                html.append("      </div>")
-                html.append("    </div>")
-            
-            html.append("  </div>")
-            html.append("</div>")
-            
-            # Close HTML
-            html.append("</div>")
-            html.append("</body>")
-            html.append("</html>")
+            items = [item for item in data if isinstance(item, (dict, Record))]
+            get_likes = INSTAGRAM_SCHEMA.getter('likes', 0)
+            get_comments = INSTAGRAM_SCHEMA.getter('comments', 0)
+            context = {
+                'username': escape(filename),
+                'item_count': len(data),
+                'total_likes': f"{sum(get_likes(item) for item in items):,}",
+                'total_comments': f"{sum(get_comments(item) for item in items):,}"
+            }
+            pages = render_html_report(html_path, REPORT_TEMPLATE, context, items, report_row)
             
-            # Write HTML to file
-            with open(html_path, 'w', encoding='utf-8') as f:
-                f.write("\n".join(html))
-            print(f"✅ Saved HTML Table to {html_path}")
+            print(f"✅ Saved HTML Table to {html_path} ({len(pages)} page{'s' if len(pages) != 1 else ''})")
             results["html"] = html_path
             
         except Exception as e:
@@ -0,0 +1,50 @@
+import asyncio
+import threading
+import time
+
+
+class TokenBucket:
+    """Thread-safe token bucket limiter.
+
+    Tokens refill continuously at `rate` per second up to `burst`.
+    acquire_async() returns immediately while tokens are available, so an idle
+    system adds no latency, and only waits when callers exceed the configured rate.
+    """
+
+    def __init__(self, rate, burst):
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _take(self, tokens):
+        # Returns 0 when the tokens were taken, otherwise the seconds to wait
+        with self._lock:
+            self._refill(time.monotonic())
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return 0
+            return (tokens - self._tokens) / self.rate
+
+    async def acquire_async(self, tokens=1):
+        """
+        Take tokens from the bucket, yielding to the event loop until they are available
+
+        Args:
+            tokens (int): Number of tokens to take
+
+        Returns:
+            float: Seconds spent waiting
+        """
+        waited = 0.0
+        while True:
+            delay = self._take(tokens)
+            if not delay:
+                return waited
+            await asyncio.sleep(delay)
+            waited += delay
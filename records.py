@@ -0,0 +1,136 @@
+from schema import MISSING, YOUTUBE_PAYLOAD_SCHEMA
+
+
+class Record:
+    """Compact item of a scrape, one slot per field instead of a dict per item.
+
+    Fields a payload does not have stay unset and are left out of to_dict(),
+    which gives the JSON written to datasets. get() reads fields by their
+    saved name, so schema getters and exporters work on records and on
+    dicts loaded from disk alike. The actor payload is kept in raw only when
+    asked for.
+    """
+
+    __slots__ = ('raw',)
+    FIELDS = ()
+
+    def get(self, key, default=None):
+        if key in self.FIELDS:
+            return getattr(self, key, default)
+        return default
+
+    def to_dict(self):
+        item = {}
+        for name in self.FIELDS:
+            value = getattr(self, name, MISSING)
+            if value is not MISSING:
+                item[name] = value
+        return item
+
+
+class VideoRecord(Record):
+    """Standardized YouTube video or channel item."""
+
+    FIELDS = ('channel_name', 'channel_owner', 'channel_handle', 'platform', 'scrape_date') + tuple(
+        field.name for field in YOUTUBE_PAYLOAD_SCHEMA.fields
+    )
+    __slots__ = FIELDS
+
+    @classmethod
+    def from_payload(cls, item, base, keep_raw=False):
+        """
+        Build a record from a raw actor item
+
+        Args:
+            item (dict): Raw item of the YouTube actor
+            base (dict): Fields shared by the whole batch (channel identity, scrape date)
+            keep_raw (bool): Keep the actor payload, saved under "raw"
+
+        Returns:
+            VideoRecord: The standardized video
+        """
+        record = cls()
+        for name, value in base.items():
+            setattr(record, name, value)
+        for name, access in YOUTUBE_PAYLOAD_SCHEMA.plan(item):
+            value = access(item)
+            if value is not MISSING:
+                setattr(record, name, value)
+        if keep_raw:
+            record.raw = item
+        return record
+
+    def to_dict(self):
+        item = Record.to_dict(self)
+        raw = getattr(self, 'raw', None)
+        if raw is not None:
+            item['raw'] = raw
+        return item
+
+
+class PostRecord(Record):
+    """Instagram post, holding the fields the dashboard reads.
+
+    With the raw payload kept, every actor field is saved and the slots only
+    hold the fields added by processing.
+    """
+
+    # Actor fields saved without the raw payload, in output order
+    PAYLOAD_FIELDS = (
+        'inputUrl', 'id', 'type', 'shortCode', 'caption', 'hashtags', 'url', 'commentsCount',
+        'firstComment', 'latestComments', 'displayUrl', 'videoUrl', 'childPosts', 'likesCount',
+        'videoViewCount', 'videoPlayCount', 'timestamp', 'ownerUsername', 'error', 'errorDescription'
+    )
+    FIELDS = PAYLOAD_FIELDS + ('username', 'platform', 'scrape_date')
+    __slots__ = FIELDS
+
+    @classmethod
+    def from_payload(cls, item, username, scrape_date, keep_raw=False):
+        """
+        Build a record from a raw actor item
+
+        Args:
+            item (dict): Raw item of the Instagram actor
+            username (str): Account the item was scraped for
+            scrape_date (str): When the batch was scraped
+            keep_raw (bool): Keep every actor field instead of PAYLOAD_FIELDS
+
+        Returns:
+            PostRecord: The processed post
+        """
+        record = cls()
+        if keep_raw:
+            record.raw = item
+        else:
+            for name in cls.PAYLOAD_FIELDS:
+                if name in item:
+                    setattr(record, name, item[name])
+        record.username = item.get('username', username)
+        # Ensure owner username is consistent
+        record.ownerUsername = item.get('ownerUsername') or username
+        record.platform = 'instagram'
+        record.scrape_date = scrape_date
+        return record
+
+    def get(self, key, default=None):
+        value = getattr(self, key, MISSING) if key in self.FIELDS else MISSING
+        if value is not MISSING:
+            return value
+        raw = getattr(self, 'raw', None)
+        return default if raw is None else raw.get(key, default)
+
+    def to_dict(self):
+        raw = getattr(self, 'raw', None)
+        if raw is None:
+            return Record.to_dict(self)
+        item = dict(raw)
+        item['username'] = self.username
+        item['ownerUsername'] = self.ownerUsername
+        item['platform'] = self.platform
+        item['scrape_date'] = self.scrape_date
+        return item
+
+
+def as_dict(item):
+    """The JSON form of a record; dicts are returned as they are."""
+    return item.to_dict() if isinstance(item, Record) else item
@@ -0,0 +1,115 @@
+import html
+import math
+import os
+from string import Template
+
+from config import HTML_REPORT_PAGE_SIZE
+
+
+class Section:
+    """One row loop of a report page.
+
+    row is rendered once per row; after closes the section. With sort_key the
+    whole report is ordered by it instead of the dataset order before it is
+    split into pages, so page 2 continues where page 1 ended.
+    """
+
+    def __init__(self, row, after='', sort_key=None, reverse=False):
+        self.row = Template(row)
+        self.after = Template(after)
+        self.sort_key = sort_key
+        self.reverse = reverse
+
+
+class ReportTemplate:
+    """HTML page split around its row loops: head, sections, foot.
+
+    Templates use string.Template placeholders ($name), so the CSS and
+    JavaScript in them need no brace escaping. head, foot and the section
+    closings see the report context plus $page_nav; rows see their own values.
+    """
+
+    def __init__(self, head, sections, foot=''):
+        self.head = Template(head)
+        self.sections = sections
+        self.foot = Template(foot)
+
+
+def escape(value):
+    """Text of a value, escaped for HTML element content and quoted attributes."""
+    return html.escape('' if value is None else str(value), quote=True)
+
+
+def report_page_path(path, number):
+    """Path of a report page: the first page is path itself, later ones <name>.page-<n>.html."""
+    if number == 1:
+        return path
+    base = path[:-len('.html')] if path.endswith('.html') else path
+    return f"{base}.page-{number}.html"
+
+
+def page_nav(path, number, page_count):
+    """Links to the previous and next page, or '' for a single-page report."""
+    if page_count <= 1:
+        return ''
+    links = [f"<span>Page {number} of {page_count}</span>"]
+    if number > 1:
+        links.append(f"<a href='{escape(os.path.basename(report_page_path(path, number - 1)))}'>&lsaquo; Previous</a>")
+    if number < page_count:
+        links.append(f"<a href='{escape(os.path.basename(report_page_path(path, number + 1)))}'>Next &rsaquo;</a>")
+    return "<div class='page-nav' style='display: flex; gap: 15px; justify-content: center; margin: 15px 0;'>" + " ".join(links) + "</div>"
+
+
+def render_html_report(path, template, context, items, render_row, page_size=None):
+    """
+    Write a report, streaming rows straight into the page files
+
+    Only one page of rows is rendered at a time, and a report with more than
+    page_size rows is split into linked pages, so large datasets render in
+    bounded memory and linear time. Sections with a sort_key are ordered over
+    all items first, keeping only the sort keys and positions.
+
+    Args:
+        path (str): Path of the first page
+        template (ReportTemplate): Page template
+        context (dict): Values for the head, foot and section closings (already escaped)
+        items (list): Dataset items, in dataset order
+        render_row (callable): Turns an item into its row dict of escaped values
+        page_size (int): Rows per page, HTML_REPORT_PAGE_SIZE by default
+
+    Returns:
+        list: Paths of the written pages
+    """
+    page_size = page_size or HTML_REPORT_PAGE_SIZE
+    page_count = max(1, math.ceil(len(items) / page_size))
+    orders = {}
+    for section in template.sections:
+        if section.sort_key is not None:
+            keys = [section.sort_key(render_row(item)) for item in items]
+            orders[id(section)] = sorted(range(len(items)), key=keys.__getitem__, reverse=section.reverse)
+    paths = []
+    for number in range(1, page_count + 1):
+        start = (number - 1) * page_size
+        end = start + page_size
+        page_rows = None
+        page_context = dict(context, page_nav=page_nav(path, number, page_count))
+        page_path = report_page_path(path, number)
+        tmp_path = f"{page_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(template.head.substitute(page_context))
+            for section in template.sections:
+                order = orders.get(id(section))
+                if order is not None:
+                    rows = [render_row(items[position]) for position in order[start:end]]
+                else:
+                    if page_rows is None:
+                        page_rows = [render_row(item) for item in items[start:end]]
+                    rows = page_rows
+                row_template = section.row
+                for row in rows:
+                    f.write(row_template.substitute(row))
+                f.write(section.after.substitute(page_context))
+            f.write(template.foot.substitute(page_context))
+        os.replace(tmp_path, page_path)
+        paths.append(page_path)
+    return paths
@@ -0,0 +1,311 @@
+from datetime import datetime, timezone
+from operator import itemgetter
+
+# Returned by compiled accessors when a field is left out of the output
+MISSING = object()
+
+# Compiled plans kept per schema, keyed by payload shape (the item's keys in order)
+PLAN_CACHE_SIZE = 256
+
+
+def as_number(value):
+    """Count as int or float; numeric strings like '1,234' are parsed, anything else gives None."""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return value
+    if isinstance(value, str):
+        try:
+            return int(value.replace(',', ''))
+        except ValueError:
+            return None
+    return None
+
+
+def as_epoch_seconds(value):
+    """Seconds since the epoch of an ISO date string or epoch number, or None."""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return int(value)
+    if not isinstance(value, str) or not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return int(parsed.timestamp())
+
+
+def as_count(value):
+    """Integer count from an int, float or string like '1,234' (0 when unparseable)."""
+    try:
+        return int(value)
+    except (ValueError, TypeError):
+        if isinstance(value, str):
+            try:
+                return int(value.replace(',', ''))
+            except ValueError:
+                return 0
+        return 0
+
+
+def as_rounded_count(value):
+    """Integer count that also accepts float strings like '1.2e3' (0 when unparseable)."""
+    try:
+        if isinstance(value, str):
+            # Clean string of any formatting
+            value = value.replace(',', '')
+        return int(float(value))
+    except (ValueError, TypeError):
+        return 0
+
+
+def best_thumbnail(thumbnails):
+    """URL of the highest quality thumbnail in a YouTube thumbnails object, or None."""
+    if thumbnails:
+        for quality in ('maxres', 'high', 'medium', 'default'):
+            if quality in thumbnails and thumbnails[quality] and 'url' in thumbnails[quality]:
+                return thumbnails[quality]['url']
+    return None
+
+
+def youtube_content_type(item):
+    """Guess 'channel' or 'video' from the url of an item without a type."""
+    url = item.get('url')
+    if not isinstance(url, str):
+        return 'unknown'
+    if '/channel/' in url or '/c/' in url or '/user/' in url or '/@' in url:
+        return 'channel'
+    if 'watch?v=' in url or 'youtu.be/' in url:
+        return 'video'
+    return 'unknown'
+
+
+class Field:
+    """Declaration of one canonical field.
+
+    paths are the candidate source paths, tried in order; dotted paths such as
+    'statistics.likeCount' look into nested objects. The first value that is not
+    None or '' is passed through coerce. With omit_none the field is left out of
+    a normalized item instead of holding None, and derive computes the value
+    from the whole item when the payload has none of the paths.
+    """
+
+    def __init__(self, name, paths, coerce=None, omit_none=False, derive=None):
+        self.name = name
+        self.paths = tuple(paths)
+        self.coerce = coerce
+        self.omit_none = omit_none
+        self.derive = derive
+
+
+def compile_path(path):
+    """Accessor for one source path, split once instead of on every lookup."""
+    if '.' not in path:
+        return lambda item: item.get(path)
+    parts = tuple(path.split('.'))
+
+    def nested(item):
+        current = item
+        for part in parts:
+            if not isinstance(current, dict):
+                return None
+            current = current.get(part)
+        return current
+    return nested
+
+
+def compile_field(field, keys=None):
+    """
+    Compile a field into an accessor function
+
+    Without keys the accessor tries every path and returns MISSING when none
+    has a value. With keys (the keys of a payload shape) only the paths whose
+    top-level key is present are tried, and an item whose paths are all empty
+    keeps the raw value of the first one, e.g. None or ''.
+
+    Args:
+        field (Field): The field declaration
+        keys (frozenset): Keys of a payload shape, or None
+
+    Returns:
+        function: item -> value or MISSING; None when the shape lacks the field
+    """
+    paths = field.paths
+    if keys is not None:
+        paths = [path for path in paths if path.split('.', 1)[0] in keys]
+        if not paths:
+            return field.derive
+    getters = [compile_path(path) for path in paths]
+    coerce = field.coerce
+    omit_none = field.omit_none
+    keep_raw = keys is not None
+
+    if keep_raw and len(paths) == 1 and not omit_none and '.' not in paths[0]:
+        # The common case: one top-level key that this shape is known to have
+        get = itemgetter(paths[0])
+        if coerce is None:
+            return get
+        return lambda item: coerce(get(item))
+
+    if len(getters) == 1:
+        get = getters[0]
+
+        def value_of(item):
+            value = get(item)
+            if value is None or value == '':
+                if not keep_raw or (value is None and omit_none):
+                    return MISSING
+            return value
+    else:
+        def value_of(item):
+            for get in getters:
+                value = get(item)
+                if value is not None and value != '':
+                    return value
+            if keep_raw:
+                value = getters[0](item)
+                if value is not None or not omit_none:
+                    return value
+            return MISSING
+
+    if coerce is None and not omit_none:
+        return value_of
+
+    def access(item):
+        value = value_of(item)
+        if value is MISSING:
+            return value
+        if coerce is not None:
+            value = coerce(value)
+        if value is None and omit_none:
+            return MISSING
+        return value
+    return access
+
+
+class Schema:
+    """Canonical fields of one platform, compiled into accessor functions.
+
+    getter() and row_getter() serve readers of saved items (summaries,
+    exporters). plan() and normalize() map raw actor payloads: the paths feeding
+    each field are picked once per payload shape, so items of a shape that was
+    seen before cost one accessor call per field.
+    """
+
+    def __init__(self, platform, fields):
+        self.platform = platform
+        self.fields = list(fields)
+        self._by_name = {field.name: field for field in self.fields}
+        self._getters = {}
+        self._plans = {}
+
+    def getter(self, name, default=None):
+        """Return a function that reads a field from an item, or default when it has no value."""
+        access = self._getters.get(name)
+        if access is None:
+            access = self._getters[name] = compile_field(self._by_name[name])
+
+        def read(item):
+            value = access(item)
+            return default if value is MISSING else value
+        return read
+
+    def row_getter(self, columns):
+        """
+        Compile export columns into a function that builds one row per item
+
+        Args:
+            columns (list): (column name, field name, default) tuples
+
+        Returns:
+            function: item -> dict of column name to value
+        """
+        getters = [(column, self.getter(name, default)) for column, name, default in columns]
+        return lambda item: {column: get(item) for column, get in getters}
+
+    def plan(self, item):
+        """Return the (field name, accessor) pairs for an item's payload shape, compiling them on first use."""
+        shape = tuple(item)
+        plan = self._plans.get(shape)
+        if plan is None:
+            if len(self._plans) >= PLAN_CACHE_SIZE:
+                self._plans.clear()
+            keys = frozenset(shape)
+            plan = []
+            for field in self.fields:
+                access = compile_field(field, keys)
+                if access is not None:
+                    plan.append((field.name, access))
+            self._plans[shape] = plan
+        return plan
+
+    def normalize(self, item, into=None):
+        """Add the fields of a raw item to into (a new dict by default) in schema order."""
+        if into is None:
+            into = {}
+        for name, access in self.plan(item):
+            value = access(item)
+            if value is not MISSING:
+                into[name] = value
+        return into
+
+
+# Raw items of the YouTube actor, mapped to the standardized item format
+YOUTUBE_PAYLOAD_SCHEMA = Schema('youtube', [
+    Field('id', ['id']),
+    Field('url', ['url']),
+    Field('content_type', ['type'], derive=youtube_content_type),
+    Field('title', ['title']),
+    Field('description', ['description']),
+    Field('creator_name', ['channelTitle', 'author', 'ownerChannelName']),
+    Field('creator_id', ['channelId', 'authorId', 'ownerChannelId']),
+    Field('creator_url', ['channelUrl', 'authorUrl']),
+    Field('published_date', ['publishedAt', 'date']),
+    Field('views', ['viewCount'], coerce=as_count),
+    Field('likes', ['likeCount', 'likes', 'statistics.likeCount', 'snippet.likeCount', 'engagement.likes'],
+          coerce=as_rounded_count, omit_none=True),
+    Field('comments_count', ['commentCount'], coerce=as_count),
+    Field('followers', ['subscriberCount'], coerce=as_count),
+    Field('duration', ['duration']),
+    Field('thumbnail_url', ['thumbnails'], coerce=best_thumbnail, omit_none=True)
+])
+
+# Saved items of each platform. Standardized names come first, raw actor names
+# after them so datasets saved by older versions read the same way.
+YOUTUBE_SCHEMA = Schema('youtube', [
+    Field('id', ['id']),
+    Field('url', ['url']),
+    Field('title', ['title']),
+    Field('description', ['description']),
+    Field('content_type', ['content_type', 'type']),
+    Field('channel', ['channel_name', 'channelName', 'channel_owner', 'channel_handle']),
+    Field('channel_url', ['creator_url', 'channelUrl']),
+    Field('published', ['published_date', 'originalISODate', 'date']),
+    Field('likes', ['likes', 'likeCount'], coerce=as_number),
+    Field('comments', ['comments_count', 'commentsCount', 'commentCount'], coerce=as_number),
+    Field('views', ['views', 'viewCount'], coerce=as_number),
+    Field('followers', ['followers', 'subscriberCount', 'numberOfSubscribers'], coerce=as_number),
+    Field('duration', ['duration']),
+    Field('thumbnail', ['thumbnail_url']),
+    Field('scrape_date', ['scrape_date'])
+])
+
+INSTAGRAM_SCHEMA = Schema('instagram', [
+    Field('id', ['id', 'shortCode']),
+    Field('short_code', ['shortCode']),
+    Field('url', ['url']),
+    Field('title', ['caption']),
+    Field('content_type', ['type']),
+    Field('published', ['timestamp']),
+    Field('likes', ['likesCount'], coerce=as_number),
+    Field('comments', ['commentsCount'], coerce=as_number),
+    Field('views', ['videoViewCount', 'videoPlayCount'], coerce=as_number),
+    Field('owner', ['ownerUsername'])
+])
+
+SCHEMAS = {
+    'youtube': YOUTUBE_SCHEMA,
+    'instagram': INSTAGRAM_SCHEMA
+}
@@ -0,0 +1,226 @@
+import os
+import sqlite3
+import threading
+import time
+
+from config import SNAPSHOT_DB_PATH
+from schema import SCHEMAS
+from task_store import Transaction
+
+# Entity table and id column per platform
+ENTITY_TABLES = {
+    'youtube': ('videos', 'video_id'),
+    'instagram': ('posts', 'post_id')
+}
+
+_store = None
+_store_lock = threading.Lock()
+
+
+class SnapshotStore:
+    """Append-only history of scraped accounts, backed by SQLite in WAL mode.
+
+    Every scrape adds a row to scrapes and one metric sample (likes, comments,
+    views) per item, while videos and posts hold one row per entity that is
+    updated in place. Growth curves come from the samples, so old dataset
+    folders can be pruned without losing history.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._local = threading.local()
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._transaction() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS scrapes (
+                    scrape_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    platform TEXT NOT NULL,
+                    account TEXT NOT NULL,
+                    scraped_at REAL NOT NULL,
+                    item_count INTEGER NOT NULL,
+                    file_path TEXT
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_scrapes_account ON scrapes (account, scraped_at)")
+            for table, id_column in ENTITY_TABLES.values():
+                conn.execute(f"""
+                    CREATE TABLE IF NOT EXISTS {table} (
+                        {id_column} TEXT PRIMARY KEY,
+                        account TEXT NOT NULL,
+                        url TEXT,
+                        title TEXT,
+                        content_type TEXT,
+                        published TEXT,
+                        first_seen REAL NOT NULL,
+                        last_seen REAL NOT NULL
+                    )
+                """)
+                conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_account ON {table} (account)")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS metric_samples (
+                    scrape_id INTEGER NOT NULL,
+                    platform TEXT NOT NULL,
+                    account TEXT NOT NULL,
+                    item_id TEXT NOT NULL,
+                    scraped_at REAL NOT NULL,
+                    likes INTEGER,
+                    comments INTEGER,
+                    views INTEGER
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_metric_samples_account ON metric_samples (account, scraped_at)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_metric_samples_item ON metric_samples (item_id, scraped_at)")
+
+    def _connection(self):
+        # sqlite3 connections must not be shared between threads, keep one per thread
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _transaction(self):
+        return Transaction(self._connection())
+
+    def record_scrape(self, platform, account, rows, file_path=None):
+        """
+        Append one scrape of an account
+
+        Args:
+            platform (str): 'youtube' or 'instagram'
+            account (str): Channel name or username
+            rows (list): (item_id, url, title, content_type, published, likes, comments, views) tuples
+            file_path (str): Dataset the scrape was saved to
+
+        Returns:
+            int: The new scrape_id
+        """
+        table, id_column = ENTITY_TABLES[platform]
+        now = time.time()
+        # An item listed twice in one dataset gets a single sample
+        rows = list({row[0]: row for row in rows}.values())
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "INSERT INTO scrapes (platform, account, scraped_at, item_count, file_path) VALUES (?, ?, ?, ?, ?)",
+                (platform, account, now, len(rows), file_path)
+            )
+            scrape_id = cursor.lastrowid
+            conn.executemany(
+                f"""
+                INSERT INTO {table} ({id_column}, account, url, title, content_type, published, first_seen, last_seen)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT({id_column}) DO UPDATE SET
+                    account = excluded.account,
+                    url = COALESCE(excluded.url, {table}.url),
+                    title = COALESCE(excluded.title, {table}.title),
+                    content_type = COALESCE(excluded.content_type, {table}.content_type),
+                    published = COALESCE(excluded.published, {table}.published),
+                    last_seen = excluded.last_seen
+                """,
+                [(row[0], account, *row[1:5], now, now) for row in rows]
+            )
+            conn.executemany(
+                """
+                INSERT INTO metric_samples (scrape_id, platform, account, item_id, scraped_at, likes, comments, views)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                [(scrape_id, platform, account, row[0], now, *row[5:8]) for row in rows]
+            )
+        return scrape_id
+
+    def account_history(self, platform, account):
+        """
+        Totals of every scrape of an account, oldest first
+
+        Returns:
+            list: Dicts with scraped_at, item_count, likes, comments and views
+        """
+        rows = self._connection().execute(
+            """
+            SELECT s.scraped_at, s.item_count, SUM(m.likes), SUM(m.comments), SUM(m.views)
+            FROM scrapes s
+            LEFT JOIN metric_samples m ON m.scrape_id = s.scrape_id
+            WHERE s.account = ? AND s.platform = ?
+            GROUP BY s.scrape_id
+            ORDER BY s.scraped_at
+            """,
+            (account, platform)
+        ).fetchall()
+        return [
+            {'scraped_at': row[0], 'item_count': row[1], 'likes': row[2], 'comments': row[3], 'views': row[4]}
+            for row in rows
+        ]
+
+    def item_history(self, platform, item_id):
+        """
+        Metric samples of one video or post, oldest first
+
+        Returns:
+            list: Dicts with scraped_at, likes, comments and views
+        """
+        rows = self._connection().execute(
+            """
+            SELECT scraped_at, likes, comments, views FROM metric_samples
+            WHERE item_id = ? AND platform = ?
+            ORDER BY scraped_at
+            """,
+            (item_id, platform)
+        ).fetchall()
+        return [
+            {'scraped_at': row[0], 'likes': row[1], 'comments': row[2], 'views': row[3]}
+            for row in rows
+        ]
+
+
+def get_snapshot_store():
+    """Return the process-wide SnapshotStore for SNAPSHOT_DB_PATH, opening it on first use."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = SnapshotStore(SNAPSHOT_DB_PATH)
+        return _store
+
+
+class SnapshotBuilder:
+    """Dataset sidecar that records a scrape in the snapshot store.
+
+    Only the entity fields and metrics of each item are kept while the dataset
+    is written; save() appends them to the store in one transaction. Stored
+    items carried over by a delta scrape are not passed in (records_history).
+    """
+
+    records_history = True
+
+    def __init__(self, platform, account):
+        self.platform = platform
+        self.account = account
+        schema = SCHEMAS[platform]
+        self._get_id = schema.getter('id')
+        self._getters = [
+            schema.getter(name)
+            for name in ('url', 'title', 'content_type', 'published', 'likes', 'comments', 'views')
+        ]
+        self.rows = []
+
+    def add(self, item):
+        if not isinstance(item, dict):
+            return
+        item_id = self._get_id(item)
+        if item_id is None:
+            return
+        self.rows.append((str(item_id), *(get(item) for get in self._getters)))
+
+    def add_many(self, items):
+        for item in items:
+            self.add(item)
+
+    def save(self, json_path):
+        """Append the scrape to the snapshot store. Failures are reported but never break the save."""
+        try:
+            get_snapshot_store().record_scrape(self.platform, self.account, self.rows, json_path)
+        except (sqlite3.Error, OSError) as e:
+            print(f"⚠️ Failed to record snapshot of {self.account}: {str(e)}")
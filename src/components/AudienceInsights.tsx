@@ -40,7 +40,7 @@ import {
   FileDownload,
   BarChartRounded as BarChart
 } from '@mui/icons-material';
-import api, { YouTubeData, InstagramData } from '../services/api';
+import api, { YouTubeData, InstagramData, DataSummary } from '../services/api';
 import ReactApexChart from 'react-apexcharts';
 import { useHistory } from 'react-router-dom';
 
@@ -125,6 +125,7 @@ interface YouTubeInsightsProps {
   selectedYoutubeData: string;
   channelName: string;
   onSelect: (filePath: string) => void;
+  summary?: DataSummary | null;
 }
 
 const YouTubeInsights: React.FC<YouTubeInsightsProps> = (props) => {
@@ -134,6 +135,7 @@ const YouTubeInsights: React.FC<YouTubeInsightsProps> = (props) => {
     selectedYoutubeData,
     channelName,
     onSelect,
+    summary,
   } = props;
   
   const history = useHistory();
@@ -303,7 +305,10 @@ const YouTubeInsights: React.FC<YouTubeInsightsProps> = (props) => {
     return title.includes(searchQuery.toLowerCase());
   }).sort((a: YouTubeVideoData, b: YouTubeVideoData) => getVideoViews(b) - getVideoViews(a));
 
-  const { totalVideos, totalViews, totalLikes } = getVideoStats();
+  // Totals precomputed on the server cover the whole dataset; without one they are summed here
+  const { totalVideos, totalViews, totalLikes } = summary
+    ? { totalVideos: summary.item_count, totalViews: summary.totals.views, totalLikes: summary.totals.likes }
+    : getVideoStats();
   
   // Function to export YouTube data as CSV
   const exportToCSV = () => {
@@ -691,6 +696,7 @@ interface InstagramInsightsProps {
   username: string;
   onSelect: (filePath: string) => void;
   onRefresh?: () => void;
+  summary?: DataSummary | null;
 }
 
 const InstagramInsights: React.FC<InstagramInsightsProps> = (props) => {
@@ -700,7 +706,8 @@ const InstagramInsights: React.FC<InstagramInsightsProps> = (props) => {
     selectedInstagramData,
     username,
     onSelect,
-    onRefresh
+    onRefresh,
+    summary
   } = props;
   
   const history = useHistory();
@@ -830,13 +837,20 @@ const InstagramInsights: React.FC<InstagramInsightsProps> = (props) => {
       totalComments += getPostComments(post);
     });
 
+    // Totals precomputed on the server cover the whole dataset
+    if (summary) {
+      totalPosts = summary.item_count;
+      totalLikes = summary.totals.likes;
+      totalComments = summary.totals.comments;
+    }
+
     return { 
       totalPosts, 
       totalLikes, 
       totalComments,
       typeCounts
     };
-  }, [instagramDetails, getPostType, getPostLikes, getPostComments]);
+  }, [instagramDetails, summary, getPostType, getPostLikes, getPostComments]);
 
   // Memoize filtered posts to prevent unnecessary recalculations
   const filteredPosts = useMemo(() => {
@@ -1730,6 +1744,8 @@ const AudienceInsights: React.FC = () => {
   const [selectedInstagramData, setSelectedInstagramData] = useState<string>('');
   const [youtubeDetails, setYoutubeDetails] = useState<YouTubeVideoData[]>([]);
   const [instagramDetails, setInstagramDetails] = useState<InstagramPostData[]>([]);
+  const [youtubeSummary, setYoutubeSummary] = useState<DataSummary | null>(null);
+  const [instagramSummary, setInstagramSummary] = useState<DataSummary | null>(null);
   const [showCharts, setShowCharts] = useState<boolean>(false);
 
   // Tab change handler with useCallback
@@ -1737,11 +1753,26 @@ const AudienceInsights: React.FC = () => {
     setTabValue(newValue);
   }, []);
 
+  // Summary of an account's current dataset, or null when it is not the selected file
+  const loadSummary = useCallback(async (platform: 'youtube' | 'instagram', account: string | undefined, filePath: string) => {
+    if (!account) return null;
+    try {
+      const summary = await api.getSummary(platform, account);
+      const normalize = (path: string) => path.replace(/\\/g, '/');
+      return normalize(summary.file_path) === normalize(filePath) ? summary : null;
+    } catch (error) {
+      return null;
+    }
+  }, []);
+
   // Fetch YouTube details with retry mechanism
   const fetchYoutubeDetails = useCallback(async (filePath: string) => {
     if (!filePath) return;
     setLoading(true);
+    const account = youtubeData.find(item => item.file_path === filePath)?.channel_name;
+    const summaryRequest = loadSummary('youtube', account, filePath);
     try {
+      setYoutubeSummary(await summaryRequest);
       const data = await api.getDataFile(filePath);
       if (Array.isArray(data)) {
         setYoutubeDetails(data);
@@ -1756,13 +1787,16 @@ const AudienceInsights: React.FC = () => {
     } finally {
       setLoading(false);
     }
-  }, [setLoading, setYoutubeDetails, setShowCharts]);
+  }, [youtubeData, loadSummary, setLoading, setYoutubeDetails, setShowCharts]);
 
   // Fetch Instagram details with retry mechanism
   const fetchInstagramDetails = useCallback(async (filePath: string) => {
     if (!filePath) return;
     setLoading(true);
+    const account = instagramData.find(item => item.file_path === filePath)?.username;
+    const summaryRequest = loadSummary('instagram', account, filePath);
     try {
+      setInstagramSummary(await summaryRequest);
       const data = await api.getDataFile(filePath);
       if (Array.isArray(data)) {
         setInstagramDetails(data);
@@ -1777,7 +1811,7 @@ const AudienceInsights: React.FC = () => {
     } finally {
       setLoading(false);
     }
-  }, [setLoading, setInstagramDetails, setShowCharts]);
+  }, [instagramData, loadSummary, setLoading, setInstagramDetails, setShowCharts]);
 
   // YouTube data selection handler
   const handleYoutubeSelect = useCallback((filePath: string) => {
@@ -1899,6 +1933,7 @@ const AudienceInsights: React.FC = () => {
           selectedYoutubeData={selectedYoutubeData}
           channelName={getSelectedYoutubeChannelName()}
           onSelect={handleYoutubeSelect}
+          summary={youtubeSummary}
         />
         {showCharts && youtubeDetails.length > 0 && (
           <YouTubeChart youtubeDetails={youtubeDetails} />
@@ -1913,6 +1948,7 @@ const AudienceInsights: React.FC = () => {
           username={getSelectedInstagramUsername()}
           onSelect={handleInstagramSelect}
           onRefresh={fetchDataList}
+          summary={instagramSummary}
         />
         {showCharts && instagramDetails.length > 0 && !instagramDetails[0].error && (
           <InstagramChart instagramDetails={instagramDetails} />
@@ -1,4 +1,4 @@
-import React from 'react';
+import React, { useEffect, useState } from 'react';
 import {
   Box,
   Card,
@@ -23,6 +23,8 @@ import {
   InputAdornment,
   CardMedia,
   CardHeader,
+  Button,
+  CircularProgress,
   IconButton
 } from '@mui/material';
 import {
@@ -44,6 +46,7 @@ import {
   Pie, 
   Doughnut
 } from 'react-chartjs-2';
+import api from '../services/api';
 
 interface InstagramComment {
   id?: string;
@@ -88,15 +91,70 @@ interface InstagramPost {
 }
 
 interface InstagramDataDetailsProps {
-  data: InstagramPost[];
+  filePath: string;
   username: string;
 }
 
-const InstagramDataDetails: React.FC<InstagramDataDetailsProps> = ({ data, username }) => {
+// Table rows fetched per request
+const POSTS_PAGE_SIZE = 50;
+// Columns needed for the totals and the content type chart
+const METRIC_FIELDS = ['likesCount', 'commentsCount', 'type'];
+
+const InstagramDataDetails: React.FC<InstagramDataDetailsProps> = ({ filePath, username }) => {
   const theme = useTheme();
   const [searchTerm, setSearchTerm] = React.useState('');
-  
-  if (!data || data.length === 0) {
+  const [metrics, setMetrics] = useState<InstagramPost[]>([]);
+  const [topLikedPosts, setTopLikedPosts] = useState<InstagramPost[]>([]);
+  const [topCommentedPosts, setTopCommentedPosts] = useState<InstagramPost[]>([]);
+  const [posts, setPosts] = useState<InstagramPost[]>([]);
+  const [totalPosts, setTotalPosts] = useState(0);
+  const [loading, setLoading] = useState(true);
+
+  // Rankings are sorted and cut on the server, so only the rows shown are downloaded
+  useEffect(() => {
+    let cancelled = false;
+    setLoading(true);
+    Promise.all([
+      api.queryDataFile(filePath, { fields: METRIC_FIELDS }),
+      api.queryDataFile(filePath, { sort: 'likesCount:desc', limit: 10 }),
+      api.queryDataFile(filePath, { sort: 'commentsCount:desc', limit: 10 }),
+      api.queryDataFile(filePath, { offset: 0, limit: POSTS_PAGE_SIZE })
+    ])
+      .then(([metricPage, likedPage, commentedPage, postPage]) => {
+        if (cancelled) return;
+        setMetrics(metricPage.items);
+        setTopLikedPosts(likedPage.items);
+        setTopCommentedPosts(commentedPage.items);
+        setPosts(postPage.items);
+        setTotalPosts(postPage.total);
+      })
+      .catch((error) => console.error('Failed to load Instagram data:', error))
+      .finally(() => {
+        if (!cancelled) setLoading(false);
+      });
+    return () => {
+      cancelled = true;
+    };
+  }, [filePath]);
+
+  const loadMorePosts = async () => {
+    try {
+      const page = await api.queryDataFile(filePath, { offset: posts.length, limit: POSTS_PAGE_SIZE });
+      setPosts((current) => [...current, ...page.items]);
+    } catch (error) {
+      console.error('Failed to load more Instagram posts:', error);
+    }
+  };
+
+  if (loading) {
+    return (
+      <Box sx={{ p: 3, textAlign: 'center' }}>
+        <CircularProgress color="secondary" />
+      </Box>
+    );
+  }
+
+  if (totalPosts === 0) {
     return (
       <Box sx={{ p: 3, textAlign: 'center' }}>
         <Typography>No Instagram data available</Typography>
@@ -105,30 +163,29 @@ const InstagramDataDetails: React.FC<InstagramDataDetailsProps> = ({ data, usern
   }
 
   // Calculated metrics
-  const totalLikes = data.reduce((sum, item) => sum + (item.likesCount || 0), 0);
-  const totalComments = data.reduce((sum, item) => sum + (item.commentsCount || 0), 0);
-  const avgLikes = Math.floor(totalLikes / data.length);
-  const avgComments = Math.floor(totalComments / data.length);
+  const totalLikes = metrics.reduce((sum, item) => sum + (item.likesCount || 0), 0);
+  const totalComments = metrics.reduce((sum, item) => sum + (item.commentsCount || 0), 0);
+  const avgLikes = Math.floor(totalLikes / totalPosts);
+  const avgComments = Math.floor(totalComments / totalPosts);
   
   // Content type statistics
   const contentTypes: Record<string, number> = {};
-  data.forEach(post => {
+  metrics.forEach(post => {
     const type = post.type || 'Unknown';
     contentTypes[type] = (contentTypes[type] || 0) + 1;
   });
   
-  // Find most engaging posts
-  const mostLikedPost = [...data].sort((a, b) => (b.likesCount || 0) - (a.likesCount || 0))[0];
-  const mostCommentedPost = [...data].sort((a, b) => (b.commentsCount || 0) - (a.commentsCount || 0))[0];
+  const mostLikedPost = topLikedPosts[0];
+  const mostCommentedPost = topCommentedPosts[0];
   
-  // Check if comments exist anywhere in the data
-  const hasComments = data.some(post => 
+  // Check if comments exist in the loaded posts
+  const hasComments = posts.some(post => 
     (post.latestComments && Array.isArray(post.latestComments) && post.latestComments.length > 0) ||
     (post.comments && Array.isArray(post.comments) && post.comments.length > 0)
   );
 
-  // Filter posts based on search term
-  const filteredPosts = data.filter(post => 
+  // Filter the loaded posts based on search term
+  const filteredPosts = posts.filter(post => 
     (post.caption || '').toLowerCase().includes(searchTerm.toLowerCase())
   );
 
@@ -150,34 +207,22 @@ const InstagramDataDetails: React.FC<InstagramDataDetailsProps> = ({ data, usern
   };
   
   const likesChartData = {
-    labels: [...data]
-      .sort((a, b) => (b.likesCount || 0) - (a.likesCount || 0))
-      .slice(0, 10)
-      .map((_, index) => `Post ${index + 1}`),
+    labels: topLikedPosts.map((_, index) => `Post ${index + 1}`),
     datasets: [
       {
         label: 'Likes',
-        data: [...data]
-          .sort((a, b) => (b.likesCount || 0) - (a.likesCount || 0))
-          .slice(0, 10)
-          .map(item => item.likesCount || 0),
+        data: topLikedPosts.map(item => item.likesCount || 0),
         backgroundColor: theme.palette.primary.main,
       }
     ]
   };
   
   const commentsChartData = {
-    labels: [...data]
-      .sort((a, b) => (b.commentsCount || 0) - (a.commentsCount || 0))
-      .slice(0, 10)
-      .map((_, index) => `Post ${index + 1}`),
+    labels: topCommentedPosts.map((_, index) => `Post ${index + 1}`),
     datasets: [
       {
         label: 'Comments',
-        data: [...data]
-          .sort((a, b) => (b.commentsCount || 0) - (a.commentsCount || 0))
-          .slice(0, 10)
-          .map(item => item.commentsCount || 0),
+        data: topCommentedPosts.map(item => item.commentsCount || 0),
         backgroundColor: theme.palette.secondary.main,
       }
     ]
@@ -250,7 +295,7 @@ const InstagramDataDetails: React.FC<InstagramDataDetailsProps> = ({ data, usern
             <Grid item xs={12} sm={6} md={3}>
               <Paper sx={{ p: 2, textAlign: 'center', display: 'flex', flexDirection: 'column', alignItems: 'center' }}>
                 <Photo color="secondary" sx={{ mb: 1, fontSize: 30 }} />
-                <Typography variant="h6">{data.length}</Typography>
+                <Typography variant="h6">{totalPosts}</Typography>
                 <Typography variant="body2">Posts</Typography>
               </Paper>
             </Grid>
@@ -332,7 +377,7 @@ const InstagramDataDetails: React.FC<InstagramDataDetailsProps> = ({ data, usern
           <Typography variant="h6" gutterBottom>All Posts</Typography>
           <TextField
             fullWidth
-            placeholder="Search posts by caption..."
+            placeholder="Search loaded posts by caption..."
             variant="outlined"
             value={searchTerm}
             onChange={(e) => setSearchTerm(e.target.value)}
@@ -387,6 +432,16 @@ const InstagramDataDetails: React.FC<InstagramDataDetailsProps> = ({ data, usern
               </TableBody>
             </Table>
           </TableContainer>
+          {posts.length < totalPosts && (
+            <Box sx={{ display: 'flex', alignItems: 'center', justifyContent: 'space-between', mt: 2 }}>
+              <Typography variant="body2" color="text.secondary">
+                Showing {posts.length} of {totalPosts} posts
+              </Typography>
+              <Button variant="outlined" color="secondary" onClick={loadMorePosts}>
+                Load more
+              </Button>
+            </Box>
+          )}
         </CardContent>
       </Card>
       
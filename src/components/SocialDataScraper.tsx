@@ -57,54 +57,46 @@ const SocialDataScraper: React.FC = () => {
   const [error, setError] = useState<string | null>(null);
   const [success, setSuccess] = useState<string | null>(null);
   const [currentTask, setCurrentTask] = useState<Task | null>(null);
-  const [polling, setPolling] = useState<NodeJS.Timeout | null>(null);
+  const [unsubscribe, setUnsubscribe] = useState<(() => void) | null>(null);
 
-  // Clean up polling on unmount
+  // Clean up the task subscription on unmount
   useEffect(() => {
     return () => {
-      if (polling) {
-        clearInterval(polling);
+      if (unsubscribe) {
+        unsubscribe();
       }
     };
-  }, [polling]);
+  }, [unsubscribe]);
 
   const handleTabChange = (event: React.SyntheticEvent, newValue: number) => {
     setTabValue(newValue);
   };
 
   const startPolling = (taskId: string) => {
-    // Stop any existing polling
-    if (polling) {
-      clearInterval(polling);
+    // Stop any existing subscription
+    if (unsubscribe) {
+      unsubscribe();
     }
 
-    // Start new polling
-    const interval = setInterval(async () => {
-      try {
-        const taskStatus = await api.getTaskStatus(taskId);
-        setCurrentTask(taskStatus);
+    // Receive task updates as they happen instead of polling on a timer
+    const stop = api.subscribeToTask(taskId, (taskStatus) => {
+      setCurrentTask(taskStatus);
 
-        if (taskStatus.status !== 'running') {
-          // Task completed or errored - stop polling
-          clearInterval(interval);
-          setPolling(null);
-          setLoading(false);
+      if (taskStatus.status !== 'running' && taskStatus.status !== 'queued') {
+        // Task completed or errored - stop listening
+        stop();
+        setUnsubscribe(null);
+        setLoading(false);
 
-          if (taskStatus.status === 'completed') {
-            setSuccess(`Successfully scraped data: ${taskStatus.message}`);
-          } else if (taskStatus.status === 'error') {
-            setError(`Error: ${taskStatus.message}`);
-          }
+        if (taskStatus.status === 'completed') {
+          setSuccess(`Successfully scraped data: ${taskStatus.message}`);
+        } else if (taskStatus.status === 'error') {
+          setError(`Error: ${taskStatus.message}`);
         }
-      } catch (err) {
-        clearInterval(interval);
-        setPolling(null);
-        setLoading(false);
-        setError('Failed to fetch task status');
       }
-    }, 2000);
+    });
 
-    setPolling(interval);
+    setUnsubscribe(() => stop);
   };
 
   const handleYoutubeSubmit = async (e: React.FormEvent) => {
@@ -120,9 +112,13 @@ const SocialDataScraper: React.FC = () => {
       const task = await api.scrapeYouTube(youtubeUrl);
       setCurrentTask(task);
       startPolling(task.task_id);
-    } catch (err) {
+    } catch (err: any) {
       setLoading(false);
-      setError('Failed to start YouTube scraping');
+      if (err?.response?.status === 429) {
+        setError(`The scraper is busy, please try again in ${err.response.data?.retry_after ?? 60} seconds`);
+      } else {
+        setError('Failed to start YouTube scraping');
+      }
     }
   };
 
@@ -139,9 +135,13 @@ const SocialDataScraper: React.FC = () => {
       const task = await api.scrapeInstagram(instagramUsername);
       setCurrentTask(task);
       startPolling(task.task_id);
-    } catch (err) {
+    } catch (err: any) {
       setLoading(false);
-      setError('Failed to start Instagram scraping');
+      if (err?.response?.status === 429) {
+        setError(`The scraper is busy, please try again in ${err.response.data?.retry_after ?? 60} seconds`);
+      } else {
+        setError('Failed to start Instagram scraping');
+      }
     }
   };
 
@@ -262,9 +262,25 @@ const SocialDataScraper: React.FC = () => {
               </Grid>
             </Grid>
 
-            {currentTask.status === 'running' && (
-              <Box display="flex" justifyContent="center" sx={{ mt: 2 }}>
+            {(currentTask.status === 'running' || currentTask.status === 'queued') && (
+              <Box display="flex" flexDirection="column" alignItems="center" sx={{ mt: 2 }}>
                 <CircularProgress size={30} />
+                {currentTask.status === 'queued' && !!currentTask.queue_position && (
+                  <Typography variant="caption" color="text.secondary" sx={{ mt: 1 }}>
+                    Position {currentTask.queue_position} in queue
+                  </Typography>
+                )}
+                {currentTask.progress && (
+                  <Typography variant="caption" color="text.secondary" sx={{ mt: 1 }}>
+                    Collected {currentTask.progress.item_count} items
+                    {currentTask.progress.percent !== null && ` (${currentTask.progress.percent}%)`}
+                  </Typography>
+                )}
+                {currentTask.eta_seconds !== undefined && (
+                  <Typography variant="caption" color="text.secondary">
+                    Estimated time remaining: ~{Math.ceil(currentTask.eta_seconds / 60)} min
+                  </Typography>
+                )}
               </Box>
             )}
 
@@ -1,4 +1,4 @@
-import React from 'react';
+import React, { useEffect, useState } from 'react';
 import {
   Box,
   Card,
@@ -26,6 +26,7 @@ import {
   CardHeader,
   CardActions,
   Button,
+  CircularProgress,
   IconButton
 } from '@mui/material';
 import {
@@ -47,6 +48,7 @@ import {
   Scatter
 } from 'react-chartjs-2';
 import { format } from 'date-fns';
+import api from '../services/api';
 
 interface YouTubeComment {
   author?: string;
@@ -77,15 +79,70 @@ interface YouTubeVideo {
 }
 
 interface YouTubeDataDetailsProps {
-  data: YouTubeVideo[];
+  filePath: string;
   channelName: string;
 }
 
-const YouTubeDataDetails: React.FC<YouTubeDataDetailsProps> = ({ data, channelName }) => {
+// Table rows fetched per request
+const VIDEOS_PAGE_SIZE = 50;
+// Columns needed for the totals, the yearly chart and the views vs likes chart
+const METRIC_FIELDS = ['title', 'viewCount', 'likes', 'date'];
+
+const YouTubeDataDetails: React.FC<YouTubeDataDetailsProps> = ({ filePath, channelName }) => {
   const theme = useTheme();
   const [searchTerm, setSearchTerm] = React.useState('');
-  
-  if (!data || data.length === 0) {
+  const [data, setData] = useState<YouTubeVideo[]>([]);
+  const [topViewedVideos, setTopViewedVideos] = useState<YouTubeVideo[]>([]);
+  const [topLikedVideos, setTopLikedVideos] = useState<YouTubeVideo[]>([]);
+  const [videos, setVideos] = useState<YouTubeVideo[]>([]);
+  const [totalVideos, setTotalVideos] = useState(0);
+  const [loading, setLoading] = useState(true);
+
+  // Rankings are sorted and cut on the server, so only the rows shown are downloaded
+  useEffect(() => {
+    let cancelled = false;
+    setLoading(true);
+    Promise.all([
+      api.queryDataFile(filePath, { fields: METRIC_FIELDS }),
+      api.queryDataFile(filePath, { sort: 'viewCount:desc', limit: 10 }),
+      api.queryDataFile(filePath, { sort: 'likes:desc', limit: 10 }),
+      api.queryDataFile(filePath, { offset: 0, limit: VIDEOS_PAGE_SIZE })
+    ])
+      .then(([metricPage, viewedPage, likedPage, videoPage]) => {
+        if (cancelled) return;
+        setData(metricPage.items);
+        setTopViewedVideos(viewedPage.items);
+        setTopLikedVideos(likedPage.items);
+        setVideos(videoPage.items);
+        setTotalVideos(videoPage.total);
+      })
+      .catch((error) => console.error('Failed to load YouTube data:', error))
+      .finally(() => {
+        if (!cancelled) setLoading(false);
+      });
+    return () => {
+      cancelled = true;
+    };
+  }, [filePath]);
+
+  const loadMoreVideos = async () => {
+    try {
+      const page = await api.queryDataFile(filePath, { offset: videos.length, limit: VIDEOS_PAGE_SIZE });
+      setVideos((current) => [...current, ...page.items]);
+    } catch (error) {
+      console.error('Failed to load more YouTube videos:', error);
+    }
+  };
+
+  if (loading) {
+    return (
+      <Box sx={{ p: 3, textAlign: 'center' }}>
+        <CircularProgress />
+      </Box>
+    );
+  }
+
+  if (totalVideos === 0) {
     return (
       <Box sx={{ p: 3, textAlign: 'center' }}>
         <Typography>No YouTube data available</Typography>
@@ -93,13 +150,13 @@ const YouTubeDataDetails: React.FC<YouTubeDataDetailsProps> = ({ data, channelNa
     );
   }
 
-  // Calculated metrics
+  // Calculated metrics (data holds the metric columns of every video)
   const totalViews = data.reduce((sum, item) => sum + (item.viewCount || 0), 0);
   const totalLikes = data.reduce((sum, item) => sum + (item.likes || 0), 0);
-  const avgViews = Math.floor(totalViews / data.length);
-  const avgLikes = Math.floor(totalLikes / data.length);
-  const mostViewedVideo = [...data].sort((a, b) => (b.viewCount || 0) - (a.viewCount || 0))[0];
-  const mostLikedVideo = [...data].sort((a, b) => (b.likes || 0) - (a.likes || 0))[0];
+  const avgViews = Math.floor(totalViews / totalVideos);
+  const avgLikes = Math.floor(totalLikes / totalVideos);
+  const mostViewedVideo = topViewedVideos[0];
+  const mostLikedVideo = topLikedVideos[0];
   
   // Date statistics
   const videosByYear: Record<string, number> = {};
@@ -110,41 +167,31 @@ const YouTubeDataDetails: React.FC<YouTubeDataDetailsProps> = ({ data, channelNa
     }
   });
   
-  // Filter videos based on search term
-  const filteredVideos = data.filter(video => 
-    video.title.toLowerCase().includes(searchTerm.toLowerCase())
+  // Filter the loaded videos based on search term
+  const filteredVideos = videos.filter(video => 
+    (video.title || '').toLowerCase().includes(searchTerm.toLowerCase())
   );
 
   // Prepare chart data
   const viewsChartData = {
-    labels: [...data]
-      .sort((a, b) => (b.viewCount || 0) - (a.viewCount || 0))
-      .slice(0, 10)
+    labels: topViewedVideos
       .map(item => item.title.substring(0, 20) + (item.title.length > 20 ? '...' : '')),
     datasets: [
       {
         label: 'Views',
-        data: [...data]
-          .sort((a, b) => (b.viewCount || 0) - (a.viewCount || 0))
-          .slice(0, 10)
-          .map(item => item.viewCount || 0),
+        data: topViewedVideos.map(item => item.viewCount || 0),
         backgroundColor: theme.palette.primary.main,
       }
     ]
   };
   
   const likesChartData = {
-    labels: [...data]
-      .sort((a, b) => (b.likes || 0) - (a.likes || 0))
-      .slice(0, 10)
+    labels: topLikedVideos
       .map(item => item.title.substring(0, 20) + (item.title.length > 20 ? '...' : '')),
     datasets: [
       {
         label: 'Likes',
-        data: [...data]
-          .sort((a, b) => (b.likes || 0) - (a.likes || 0))
-          .slice(0, 10)
-          .map(item => item.likes || 0),
+        data: topLikedVideos.map(item => item.likes || 0),
         backgroundColor: theme.palette.secondary.main,
       }
     ]
@@ -243,8 +290,8 @@ const YouTubeDataDetails: React.FC<YouTubeDataDetailsProps> = ({ data, channelNa
     }
   };
   
-  // Check if comments exist anywhere in the data
-  const hasComments = data.some(video => 
+  // Check if comments exist in the loaded videos
+  const hasComments = videos.some(video => 
     video.comments && Array.isArray(video.comments) && video.comments.length > 0
   );
 
@@ -262,7 +309,7 @@ const YouTubeDataDetails: React.FC<YouTubeDataDetailsProps> = ({ data, channelNa
             <Grid item xs={12} sm={6} md={3}>
               <Paper sx={{ p: 2, textAlign: 'center', display: 'flex', flexDirection: 'column', alignItems: 'center' }}>
                 <VideoLibrary color="primary" sx={{ mb: 1, fontSize: 30 }} />
-                <Typography variant="h6">{data.length}</Typography>
+                <Typography variant="h6">{totalVideos}</Typography>
                 <Typography variant="body2">Videos</Typography>
               </Paper>
             </Grid>
@@ -344,7 +391,7 @@ const YouTubeDataDetails: React.FC<YouTubeDataDetailsProps> = ({ data, channelNa
           <Typography variant="h6" gutterBottom>All Videos</Typography>
           <TextField
             fullWidth
-            placeholder="Search videos..."
+            placeholder="Search loaded videos..."
             variant="outlined"
             value={searchTerm}
             onChange={(e) => setSearchTerm(e.target.value)}
@@ -386,6 +433,16 @@ const YouTubeDataDetails: React.FC<YouTubeDataDetailsProps> = ({ data, channelNa
               </TableBody>
             </Table>
           </TableContainer>
+          {videos.length < totalVideos && (
+            <Box sx={{ display: 'flex', alignItems: 'center', justifyContent: 'space-between', mt: 2 }}>
+              <Typography variant="body2" color="text.secondary">
+                Showing {videos.length} of {totalVideos} videos
+              </Typography>
+              <Button variant="outlined" onClick={loadMoreVideos}>
+                Load more
+              </Button>
+            </Box>
+          )}
         </CardContent>
       </Card>
       
@@ -7,9 +7,99 @@ const API_BASE_URL = process.env.REACT_APP_API_URL || 'http://localhost:5000/api
 // Task status types
 export interface Task {
   task_id: string;
-  status: 'running' | 'completed' | 'error';
+  status: 'queued' | 'running' | 'completed' | 'error';
   message: string;
   data?: any;
+  queue_position?: number;
+  eta_seconds?: number;
+  progress?: {
+    item_count: number;
+    percent: number | null;
+  };
+  partial_offset?: number;
+  partial_items?: any[];
+  version?: number;
+  children?: BatchChild[];
+  child_counts?: Record<string, number>;
+}
+
+export interface DataQuery {
+  offset?: number;
+  limit?: number;
+  sort?: string;
+  fields?: string[];
+}
+
+export interface DataPage {
+  items: any[];
+  total: number;
+  offset: number;
+  limit: number | null;
+}
+
+export interface BatchChild {
+  task_id: string;
+  platform: 'youtube' | 'instagram';
+  account: string;
+  status: string;
+  message?: string;
+  item_count?: number;
+  file_path?: string;
+  deduplicated?: boolean;
+}
+
+export interface SummaryItem {
+  id: string | null;
+  url: string | null;
+  title: string | null;
+  content_type: string | null;
+  published: string | number | null;
+  likes: number | null;
+  comments: number | null;
+  views: number | null;
+}
+
+type SummaryMetrics<T> = { likes: T; comments: T; views: T };
+
+// Aggregates computed when a dataset is saved
+export interface DataSummary {
+  platform: 'youtube' | 'instagram';
+  account: string;
+  item_count: number;
+  generated: number;
+  file_path: string;
+  totals: SummaryMetrics<number>;
+  averages: SummaryMetrics<number | null>;
+  engagement: {
+    per_item: number | null;
+    per_view: number | null;
+    comments_per_like: number | null;
+  };
+  top: SummaryMetrics<SummaryItem[]>;
+  content_types: Record<string, number>;
+  histograms: {
+    by_month: Record<string, number>;
+    by_weekday: number[]; // Monday first, UTC
+    by_hour: number[]; // UTC
+    undated: number;
+  };
+}
+
+export interface HistoryPoint {
+  scraped_at: number;
+  item_count?: number;
+  likes: number | null;
+  comments: number | null;
+  views: number | null;
+}
+
+// Growth curve of an account (scrapes) or of one item (samples)
+export interface History {
+  platform: 'youtube' | 'instagram';
+  account?: string;
+  item?: string;
+  scrapes?: HistoryPoint[];
+  samples?: HistoryPoint[];
 }
 
 // Social data types
@@ -52,9 +142,11 @@ const api = {
   },
 
   // YouTube scraping
-  scrapeYouTube: async (url: string): Promise<Task> => {
+  // Pass force to skip the server's cache of recent scrapes
+  // Pass delta to fetch only videos newer than the stored dataset and merge them in
+  scrapeYouTube: async (url: string, force = false, delta?: boolean): Promise<Task> => {
     try {
-      const response = await axios.post(`${API_BASE_URL}/scrape/youtube`, { url });
+      const response = await axios.post(`${API_BASE_URL}/scrape/youtube`, { url, force, delta });
       return response.data;
     } catch (error) {
       console.error('YouTube scraping failed:', error);
@@ -63,9 +155,9 @@ const api = {
   },
 
   // Instagram scraping
-  scrapeInstagram: async (username: string): Promise<Task> => {
+  scrapeInstagram: async (username: string, force = false, delta?: boolean): Promise<Task> => {
     try {
-      const response = await axios.post(`${API_BASE_URL}/scrape/instagram`, { username });
+      const response = await axios.post(`${API_BASE_URL}/scrape/instagram`, { username, force, delta });
       return response.data;
     } catch (error) {
       console.error('Instagram scraping failed:', error);
@@ -73,10 +165,24 @@ const api = {
     }
   },
 
+  // Scrape many YouTube channel URLs and Instagram usernames with a few actor runs.
+  // Returns the batch task; its children list holds one task per account.
+  scrapeBatch: async (accounts: string[], force = false): Promise<Task> => {
+    try {
+      const response = await axios.post(`${API_BASE_URL}/scrape/batch`, { accounts, force });
+      return response.data;
+    } catch (error) {
+      console.error('Batch scraping failed:', error);
+      throw error;
+    }
+  },
+
   // Get task status
-  getTaskStatus: async (taskId: string): Promise<Task> => {
+  // Pass partial to also receive the items collected so far, starting at offset
+  getTaskStatus: async (taskId: string, partial = false, offset = 0): Promise<Task> => {
     try {
-      const response = await axios.get(`${API_BASE_URL}/tasks/${taskId}`);
+      const params = partial ? { partial: true, offset } : undefined;
+      const response = await axios.get(`${API_BASE_URL}/tasks/${taskId}`, { params });
       return response.data;
     } catch (error) {
       console.error('Get task status failed:', error);
@@ -84,6 +190,61 @@ const api = {
     }
   },
 
+  // Subscribe to task updates. Uses server-sent events and falls back to
+  // long polling when EventSource is unavailable or the stream gives up.
+  // Returns a function that stops the subscription.
+  subscribeToTask: (taskId: string, onUpdate: (task: Task) => void): (() => void) => {
+    let closed = false;
+    let source: EventSource | null = null;
+
+    const isActive = (task: Task) => task.status === 'queued' || task.status === 'running';
+
+    const longPoll = async () => {
+      let since: number | undefined;
+      while (!closed) {
+        try {
+          const params = since === undefined ? undefined : { wait: 25, since };
+          const response = await axios.get(`${API_BASE_URL}/tasks/${taskId}`, { params });
+          const task: Task = response.data;
+          since = task.version;
+          if (!closed) onUpdate(task);
+          if (!isActive(task)) return;
+        } catch (error) {
+          console.error('Task long poll failed:', error);
+          // A busy server answers 503 with the seconds to wait in Retry-After
+          const retryAfter = Number(axios.isAxiosError(error) && error.response?.headers['retry-after']);
+          await new Promise((resolve) => setTimeout(resolve, retryAfter > 0 ? retryAfter * 1000 : 5000));
+        }
+      }
+    };
+
+    if (typeof EventSource === 'undefined') {
+      longPoll();
+    } else {
+      source = new EventSource(`${API_BASE_URL}/tasks/${taskId}/events`);
+      const handleEvent = (event: Event) => {
+        const task: Task = JSON.parse((event as MessageEvent).data);
+        if (!closed) onUpdate(task);
+        if (!isActive(task)) source?.close();
+      };
+      source.addEventListener('status', handleEvent);
+      source.addEventListener('progress', handleEvent);
+      source.addEventListener('result', handleEvent);
+      source.onerror = () => {
+        // EventSource reconnects by itself; only fall back once it has given up
+        if (source && source.readyState === EventSource.CLOSED && !closed) {
+          source = null;
+          longPoll();
+        }
+      };
+    }
+
+    return () => {
+      closed = true;
+      source?.close();
+    };
+  },
+
   // List available data
   listData: async (): Promise<SocialDataList> => {
     try {
@@ -116,6 +277,46 @@ const api = {
       throw error;
     }
   },
+
+  // Get the precomputed totals, top items and histograms of an account's dataset
+  getSummary: async (platform: 'youtube' | 'instagram', account: string): Promise<DataSummary> => {
+    try {
+      const response = await axios.get(`${API_BASE_URL}/summary/${platform}/${encodeURIComponent(account)}`);
+      return response.data;
+    } catch (error) {
+      console.error('Get summary failed:', error, 'Account:', account);
+      throw error;
+    }
+  },
+
+  // Get the totals of every recorded scrape of an account, or the samples of one item
+  getHistory: async (platform: 'youtube' | 'instagram', account: string, itemId?: string): Promise<History> => {
+    try {
+      const params = itemId ? { item: itemId } : undefined;
+      const response = await axios.get(`${API_BASE_URL}/history/${platform}/${encodeURIComponent(account)}`, { params });
+      return response.data;
+    } catch (error) {
+      console.error('Get history failed:', error, 'Account:', account);
+      throw error;
+    }
+  },
+
+  // Get one page of a data file, sorted and projected on the server.
+  // sort looks like 'likesCount:desc'; fields limits the keys of every row.
+  queryDataFile: async (filePath: string, query: DataQuery): Promise<DataPage> => {
+    try {
+      const normalizedPath = filePath.replace(/\\/g, '/').replace(/^[A-Z]:[/\\]/, '').replace(/^\//, '');
+      const params = {
+        ...query,
+        fields: query.fields ? query.fields.join(',') : undefined,
+      };
+      const response = await axios.get(`${API_BASE_URL}/data/${normalizedPath}`, { params });
+      return response.data;
+    } catch (error) {
+      console.error('Query data file failed:', error, 'Path:', filePath);
+      throw error;
+    }
+  },
 };
 
 export default api; 
\ No newline at end of file
@@ -0,0 +1,222 @@
+import heapq
+import json
+import os
+import time
+from datetime import date, datetime, timezone
+
+from config import SUMMARY_TOP_N
+from data_store import SUMMARY_SUFFIX, write_json_atomic
+from schema import SCHEMAS
+
+METRICS = ('likes', 'comments', 'views')
+
+# Captions can be long, the top lists only need enough to recognize the post
+TITLE_PREVIEW_LENGTH = 140
+
+
+def summary_path(json_path):
+    """Path of the summary stored next to a JSON dataset (<name>.summary.json)."""
+    base = json_path[:-len('.json')] if json_path.endswith('.json') else json_path
+    return base + SUMMARY_SUFFIX
+
+
+def _parse_published(value):
+    """Return (YYYY-MM, weekday index, hour) of a publish date, hour may be None."""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        parsed = datetime.fromtimestamp(value, tz=timezone.utc)
+        return parsed.strftime('%Y-%m'), parsed.weekday(), parsed.hour
+    if not isinstance(value, str) or len(value) < 10:
+        return None
+    # ISO dates only; slicing avoids a full datetime parse for every item
+    try:
+        day = date.fromisoformat(value[:10])
+    except ValueError:
+        return None
+    hour = None
+    if len(value) >= 13 and value[10] in 'T ' and value[11:13].isdigit():
+        hour = int(value[11:13])
+    return value[:7], day.weekday(), hour
+
+
+class SummaryBuilder:
+    """Single-pass aggregates of a dataset: totals, top items, engagement and date histograms.
+
+    Feed items with add() as they are written (page by page while streaming),
+    then call result(). Only the top SUMMARY_TOP_N items per metric are kept,
+    so memory does not grow with the dataset.
+
+    This is a streaming pass rather than a numpy pass over the columnar
+    buffers: numpy and the columnar copy are optional, but every dataset needs
+    a summary, and the top rows keep the original ids, titles and dates that
+    the columns only hold dictionary-encoded. The month and content type
+    counts need a per-item step either way.
+    """
+
+    def __init__(self, platform, account, top_n=SUMMARY_TOP_N):
+        self.platform = platform
+        self.account = account
+        self.top_n = top_n
+        schema = SCHEMAS[platform]
+        self._metric_getters = [(metric, schema.getter(metric)) for metric in METRICS]
+        self._get_id = schema.getter('id')
+        self._get_url = schema.getter('url')
+        self._get_title = schema.getter('title')
+        self._get_content_type = schema.getter('content_type')
+        self._get_published = schema.getter('published')
+        self.item_count = 0
+        self.totals = dict.fromkeys(METRICS, 0)
+        self.counted = dict.fromkeys(METRICS, 0)  # Items that report each metric
+        # Likes and comments of the items that also report views, for the per-view rate
+        self.viewed_engagement = 0
+        self.content_types = {}
+        self.by_month = {}
+        self.by_weekday = [0] * 7
+        self.by_hour = [0] * 24
+        self.undated = 0
+        self._top = {metric: [] for metric in METRICS}  # min-heaps of (value, sequence, row)
+
+    def add(self, item):
+        if not isinstance(item, dict):
+            return
+        sequence = self.item_count
+        self.item_count += 1
+
+        values = {}
+        for metric, get in self._metric_getters:
+            value = get(item)
+            values[metric] = value
+            if value is not None:
+                self.totals[metric] += value
+                self.counted[metric] += 1
+        if values['views']:
+            self.viewed_engagement += (values['likes'] or 0) + (values['comments'] or 0)
+
+        content_type = self._get_content_type(item) or 'unknown'
+        self.content_types[content_type] = self.content_types.get(content_type, 0) + 1
+
+        published = self._get_published(item)
+        parsed = _parse_published(published)
+        if parsed is None:
+            self.undated += 1
+        else:
+            month, weekday, hour = parsed
+            self.by_month[month] = self.by_month.get(month, 0) + 1
+            self.by_weekday[weekday] += 1
+            if hour is not None:
+                self.by_hour[hour] += 1
+
+        row = None
+        for metric in METRICS:
+            value = values[metric]
+            if value is None:
+                continue
+            heap = self._top[metric]
+            if len(heap) < self.top_n:
+                row = row or self._row(item, values, published)
+                heapq.heappush(heap, (value, -sequence, row))
+            elif value > heap[0][0]:
+                row = row or self._row(item, values, published)
+                heapq.heapreplace(heap, (value, -sequence, row))
+
+    def add_many(self, items):
+        for item in items:
+            self.add(item)
+
+    def _row(self, item, values, published):
+        title = self._get_title(item)
+        if isinstance(title, str) and len(title) > TITLE_PREVIEW_LENGTH:
+            title = title[:TITLE_PREVIEW_LENGTH].rstrip() + '…'
+        return {
+            'id': self._get_id(item),
+            'url': self._get_url(item),
+            'title': title,
+            'content_type': self._get_content_type(item),
+            'published': published,
+            **values
+        }
+
+    def result(self):
+        """Return the summary as a JSON-serializable dict."""
+        count = self.item_count
+        likes = self.totals['likes']
+        comments = self.totals['comments']
+        return {
+            'platform': self.platform,
+            'account': self.account,
+            'item_count': count,
+            'generated': time.time(),
+            'totals': dict(self.totals),
+            'averages': {
+                metric: round(self.totals[metric] / self.counted[metric], 2) if self.counted[metric] else None
+                for metric in METRICS
+            },
+            'engagement': {
+                'per_item': round((likes + comments) / count, 2) if count else None,
+                'per_view': round(self.viewed_engagement / self.totals['views'], 6) if self.totals['views'] else None,
+                # None when no item reports comments, rather than a misleading 0.0
+                'comments_per_like': round(comments / likes, 6) if likes and self.counted['comments'] else None
+            },
+            # Highest first; ties keep the dataset order
+            'top': {
+                metric: [row for _, _, row in sorted(heap, reverse=True)]
+                for metric, heap in self._top.items()
+            },
+            'content_types': self.content_types,
+            'histograms': {
+                'by_month': dict(sorted(self.by_month.items())),
+                'by_weekday': self.by_weekday,  # Monday first, UTC
+                'by_hour': self.by_hour,  # UTC
+                'undated': self.undated
+            }
+        }
+
+    def save(self, json_path):
+        """Write the summary next to the dataset at json_path."""
+        write_summary(json_path, self.result())
+
+
+def summarize(platform, account, items):
+    """
+    Build the summary of a whole dataset in one pass
+
+    Args:
+        platform (str): 'youtube' or 'instagram'
+        account (str): Channel name or username the dataset belongs to
+        items (list): Processed dataset items
+
+    Returns:
+        dict: The summary
+    """
+    builder = SummaryBuilder(platform, account)
+    builder.add_many(items)
+    return builder.result()
+
+
+def write_summary(json_path, summary):
+    """Store a summary next to its dataset. Failures are reported but never break the save."""
+    path = summary_path(json_path)
+    try:
+        write_json_atomic(path, summary)
+    except OSError as e:
+        print(f"⚠️ Failed to write summary {path}: {str(e)}")
+
+
+def load_summary(platform, account, json_path):
+    """
+    Return the stored summary of a dataset, building it first when missing or stale
+
+    Datasets saved before summaries existed get theirs on first request.
+    """
+    path = summary_path(json_path)
+    try:
+        if os.stat(path).st_mtime_ns >= os.stat(json_path).st_mtime_ns:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+    except (OSError, ValueError):
+        pass
+
+    with open(json_path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    summary = summarize(platform, account, data if isinstance(data, list) else [])
+    write_summary(json_path, summary)
+    return summary
@@ -0,0 +1,161 @@
+import asyncio
+import heapq
+import inspect
+import math
+import os
+import threading
+import time
+import traceback
+from collections import deque
+
+
+class QueueFullError(Exception):
+    """Raised when the scrape queue has no room for another job."""
+
+    def __init__(self, retry_after):
+        super().__init__(f"Scrape queue is full, retry in {retry_after} seconds")
+        self.retry_after = retry_after
+
+
+_loop = None
+_loop_pid = None
+_loop_lock = threading.Lock()
+
+
+def background_loop():
+    """
+    Return the event loop that runs scrape jobs in this process
+
+    The loop runs forever on a daemon thread. It is started on first use and
+    again after a fork, so each gunicorn worker gets its own loop.
+
+    Returns:
+        asyncio.AbstractEventLoop: The running background loop
+    """
+    global _loop, _loop_pid
+    pid = os.getpid()
+    if _loop is None or _loop_pid != pid:
+        with _loop_lock:
+            if _loop is None or _loop_pid != pid:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=loop.run_forever, name="scrape-event-loop")
+                thread.daemon = True
+                thread.start()
+                _loop = loop
+                _loop_pid = pid
+    return _loop
+
+
+class ScrapeQueue:
+    """Bounded FIFO queue that runs up to `workers` scrape jobs at a time.
+
+    Jobs are coroutine functions run on a single background event loop, so a
+    running job costs a coroutine instead of a thread. Plain callables are
+    still accepted and run on the loop's default thread pool.
+    """
+
+    def __init__(self, workers, max_queued, default_duration):
+        self.workers = workers
+        self.max_queued = max_queued
+        self._avg_duration = float(default_duration)
+        self._lock = threading.Lock()
+        self._pending = deque()  # (task_id, job) waiting for a free slot
+        self._running = {}  # task_id -> start time
+
+    def _dispatch(self):
+        # Runs on the background loop: start pending jobs while slots are free
+        with self._lock:
+            while self._pending and len(self._running) < self.workers:
+                task_id, job = self._pending.popleft()
+                self._running[task_id] = time.time()
+                asyncio.ensure_future(self._run(task_id, job))
+
+    async def _run(self, task_id, job):
+        try:
+            if asyncio.iscoroutinefunction(job):
+                await job()
+            else:
+                result = await asyncio.get_running_loop().run_in_executor(None, job)
+                # A plain function may still hand back a coroutine (e.g. a lambda)
+                if inspect.isawaitable(result):
+                    await result
+        except Exception as e:
+            print(f"❌ Unhandled error in scrape job {task_id}: {str(e)}")
+            print(traceback.format_exc())
+        finally:
+            with self._lock:
+                started = self._running.pop(task_id, time.time())
+                # Exponential moving average keeps the ETA close to recent load
+                self._avg_duration = 0.8 * self._avg_duration + 0.2 * (time.time() - started)
+            self._dispatch()
+
+    def submit(self, task_id, job):
+        """
+        Queue a job for execution
+
+        Args:
+            task_id (str): Identifier used for position and ETA lookups
+            job (callable): Coroutine function (or plain function) to run
+
+        Returns:
+            dict: Queue position and ETA for the new job
+
+        Raises:
+            QueueFullError: If the queue already holds max_queued jobs
+        """
+        loop = background_loop()
+        with self._lock:
+            waiting = len(self._pending) + len(self._running) - self.workers
+            if waiting >= self.max_queued:
+                raise QueueFullError(self._retry_after())
+            self._pending.append((task_id, job))
+            estimate = self._estimate(task_id)
+        loop.call_soon_threadsafe(self._dispatch)
+        return estimate
+
+    def estimate(self, task_id):
+        """Return the current queue position and ETA for a job, or None if it is unknown."""
+        with self._lock:
+            return self._estimate(task_id)
+
+    def _worker_free_times(self):
+        """Seconds until each worker is expected to become free."""
+        now = time.time()
+        free_at = [max(self._avg_duration - (now - started), 0.0) for started in self._running.values()]
+        free_at.extend([0.0] * max(self.workers - len(free_at), 0))
+        heapq.heapify(free_at)
+        return free_at
+
+    def _estimate(self, task_id):
+        if task_id in self._running:
+            elapsed = time.time() - self._running[task_id]
+            return {'queue_position': 0, 'eta_seconds': math.ceil(max(self._avg_duration - elapsed, 0))}
+
+        # Simulate the pending jobs ahead of this one being handed to workers
+        free_at = self._worker_free_times()
+        idle_workers = max(self.workers - len(self._running), 0)
+        for position, (pending_id, _) in enumerate(self._pending, start=1):
+            start = heapq.heappop(free_at)
+            if pending_id == task_id:
+                return {
+                    # Jobs an idle worker is about to pick up are not waiting in line
+                    'queue_position': max(position - idle_workers, 0),
+                    'eta_seconds': math.ceil(start + self._avg_duration)
+                }
+            heapq.heappush(free_at, start + self._avg_duration)
+        return None
+
+    def _retry_after(self):
+        # A queue slot frees up as soon as the first running job finishes
+        return max(1, math.ceil(self._worker_free_times()[0]))
+
+    def stats(self):
+        """Return a snapshot of the queue for health checks."""
+        with self._lock:
+            return {
+                'workers': self.workers,
+                'running': len(self._running),
+                'queued': len(self._pending),
+                'max_queued': self.max_queued,
+                'avg_job_seconds': round(self._avg_duration, 1)
+            }
@@ -0,0 +1,343 @@
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+
+from config import TASK_HEARTBEAT_INTERVAL, TASK_HEARTBEAT_TIMEOUT
+
+# Statuses of tasks that still have a process working on them
+ACTIVE_STATUSES = ('queued', 'running')
+
+STALE_TASK_MESSAGE = "The server process running this task stopped before it finished"
+
+_owner = None
+_owner_pid = None
+
+
+def task_owner():
+    """
+    Identity of the current process as a task owner
+
+    The token changes with every process, so a new process that reuses the pid
+    of a dead one does not keep the dead one's tasks alive.
+
+    Returns:
+        tuple: (pid, host, token)
+    """
+    global _owner, _owner_pid
+    pid = os.getpid()
+    if _owner is None or _owner_pid != pid:
+        _owner = (pid, socket.gethostname(), uuid.uuid4().hex)
+        _owner_pid = pid
+    return _owner
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def new_task_id(prefix):
+    """Generate a collision-free task ID such as 'youtube_3f2b...'."""
+    return f"{prefix}_{uuid.uuid4().hex}"
+
+
+class TaskStore:
+    """Task registry backed by SQLite in WAL mode.
+
+    All gunicorn workers open the same database file, so a task created by one
+    worker can be read by any other. Records are stored as JSON and exposed
+    through a small dict-like interface (``store[task_id] = record``,
+    ``store.get(task_id)``, ``store.pop(task_id)``).
+
+    Each task records the process that created it (pid, host and a per-process
+    token) and a heartbeat that the process refreshes while the task is queued
+    or running. Tasks of a process that died are marked as errors on startup
+    and when their account is claimed again, see fail_stale_tasks().
+    """
+
+    def __init__(self, db_path, retention_seconds=7 * 24 * 3600, inflight_ttl=1800,
+                 heartbeat_interval=TASK_HEARTBEAT_INTERVAL, heartbeat_timeout=TASK_HEARTBEAT_TIMEOUT):
+        self.db_path = db_path
+        self.retention_seconds = retention_seconds
+        self.inflight_ttl = inflight_ttl
+        self.heartbeat_interval = heartbeat_interval
+        self.heartbeat_timeout = heartbeat_timeout
+        self._local = threading.local()
+        self._heartbeat_pid = None
+        self._heartbeat_lock = threading.Lock()
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._transaction() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS tasks (
+                    task_id TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    record TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL,
+                    version INTEGER NOT NULL DEFAULT 1
+                )
+            """)
+            # Owner columns were added later, older databases get them here
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(tasks)")}
+            for column, kind in (('owner_pid', 'INTEGER'), ('owner_host', 'TEXT'),
+                                 ('owner_token', 'TEXT'), ('heartbeat_at', 'REAL')):
+                if column not in columns:
+                    conn.execute(f"ALTER TABLE tasks ADD COLUMN {column} {kind}")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_tasks_updated_at ON tasks (updated_at)")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS inflight (
+                    scrape_key TEXT PRIMARY KEY,
+                    task_id TEXT NOT NULL,
+                    created_at REAL NOT NULL
+                )
+            """)
+
+    def _connection(self):
+        # sqlite3 connections must not be shared between threads, keep one per thread
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _transaction(self):
+        return Transaction(self._connection())
+
+    def __setitem__(self, task_id, record):
+        now = time.time()
+        pid, host, token = task_owner()
+        with self._transaction() as conn:
+            conn.execute(
+                """
+                INSERT INTO tasks (task_id, status, record, created_at, updated_at,
+                                   owner_pid, owner_host, owner_token, heartbeat_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(task_id) DO UPDATE SET
+                    status = excluded.status,
+                    record = excluded.record,
+                    updated_at = excluded.updated_at,
+                    version = tasks.version + 1
+                """,
+                (task_id, record.get('status', ''), json.dumps(record), now, now, pid, host, token, now)
+            )
+            # Opportunistically drop old finished tasks so the table stays small
+            conn.execute(
+                "DELETE FROM tasks WHERE updated_at < ? AND status IN ('completed', 'error')",
+                (now - self.retention_seconds,)
+            )
+        self._start_heartbeat()
+
+    def __getitem__(self, task_id):
+        record = self.get(task_id)
+        if record is None:
+            raise KeyError(task_id)
+        return record
+
+    def __contains__(self, task_id):
+        return self.get(task_id) is not None
+
+    def get(self, task_id, default=None):
+        # Plain reads do not need the write lock, WAL lets them run alongside writers
+        row = self._connection().execute("SELECT record FROM tasks WHERE task_id = ?", (task_id,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def get_versioned(self, task_id):
+        """
+        Read a task record together with its version
+
+        The version increases on every write, so callers can cheaply detect
+        changes (server-sent events, long polling).
+
+        Returns:
+            tuple: (record, version), or (None, None) if the task does not exist
+        """
+        row = self._connection().execute(
+            "SELECT record, version FROM tasks WHERE task_id = ?", (task_id,)
+        ).fetchone()
+        if not row:
+            return None, None
+        return json.loads(row[0]), row[1]
+
+    def pop(self, task_id, default=None):
+        with self._transaction() as conn:
+            row = conn.execute("SELECT record FROM tasks WHERE task_id = ?", (task_id,)).fetchone()
+            conn.execute("DELETE FROM tasks WHERE task_id = ?", (task_id,))
+        return json.loads(row[0]) if row else default
+
+    def update(self, task_id, fields, expected_status=None):
+        """
+        Merge fields into an existing task record atomically
+
+        Args:
+            task_id (str): The task to update
+            fields (dict): Keys to set on the record
+            expected_status (str): Only update while the task has this status
+
+        Returns:
+            bool: True if the record was updated
+        """
+        with self._transaction() as conn:
+            row = conn.execute("SELECT record FROM tasks WHERE task_id = ?", (task_id,)).fetchone()
+            if not row:
+                return False
+            record = json.loads(row[0])
+            if expected_status is not None and record.get('status') != expected_status:
+                return False
+            record.update(fields)
+            conn.execute(
+                "UPDATE tasks SET status = ?, record = ?, updated_at = ?, version = version + 1 WHERE task_id = ?",
+                (record.get('status', ''), json.dumps(record), time.time(), task_id)
+            )
+        return True
+
+    def claim_inflight(self, scrape_key, task_id):
+        """
+        Register task_id as the single in-flight scrape for scrape_key
+
+        Args:
+            scrape_key (str): Normalized identity of the scrape target
+            task_id (str): The task that wants to run the scrape
+
+        Returns:
+            str: The task_id of an existing in-flight scrape, or None if the claim succeeded
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT task_id, created_at FROM inflight WHERE scrape_key = ?", (scrape_key,)
+            ).fetchone()
+            if row:
+                owner_id, created_at = row
+                owner = conn.execute(
+                    "SELECT task_id, status, record, owner_pid, owner_host, owner_token, heartbeat_at, updated_at FROM tasks WHERE task_id = ?",
+                    (owner_id,)
+                ).fetchone()
+                if owner and self._is_stale(owner, now):
+                    self._fail_tasks(conn, [owner], now)
+                # Entries left behind by a crashed worker or a finished task do not block new scrapes
+                elif owner and owner[1] in ACTIVE_STATUSES and now - created_at < self.inflight_ttl:
+                    return owner_id
+            conn.execute(
+                "INSERT OR REPLACE INTO inflight (scrape_key, task_id, created_at) VALUES (?, ?, ?)",
+                (scrape_key, task_id, now)
+            )
+        return None
+
+    def release_inflight(self, scrape_key, task_id):
+        """Drop the in-flight entry for scrape_key if task_id still owns it."""
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM inflight WHERE scrape_key = ? AND task_id = ?", (scrape_key, task_id))
+
+
+    def _is_stale(self, row, now):
+        """True for an active task row whose owning process is gone."""
+        _, status, _, owner_pid, owner_host, owner_token, heartbeat_at, updated_at = row
+        if status not in ACTIVE_STATUSES:
+            return False
+        pid, host, token = task_owner()
+        if owner_host == host and owner_pid is not None:
+            if owner_pid == pid:
+                # An earlier process with the same pid, e.g. after a container restart
+                if owner_token != token:
+                    return True
+            elif os.name == 'posix' and not _pid_alive(owner_pid):
+                return True
+        # Rows written before heartbeats existed only have updated_at
+        last_seen = heartbeat_at if heartbeat_at is not None else updated_at
+        return now - last_seen > self.heartbeat_timeout
+
+    def _fail_tasks(self, conn, rows, now):
+        for task_id, _, record, *_ in rows:
+            record = json.loads(record)
+            record.update({'status': 'error', 'message': STALE_TASK_MESSAGE})
+            conn.execute(
+                "UPDATE tasks SET status = ?, record = ?, updated_at = ?, version = version + 1 WHERE task_id = ?",
+                ('error', json.dumps(record), now, task_id)
+            )
+            conn.execute("DELETE FROM inflight WHERE task_id = ?", (task_id,))
+
+    def fail_stale_tasks(self):
+        """
+        Mark queued and running tasks whose process died as errors and release their in-flight claims
+
+        A task is stale when its owner ran on this host and its pid is gone, or
+        when its heartbeat is older than heartbeat_timeout.
+
+        Returns:
+            int: Number of tasks marked as errors
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            rows = conn.execute(
+                f"""
+                SELECT task_id, status, record, owner_pid, owner_host, owner_token, heartbeat_at, updated_at FROM tasks
+                WHERE status IN ({', '.join('?' * len(ACTIVE_STATUSES))})
+                """,
+                ACTIVE_STATUSES
+            ).fetchall()
+            stale = [row for row in rows if self._is_stale(row, now)]
+            self._fail_tasks(conn, stale, now)
+        return len(stale)
+
+    def heartbeat(self):
+        """Refresh the heartbeat of the active tasks owned by this process."""
+        _, _, token = task_owner()
+        with self._transaction() as conn:
+            conn.execute(
+                f"UPDATE tasks SET heartbeat_at = ? WHERE owner_token = ? AND status IN ({', '.join('?' * len(ACTIVE_STATUSES))})",
+                (time.time(), token, *ACTIVE_STATUSES)
+            )
+
+    def _start_heartbeat(self):
+        # One heartbeat thread per process, started again after a fork
+        pid = os.getpid()
+        if self._heartbeat_pid == pid:
+            return
+        with self._heartbeat_lock:
+            if self._heartbeat_pid == pid:
+                return
+            thread = threading.Thread(target=self._heartbeat_forever, name="task-heartbeat")
+            thread.daemon = True
+            thread.start()
+            self._heartbeat_pid = pid
+
+    def _heartbeat_forever(self):
+        while True:
+            time.sleep(self.heartbeat_interval)
+            try:
+                self.heartbeat()
+            except sqlite3.Error as e:
+                print(f"⚠️ Task heartbeat failed: {str(e)}")
+
+
+class Transaction:
+    """Context manager that wraps a block in BEGIN IMMEDIATE / COMMIT."""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        # IMMEDIATE takes the write lock up front so read-modify-write blocks
+        # cannot interleave across processes
+        self.conn.execute("BEGIN IMMEDIATE")
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.conn.execute("COMMIT")
+        else:
+            self.conn.execute("ROLLBACK")
+        return False
@@ -1,38 +1,67 @@
-import requests
 import json
 import os
 import time
 import argparse
+import asyncio
 from datetime import datetime
 import csv
 import re
-import random
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
-
-def create_session_with_retries():
-    """Create a requests session with retry logic"""
-    session = requests.Session()
-    retries = Retry(
-        total=5,
-        backoff_factor=1,
-        status_forcelist=[429, 500, 502, 503, 504],
-        allowed_methods=["GET", "POST"]
-    )
-    adapter = HTTPAdapter(max_retries=retries)
-    session.mount("https://", adapter)
-    session.mount("http://", adapter)
-    return session
-
-def run_youtube_scraper(api_token, url_or_query):
-    """Run the YouTube scraper using Apify API."""
-    # Create a session with retries
-    session = create_session_with_retries()
+import threading
+
+from apify_api import apify_request, wait_for_run, iter_dataset_pages, DatasetProgress
+from data_store import JsonArrayWriter, record_dataset, finish_dataset
+from http_client import get_session, run_sync
+from summaries import SummaryBuilder
+from columnar import columnar_builder
+from snapshot_store import SnapshotBuilder
+from schema import YOUTUBE_SCHEMA
+from records import VideoRecord
+from reports import ReportTemplate, Section, escape, render_html_report
+from config import YOUTUBE_ACTOR_ID, YOUTUBE_ACTOR_CACHE_TTL, YOUTUBE_KEEP_RAW
+
+def extract_channel_handle(url_or_query):
+    """Return the channel handle (without @) from a YouTube channel URL, or None."""
+    if "youtube.com/" in url_or_query and "@" in url_or_query:
+        handle_match = re.search(r'youtube\.com/(@[^/\s?]+)', url_or_query)
+        if handle_match:
+            return handle_match.group(1)[1:]
+    return None
+
+# Process-wide cache of resolved YouTube actors: api_token -> {'actor': {...}, 'resolved_at': float}
+_actor_cache = {}
+_actor_cache_lock = threading.Lock()
+
+async def resolve_youtube_actor(session, api_token, refresh=False):
+    """
+    Resolve which Apify actor to use for YouTube scraping
+    
+    A pinned YOUTUBE_ACTOR_ID in config.py wins. Otherwise the user's actor
+    list is searched once and the answer is cached for YOUTUBE_ACTOR_CACHE_TTL
+    seconds, so most jobs skip the actor-list round trip.
+    
+    Args:
+        session (aiohttp.ClientSession): HTTP session to use
+        api_token (str): Apify API token
+        refresh (bool): Ignore the cached answer and search again
+    
+    Returns:
+        dict: Actor with 'id' and 'name', or None if the actor search failed
+    """
+    if YOUTUBE_ACTOR_ID:
+        return {'id': YOUTUBE_ACTOR_ID, 'name': 'pinned in config'}
+    
+    with _actor_cache_lock:
+        cached = _actor_cache.get(api_token)
+    if cached and not refresh and time.time() - cached['resolved_at'] < YOUTUBE_ACTOR_CACHE_TTL:
+        return cached['actor']
+    
+    # The lock is not held across the request, it would block the event loop.
+    # Jobs racing on a cold cache may search twice, which is harmless.
     
     # Look for YouTube scraper actors in the user's account
     print(f"Looking for YouTube scraper actors in your Apify account...")
     search_url = f"https://api.apify.com/v2/acts?token={api_token}"
-    search_response = session.get(search_url)
+    search_response = await apify_request(session, 'GET', search_url, endpoint='actors')
     
     if search_response.status_code != 200:
         print(f"❌ Failed to search actors: {search_response.status_code}, {search_response.text}")
@@ -60,12 +89,22 @@ def run_youtube_scraper(api_token, url_or_query):
         }]
     
     # Use the first YouTube scraper found
-    actor = youtube_actors[0]
-    actor_id = actor.get('id')
-    actor_name = actor.get('name')
-    
-    print(f"Found YouTube scraper: {actor_name} (ID: {actor_id})")
+    actor = {'id': youtube_actors[0].get('id'), 'name': youtube_actors[0].get('name')}
+    with _actor_cache_lock:
+        _actor_cache[api_token] = {'actor': actor, 'resolved_at': time.time()}
+    return actor
+
+def invalidate_youtube_actor(api_token):
+    """Forget the cached actor so the next job searches the actor list again."""
+    with _actor_cache_lock:
+        _actor_cache.pop(api_token, None)
+
+def youtube_input_config(url_or_query, newer_than=None):
+    """Build the actor input for a YouTube video URL, channel URL or search query.
     
+    newer_than (ISO 8601 timestamp) limits a channel scrape to videos published
+    on or after that day, for delta scrapes.
+    """
     # Create input configuration based on provided URL or search query
     input_config = {}
     if "youtube.com" in url_or_query or "youtu.be" in url_or_query:
@@ -145,15 +184,57 @@ def run_youtube_scraper(api_token, url_or_query):
             "scrapeStatistics": True
         }
     
+    if newer_than and "maxResults" in input_config and input_config["maxResults"] > 1:
+        # The actor's cutoff is a date, items from that day come back and are merged by id
+        input_config["oldestPostDate"] = newer_than[:10]
+    return input_config
+
+async def start_youtube_run(session, api_token, url_or_query, run_info=None, on_progress=None, newer_than=None):
+    """Start the YouTube actor, wait for the run and return its dataset ID (or None on failure).
+    
+    If run_info is a dict it is filled with the run outcome (run_status, timed_out, partial).
+    on_progress(new_items, item_count, percent) is called with raw items while the run is still going.
+    newer_than (ISO 8601 timestamp) asks for videos published since then only.
+    """
     print(f"Starting YouTube scraper for: {url_or_query}")
-    print(f"Using actor ID: {actor_id}")
+    if newer_than:
+        print(f"Delta scrape: only videos published since {newer_than}")
+    input_config = youtube_input_config(url_or_query, newer_than)
+    return await start_youtube_actor(session, api_token, input_config, run_info, on_progress)
+
+async def start_youtube_batch_run(session, api_token, channel_urls, run_info=None):
+    """Start one actor run for several channel URLs and return its dataset ID (or None on failure)."""
+    input_config = youtube_input_config(channel_urls[0])
+    input_config["startUrls"] = [{"url": url} for url in channel_urls]
+    print(f"Starting YouTube scraper for {len(channel_urls)} channels")
+    return await start_youtube_actor(session, api_token, input_config, run_info)
+
+async def start_youtube_actor(session, api_token, input_config, run_info=None, on_progress=None):
+    """Run the YouTube actor with input_config and return its dataset ID (or None on failure)."""
+    actor = await resolve_youtube_actor(session, api_token)
+    if not actor:
+        return None
+    actor_id = actor.get('id')
+    actor_name = actor.get('name')
     
-    # Add delay to avoid rate limiting
-    time.sleep(random.uniform(1.0, 3.0))
+    print(f"Found YouTube scraper: {actor_name} (ID: {actor_id})")
+    print(f"Using actor ID: {actor_id}")
     
     # Start the actor run
     start_url = f"https://api.apify.com/v2/acts/{actor_id}/runs?token={api_token}"
-    start_response = session.post(start_url, json=input_config)
+    start_response = await apify_request(session, 'POST', start_url, endpoint='start', json=input_config)
+    
+    # The cached actor may have been removed from the account, search again once
+    if start_response.status_code == 404 and not YOUTUBE_ACTOR_ID:
+        print(f"⚠️ Actor {actor_id} not found, refreshing actor cache")
+        invalidate_youtube_actor(api_token)
+        actor = await resolve_youtube_actor(session, api_token, refresh=True)
+        if not actor:
+            return None
+        actor_id = actor.get('id')
+        print(f"Retrying with actor ID: {actor_id}")
+        start_url = f"https://api.apify.com/v2/acts/{actor_id}/runs?token={api_token}"
+        start_response = await apify_request(session, 'POST', start_url, endpoint='start', json=input_config)
     
     if start_response.status_code != 201:
         print(f"❌ Failed to start actor: {start_response.status_code}, {start_response.text}")
@@ -191,47 +272,62 @@ def run_youtube_scraper(api_token, url_or_query):
     
     print(f"✅ Actor started, run ID: {run_id}")
     
-    # Poll for run status
-    status_url = f"https://api.apify.com/v2/actor-runs/{run_id}?token={api_token}"
-    max_attempts = 60  # 10 minutes with 10-second intervals
-    
-    for attempt in range(max_attempts):
-        time.sleep(10)  # Wait 10 seconds between checks
-        
-        # Add a bit of randomization to avoid predictable patterns
-        if attempt > 0 and attempt % 5 == 0:
-            time.sleep(random.uniform(2.0, 5.0))
-        
-        status_response = session.get(status_url)
-        if status_response.status_code != 200:
-            print(f"❌ Failed to get run status: {status_response.status_code}")
-            continue
-        
-        status_data = status_response.json()
-        status = status_data.get('data', {}).get('status')
-        
-        print(f"Run status: {status} (attempt {attempt+1}/{max_attempts})")
-        
-        if status in ['SUCCEEDED', 'FAILED', 'TIMED-OUT', 'ABORTED']:
-            break
-    
-    # Even if run failed, try to get any partial data
-    dataset_id = status_data.get('data', {}).get('defaultDatasetId')
+    # Wait for the run to finish, then fetch whatever the dataset holds
+    on_poll = None
+    if on_progress:
+        # maxResults applies to every start URL
+        item_limit = input_config.get("maxResults", 0) * max(len(input_config.get("startUrls", [])), 1)
+        on_poll = DatasetProgress(session, api_token, item_limit, on_progress)
+    outcome = await wait_for_run(session, api_token, run_id, actor_id, on_poll=on_poll)
+    if run_info is not None:
+        run_info.update(outcome.as_dict())
+    
+    # Even if run failed or timed out, try to get any partial data
+    dataset_id = outcome.dataset_id
     if not dataset_id:
         print("❌ No dataset ID found")
         return None
     
-    # Add delay before requesting data
-    time.sleep(random.uniform(1.0, 3.0))
+    return dataset_id
+
+def collect_item_errors(items):
+    """Collect error messages that the actor stored inside dataset items."""
+    error_messages = []
+    for item in items:
+        if isinstance(item, dict) and 'errorMessage' in item:
+            error_messages.append(item['errorMessage'])
+        if isinstance(item, dict) and 'error' in item:
+            error_messages.append(item['error'])
+    return error_messages
+
+def print_item_errors(error_messages):
+    """Print a short summary of dataset item errors for troubleshooting."""
+    if error_messages:
+        print(f"⚠️ Found {len(error_messages)} error messages in the data:")
+        for msg in error_messages[:5]:  # Show first 5 errors
+            print(f" - {msg}")
+        if len(error_messages) > 5:
+            print(f" - And {len(error_messages) - 5} more...")
+
+async def run_youtube_scraper_async(api_token, url_or_query, run_info=None):
+    """Run the YouTube scraper using Apify API and return all raw items.
     
-    items_url = f"https://api.apify.com/v2/datasets/{dataset_id}/items?token={api_token}"
-    items_response = session.get(items_url)
+    If run_info is a dict it is filled with the run outcome (run_status, timed_out, partial).
+    """
+    # Shared session with retries and kept-alive connections
+    session = get_session()
     
-    if items_response.status_code != 200:
-        print(f"❌ Failed to get dataset items: {items_response.status_code}")
+    dataset_id = await start_youtube_run(session, api_token, url_or_query, run_info)
+    if not dataset_id:
         return None
     
-    data = items_response.json()
+    data = []
+    try:
+        async for page in iter_dataset_pages(session, api_token, dataset_id):
+            data.extend(page)
+    except RuntimeError as e:
+        print(f"❌ {str(e)}")
+        return None
     
     # Return empty list instead of None if no data was retrieved
     if not data:
@@ -241,21 +337,193 @@ def run_youtube_scraper(api_token, url_or_query):
     print(f"✅ Retrieved {len(data)} items from the dataset")
     
     # Record any error messages for troubleshooting
+    print_item_errors(collect_item_errors(data))
+    
+    return data
+
+def run_youtube_scraper(api_token, url_or_query, run_info=None):
+    """Blocking wrapper around run_youtube_scraper_async for the command line."""
+    return run_sync(run_youtube_scraper_async(api_token, url_or_query, run_info))
+
+def dataset_sidecars(channel_name):
+    """Aggregates saved with a streamed dataset: summary, columnar copy (if enabled) and history snapshot."""
+    return [SummaryBuilder('youtube', channel_name), columnar_builder('youtube', channel_name), SnapshotBuilder('youtube', channel_name)]
+
+async def stream_youtube_data(api_token, url_or_query, run_info=None, channel_handle=None, on_progress=None, delta_base=None):
+    """
+    Run the YouTube scraper and write processed items to disk page by page
+    
+    Each dataset page is standardized and appended to the JSON file as soon as
+    it arrives, so memory use is bounded by the page size instead of the
+    dataset size. The channel identity is resolved from the first page. File
+    writes run in worker threads so other jobs on the loop keep going.
+    
+    With a delta_base only videos newer than the stored dataset are scraped,
+    and the stored videos they do not replace are appended after them.
+    
+    Args:
+        api_token (str): Apify API token
+        url_or_query (str): YouTube URL or search query
+        run_info (dict): Optional dict filled with the run outcome
+        channel_handle (str): Handle detected from the URL, preferred for the folder name
+        on_progress (callable): Optional callback for raw items collected while the run is going
+        delta_base (delta.DeltaBase): Stored dataset of the channel to merge new videos into
+    
+    Returns:
+        dict: channel_name, json_path and item_count (json_path is None when no
+              items were scraped), plus new_item_count for delta scrapes, or
+              None if the run or the download failed
+    """
+    session = get_session()
+    
+    newer_than = delta_base.cutoff_iso() if delta_base else None
+    dataset_id = await start_youtube_run(session, api_token, url_or_query, run_info, on_progress, newer_than)
+    if not dataset_id:
+        return None
+    
+    writer = None
+    channel_name = None
     error_messages = []
-    for item in data:
-        if isinstance(item, dict) and 'errorMessage' in item:
-            error_messages.append(item['errorMessage'])
-        if isinstance(item, dict) and 'error' in item:
-            error_messages.append(item['error'])
+    try:
+        async for page in iter_dataset_pages(session, api_token, dataset_id):
+            error_messages.extend(collect_item_errors(page))
             
-    if error_messages:
-        print(f"⚠️ Found {len(error_messages)} error messages in the data:")
-        for msg in error_messages[:5]:  # Show first 5 errors
-            print(f" - {msg}")
-        if len(error_messages) > 5:
-            print(f" - And {len(error_messages) - 5} more...")
+            if writer is None:
+                identity = resolve_channel_identity(page)
+                channel_name = identity['file_name']
+                
+                # If we detected a channel handle from the URL, prioritize that name
+                if channel_handle and channel_handle not in channel_name:
+                    print(f"Prioritizing detected channel handle '{channel_handle}' for folder name")
+                    channel_name = channel_handle
+                
+                output_folder = create_output_folder(channel_name)
+                writer = JsonArrayWriter(os.path.join(output_folder, f"{channel_name}.json"),
+                                         sidecars=dataset_sidecars(channel_name))
+            
+            items = standardize_youtube_items(page, identity)
+            if delta_base:
+                delta_base.mark_seen(items)
+            await asyncio.to_thread(writer.write_many, items)
+        
+        if writer and delta_base:
+            # Stored items are kept in the dataset but not sampled again for the history
+            await asyncio.to_thread(writer.write_many, delta_base.remaining(), True)
+    except RuntimeError as e:
+        print(f"❌ {str(e)}")
+        if writer:
+            writer.abort()
+        return None
+    except Exception:
+        if writer:
+            writer.abort()
+        raise
     
-    return data
+    if writer is None and delta_base:
+        print(f"✅ No new videos since {newer_than}, keeping {delta_base.json_path}")
+        return {'channel_name': channel_handle, 'json_path': delta_base.json_path,
+                'item_count': len(delta_base.items), 'new_item_count': 0}
+    
+    if writer is None:
+        print("⚠️ No data items were scraped")
+        return {'channel_name': channel_name, 'json_path': None, 'item_count': 0}
+    
+    await asyncio.to_thread(finish_dataset, writer, channel_name)
+    print(f"✅ Saved {writer.count} items to {writer.path}")
+    print_item_errors(error_messages)
+    
+    result = {'channel_name': channel_name, 'json_path': writer.path, 'item_count': writer.count}
+    if delta_base:
+        result['new_item_count'] = delta_base.new_item_count
+    return result
+
+def channel_handle_of(item):
+    """Return the lower-cased channel handle an item belongs to, or None."""
+    for key in ('channelUrl', 'inputUrl'):
+        value = item.get(key)
+        if isinstance(value, str):
+            handle = extract_channel_handle(value)
+            if handle:
+                return handle.lower()
+    return None
+
+async def stream_youtube_batch(api_token, channel_urls, run_info=None):
+    """
+    Scrape several channels with one actor run and save each channel separately
+    
+    Items are assigned to a channel by the handle in their channelUrl. Every
+    channel gets its own youtube_data/<handle>_<timestamp> folder, the same
+    layout a single-channel scrape produces.
+    
+    Args:
+        api_token (str): Apify API token
+        channel_urls (list): Channel URLs that contain an @handle
+        run_info (dict): Optional dict filled with the run outcome
+    
+    Returns:
+        dict: Handle -> {'channel_name', 'json_path', 'item_count'} (json_path is
+              None for channels without items), or None if the run or the download failed
+    """
+    session = get_session()
+    
+    # Lower-cased handle -> handle as written in the request
+    handles = {}
+    for url in channel_urls:
+        handle = extract_channel_handle(url)
+        handles[handle.lower()] = handle
+    
+    dataset_id = await start_youtube_batch_run(session, api_token, channel_urls, run_info)
+    if not dataset_id:
+        return None
+    
+    writers = {}
+    identities = {}
+    unmatched = 0
+    try:
+        async for page in iter_dataset_pages(session, api_token, dataset_id):
+            by_channel = {}
+            for item in page:
+                key = channel_handle_of(item) if isinstance(item, dict) else None
+                if key not in handles:
+                    if len(handles) != 1:
+                        unmatched += 1
+                        continue
+                    key = next(iter(handles))
+                by_channel.setdefault(key, []).append(item)
+            
+            for key, items in by_channel.items():
+                if key not in writers:
+                    handle = handles[key]
+                    identities[key] = resolve_channel_identity(items)
+                    output_folder = create_output_folder(handle)
+                    writers[key] = JsonArrayWriter(os.path.join(output_folder, f"{handle}.json"),
+                                                   sidecars=dataset_sidecars(handle))
+                await asyncio.to_thread(writers[key].write_many, standardize_youtube_items(items, identities[key]))
+    except RuntimeError as e:
+        print(f"❌ {str(e)}")
+        for writer in writers.values():
+            writer.abort()
+        return None
+    except Exception:
+        for writer in writers.values():
+            writer.abort()
+        raise
+    
+    if unmatched:
+        print(f"⚠️ Skipped {unmatched} items that did not belong to any requested channel")
+    
+    results = {}
+    for key, handle in handles.items():
+        writer = writers.get(key)
+        if writer is None:
+            print(f"⚠️ No data items were scraped for {handle}")
+            results[handle] = {'channel_name': handle, 'json_path': None, 'item_count': 0}
+            continue
+        await asyncio.to_thread(finish_dataset, writer, handle)
+        print(f"✅ Saved {writer.count} items to {writer.path}")
+        results[handle] = {'channel_name': handle, 'json_path': writer.path, 'item_count': writer.count}
+    
+    return results
 
 def create_output_folder(name):
     """Create output folder for the results."""
@@ -284,77 +552,47 @@ def format_date(date_str):
     except:
         return date_str
 
-def save_data(data, folder_path, filename="youtube_data", formats=None):
-    """Save data to multiple file formats."""
-    if formats is None:
-        formats = ["json", "csv", "html"]  # Default formats
-    
-    print(f"Saving data to {folder_path} in formats: {formats}")
-    results = {}
-    
-    # Save JSON data
-    if "json" in formats:
-        # Format dates in the JSON data
-        formatted_data = []
-        for item in data:
-            item_copy = item.copy()
-            if 'date' in item_copy and item_copy['date']:
-                item_copy['date'] = format_date(item_copy['date'])
-                # Also save the original ISO date for reference
-                item_copy['originalISODate'] = item['date']
-            formatted_data.append(item_copy)
-            
-        json_path = os.path.join(folder_path, f"{filename}.json")
-        with open(json_path, 'w', encoding='utf-8') as f:
-            json.dump(formatted_data, f, ensure_ascii=False, indent=2)
-        print(f"✅ Saved JSON data to {json_path}")
-        results["json"] = json_path
-    
-    # Save as CSV
-    if "csv" in formats:
-        csv_path = os.path.join(folder_path, f"{filename}.csv")
-        if data:
-            # Format dates for CSV
-            formatted_data = []
-            for item in data:
-                item_copy = item.copy()
-                if 'date' in item_copy and item_copy['date']:
-                    item_copy['date'] = format_date(item_copy['date'])
-                formatted_data.append(item_copy)
-                
-            with open(csv_path, 'w', newline='', encoding='utf-8') as f:
-                writer = csv.DictWriter(f, fieldnames=formatted_data[0].keys())
-                writer.writeheader()
-                writer.writerows(formatted_data)
-            print(f"✅ Saved CSV data to {csv_path}")
-            results["csv"] = csv_path
-    
-    # Save as HTML
-    if "html" in formats:
-        try:
-            html_path = os.path.join(folder_path, f"{filename}.html")
-            
-            # Calculate total view count and likes
-            total_views = sum(item.get('viewCount', 0) for item in data if isinstance(item.get('viewCount', 0), (int, float)))
-            total_likes = sum(item.get('likes', 0) for item in data if isinstance(item.get('likes', 0), (int, float)))
-            
-            # Get channel info from the first item if available
-            channel_name = filename
-            subscriber_count = 0
-            channel_url = ""
-            if data and len(data) > 0:
-                channel_name = data[0].get('channelName', filename)
-                subscriber_count = data[0].get('numberOfSubscribers', 0)
-                channel_url = data[0].get('channelUrl', "")
-            
-            # Generate HTML content
-            html_content = f"""<!DOCTYPE html>
+# Columns of the CSV export: (column, schema field, default)
+CSV_COLUMNS = (
+    ('id', 'id', ''),
+    ('url', 'url', ''),
+    ('content_type', 'content_type', ''),
+    ('title', 'title', ''),
+    ('description', 'description', ''),
+    ('channel', 'channel', ''),
+    ('channel_url', 'channel_url', ''),
+    ('published_date', 'published', ''),
+    ('views', 'views', 0),
+    ('likes', 'likes', 0),
+    ('comments_count', 'comments', 0),
+    ('followers', 'followers', 0),
+    ('duration', 'duration', ''),
+    ('thumbnail_url', 'thumbnail', ''),
+    ('scrape_date', 'scrape_date', '')
+)
+
+# Values shown for each video in the HTML report
+HTML_COLUMNS = (
+    ('title', 'title', ''),
+    ('views', 'views', 0),
+    ('likes', 'likes', 0),
+    ('duration', 'duration', ''),
+    ('published', 'published', ''),
+    ('url', 'url', '')
+)
+
+csv_row = YOUTUBE_SCHEMA.row_getter(CSV_COLUMNS)
+html_row = YOUTUBE_SCHEMA.row_getter(HTML_COLUMNS)
+
+# HTML report page; rows are written straight to the file, see reports.render_html_report
+REPORT_TEMPLATE = ReportTemplate(
+    head="""<!DOCTYPE html>
 <html>
 <head>
     <meta charset="UTF-8">
-    <title>YouTube Data: {channel_name}</title>
+    <title>YouTube Data: $channel_name</title>
     <style>
-        :root {{
+        :root {
             --bg-color: #111420;
             --card-bg: #1e2132;
             --text-color: #f5f5f5;
@@ -363,76 +601,77 @@ def save_data(data, folder_path, filename="youtube_data", formats=None):
             --accent: #4285f4;
             --muted-text: #a0a0a0;
             --border-color: #333648;
-        }}
-        body {{ font-family: 'Segoe UI', Roboto, Arial, sans-serif; margin: 0; padding: 0; background-color: var(--bg-color); color: var(--text-color); }}
-        .container {{ max-width: 1200px; margin: 20px auto; background: var(--card-bg); border-radius: 12px; box-shadow: 0 4px 20px rgba(0,0,0,0.2); padding: 25px; }}
-        h1 {{ color: var(--primary); margin-bottom: 10px; text-align: center; }}
-        h2 {{ color: var(--accent); margin-top: 0; text-align: center; font-weight: normal; margin-bottom: 30px; }}
-        table {{ width: 100%; border-collapse: collapse; margin: 20px 0; }}
-        th, td {{ padding: 12px; text-align: left; border-bottom: 1px solid var(--border-color); }}
-        th {{ background-color: var(--primary); color: white; }}
-        tr:hover {{ background-color: rgba(255, 0, 0, 0.1); }}
-        .stats {{ display: flex; margin-bottom: 30px; gap: 20px; flex-wrap: wrap; }}
-        .stat-block {{ flex: 1; background: var(--card-bg); padding: 20px; border-radius: 12px; text-align: center; border: 1px solid var(--primary); }}
-        .stat-value {{ font-size: 28px; font-weight: bold; color: var(--accent); margin-bottom: 10px; }}
-        .stat-label {{ font-size: 16px; color: var(--text-color); }}
-        .search-input {{ width: 100%; padding: 12px; font-size: 16px; margin-bottom: 20px; border: 2px solid var(--border-color); background: var(--bg-color); color: var(--text-color); border-radius: 8px; }}
-        a {{ color: var(--accent); text-decoration: none; }}
-        a:hover {{ text-decoration: underline; }}
-        .channel-info {{ display: flex; align-items: center; justify-content: center; margin-bottom: 20px; }}
-        .channel-link {{ background-color: var(--primary); color: white; padding: 8px 16px; border-radius: 20px; margin-left: 10px; }}
-        .channel-link:hover {{ background-color: var(--secondary); text-decoration: none; }}
-        .date-cell {{ white-space: nowrap; }}
+        }
+        body { font-family: 'Segoe UI', Roboto, Arial, sans-serif; margin: 0; padding: 0; background-color: var(--bg-color); color: var(--text-color); }
+        .container { max-width: 1200px; margin: 20px auto; background: var(--card-bg); border-radius: 12px; box-shadow: 0 4px 20px rgba(0,0,0,0.2); padding: 25px; }
+        h1 { color: var(--primary); margin-bottom: 10px; text-align: center; }
+        h2 { color: var(--accent); margin-top: 0; text-align: center; font-weight: normal; margin-bottom: 30px; }
+        table { width: 100%; border-collapse: collapse; margin: 20px 0; }
+        th, td { padding: 12px; text-align: left; border-bottom: 1px solid var(--border-color); }
+        th { background-color: var(--primary); color: white; }
+        tr:hover { background-color: rgba(255, 0, 0, 0.1); }
+        .stats { display: flex; margin-bottom: 30px; gap: 20px; flex-wrap: wrap; }
+        .stat-block { flex: 1; background: var(--card-bg); padding: 20px; border-radius: 12px; text-align: center; border: 1px solid var(--primary); }
+        .stat-value { font-size: 28px; font-weight: bold; color: var(--accent); margin-bottom: 10px; }
+        .stat-label { font-size: 16px; color: var(--text-color); }
+        .search-input { width: 100%; padding: 12px; font-size: 16px; margin-bottom: 20px; border: 2px solid var(--border-color); background: var(--bg-color); color: var(--text-color); border-radius: 8px; }
+        a { color: var(--accent); text-decoration: none; }
+        a:hover { text-decoration: underline; }
+        .channel-info { display: flex; align-items: center; justify-content: center; margin-bottom: 20px; }
+        .channel-link { background-color: var(--primary); color: white; padding: 8px 16px; border-radius: 20px; margin-left: 10px; }
+        .channel-link:hover { background-color: var(--secondary); text-decoration: none; }
+        .date-cell { white-space: nowrap; }
     </style>
     <script>
-        function searchTable() {{
+        function searchTable() {
             let input = document.getElementById("searchInput");
             let filter = input.value.toUpperCase();
             let table = document.getElementById("videoTable");
             let tr = table.getElementsByTagName("tr");
             
-            for (let i = 1; i < tr.length; i++) {{
+            for (let i = 1; i < tr.length; i++) {
                 let found = false;
                 let td = tr[i].getElementsByTagName("td");
-                for (let j = 0; j < td.length; j++) {{
-                    if (td[j]) {{
+                for (let j = 0; j < td.length; j++) {
+                    if (td[j]) {
                         let txtValue = td[j].textContent || td[j].innerText;
-                        if (txtValue.toUpperCase().indexOf(filter) > -1) {{
+                        if (txtValue.toUpperCase().indexOf(filter) > -1) {
                             found = true;
                             break;
-                        }}
-                    }}
-                }}
+                        }
+                    }
+                }
                 tr[i].style.display = found ? "" : "none";
-            }}
-        }}
+            }
+        }
     </script>
 </head>
 <body>
     <div class="container">
-        <h1>{channel_name}</h1>
-        <h2>{subscriber_count:,} subscribers</h2>
+        <h1>$channel_name</h1>
+        <h2>$subscribers subscribers</h2>
         
         <div class="channel-info">
-            <a href="{channel_url}" target="_blank" class="channel-link">Visit Channel</a>
+            <a href="$channel_url" target="_blank" class="channel-link">Visit Channel</a>
         </div>
         
         <div class="stats">
             <div class="stat-block">
-                <div class="stat-value">{len(data)}</div>
+                <div class="stat-value">$item_count</div>
                 <div class="stat-label">Videos</div>
             </div>
             <div class="stat-block">
-                <div class="stat-value">{total_views:,}</div>
+                <div class="stat-value">$total_views</div>
                 <div class="stat-label">Total Views</div>
             </div>
             <div class="stat-block">
-                <div class="stat-value">{total_likes:,}</div>
+                <div class="stat-value">$total_likes</div>
                 <div class="stat-label">Total Likes</div>
             </div>
         </div>
         
         <input type="text" id="searchInput" class="search-input" onkeyup="searchTable()" placeholder="Search videos...">
+        $page_nav
         
         <table id="videoTable">
             <thead>
@@ -446,39 +685,106 @@ def save_data(data, folder_path, filename="youtube_data", formats=None):
                 </tr>
             </thead>
             <tbody>
-"""
-            
-            # Add table rows for each video
-            for item in data:
-                title = item.get('title', '')
-                views = f"{item.get('viewCount', 0):,}"
-                likes = f"{item.get('likes', 0):,}"
-                duration = item.get('duration', '')
-                date = format_date(item.get('date', ''))
-                url = item.get('url', '')
-                
-                html_content += f"""                <tr>
-                    <td>{title}</td>
-                    <td>{views}</td>
-                    <td>{likes}</td>
-                    <td>{duration}</td>
-                    <td class="date-cell">{date}</td>
-                    <td><a href="{url}" target="_blank">View</a></td>
+""",
+    sections=[Section(
+        row="""                <tr>
+                    <td>$title</td>
+                    <td>$views</td>
+                    <td>$likes</td>
+                    <td>$duration</td>
+                    <td class="date-cell">$date</td>
+                    <td><a href="$url" target="_blank">View</a></td>
                 </tr>
-"""
-            
-            # Close the HTML
-            html_content += """            </tbody>
+""",
+        after="""            </tbody>
         </table>
-    </div>
+        $page_nav
+"""
+    )],
+    foot="""    </div>
 </body>
 </html>"""
+)
+
+def report_row(item):
+    """Escaped values of one video for the HTML report."""
+    row = html_row(item)
+    return {
+        'title': escape(row['title']),
+        'views': f"{row['views']:,}",
+        'likes': f"{row['likes']:,}",
+        'duration': escape(row['duration']),
+        'date': escape(format_date(row['published'])),
+        'url': escape(row['url'])
+    }
+
+def save_data(data, folder_path, filename="youtube_data", formats=None):
+    """Save data to multiple file formats."""
+    if formats is None:
+        formats = ["json", "csv", "html"]  # Default formats
+    
+    print(f"Saving data to {folder_path} in formats: {formats}")
+    results = {}
+    
+    # Save JSON data, serialized straight from the records
+    if "json" in formats:
+        json_path = os.path.join(folder_path, f"{filename}.json")
+        with JsonArrayWriter(json_path, sidecars=dataset_sidecars(filename) if data else ()) as writer:
+            writer.write_many(data)
+        if writer.count:
+            record_dataset(os.path.dirname(folder_path), filename, json_path, writer.count, writer.preview)
+        print(f"✅ Saved JSON data to {json_path}")
+        results["json"] = json_path
+    
+    # Save as CSV
+    if "csv" in formats:
+        csv_path = os.path.join(folder_path, f"{filename}.csv")
+        if data:
+            # Format dates for CSV
+            formatted_data = []
+            for item in data:
+                row = csv_row(item)
+                row['published_date'] = format_date(row['published_date'])
+                formatted_data.append(row)
+                
+            with open(csv_path, 'w', newline='', encoding='utf-8') as f:
+                writer = csv.DictWriter(f, fieldnames=[column for column, _, _ in CSV_COLUMNS])
+                writer.writeheader()
+                writer.writerows(formatted_data)
+            print(f"✅ Saved CSV data to {csv_path}")
+            results["csv"] = csv_path
+    
+    # Save as HTML
+    if "html" in formats:
+        try:
+            html_path = os.path.join(folder_path, f"{filename}.html")
+            
+            # Calculate total view count and likes
+            get_views = YOUTUBE_SCHEMA.getter('views', 0)
+            get_likes = YOUTUBE_SCHEMA.getter('likes', 0)
+            total_views = sum(get_views(item) for item in data)
+            total_likes = sum(get_likes(item) for item in data)
             
-            # Write HTML to file
-            with open(html_path, 'w', encoding='utf-8') as f:
-                f.write(html_content)
+            # Get channel info from the first item if available
+            channel_name = filename
+            subscriber_count = 0
+            channel_url = ""
+            if data and len(data) > 0:
+                channel_name = YOUTUBE_SCHEMA.getter('channel', filename)(data[0])
+                subscriber_count = YOUTUBE_SCHEMA.getter('followers', 0)(data[0])
+                channel_url = YOUTUBE_SCHEMA.getter('channel_url', "")(data[0])
+            
+            context = {
+                'channel_name': escape(channel_name),
+                'subscribers': f"{subscriber_count:,}",
+                'channel_url': escape(channel_url),
+                'item_count': len(data),
+                'total_views': f"{total_views:,}",
+                'total_likes': f"{total_likes:,}"
+            }
+            pages = render_html_report(html_path, REPORT_TEMPLATE, context, data, report_row)
             
-            print(f"✅ Saved HTML report to {html_path}")
+            print(f"✅ Saved HTML report to {html_path} ({len(pages)} page{'s' if len(pages) != 1 else ''})")
             results["html"] = html_path
             
         except Exception as e:
@@ -486,97 +792,87 @@ def save_data(data, folder_path, filename="youtube_data", formats=None):
     
     return results
 
-def process_youtube_data(data):
-    """Process YouTube data into a structured format."""
-    # Extract channel name from the data
-    channel_name = None
+CHANNEL_HANDLE_URL_PATTERN = re.compile(r'youtube\.com/(@[^/\s]+)')
+CHANNEL_ID_URL_PATTERN = re.compile(r'/(channel|c|user)/([^/]+)')
+
+def _is_text(value, prefix=None):
+    """True for a non-empty string, optionally one starting with prefix."""
+    return isinstance(value, str) and value != '' and (prefix is None or value.startswith(prefix))
+
+def _identity_owner(item):
+    # Channel owner fields in order of reliability; channel IDs (UC...) are skipped
+    for key in ('ownerChannelName', 'author', 'channelTitle'):
+        value = item.get(key)
+        if _is_text(value) and not value.startswith('UC'):
+            return value
+    channel = item.get('channel')
+    if isinstance(channel, dict):
+        for key in ('name', 'title'):
+            value = channel.get(key)
+            if _is_text(value) and not value.startswith('UC'):
+                return value
+    snippet = item.get('snippet')
+    if isinstance(snippet, dict):
+        value = snippet.get('channelTitle')
+        if _is_text(value) and not value.startswith('UC'):
+            return value
+    return None
+
+def resolve_channel_identity(data):
+    """Work out the channel name, owner, handle and file name shared by all items.
+    
+    One pass over the items keeps the first match of every candidate, which
+    gives the same result as checking each candidate across all items in turn.
+    """
+    url_handle = None
+    author_handle = None
     channel_owner = None
-    channel_url = None
-    channel_handle = None
-    standardized_data = []
+    channel_id = None
+    url_channel_id = None
     
-    # First, try to extract channel handle from URL or data
     for item in data:
-        # Look for channel URL that contains a handle like @username
-        if 'channelUrl' in item and item['channelUrl']:
-            url = item['channelUrl']
-            handle_match = re.search(r'youtube\.com/(@[^/\s]+)', url)
+        if not isinstance(item, dict):
+            continue
+        
+        channel_url = item.get('channelUrl')
+        if url_handle is None and _is_text(channel_url):
+            handle_match = CHANNEL_HANDLE_URL_PATTERN.search(channel_url)
             if handle_match:
-                channel_handle = handle_match.group(1)
-                # Remove the @ for folder naming
-                channel_handle = channel_handle[1:] if channel_handle.startswith('@') else channel_handle
-                print(f"Found channel handle from URL: {channel_handle}")
-                break
-    
-    # If no handle found, check author fields
-    if not channel_handle:
-        for item in data:
-            # Check if any fields directly contain the handle format
-            if 'author' in item and item['author'] and item['author'].startswith('@'):
-                channel_handle = item['author'][1:]  # Remove the @
-                print(f"Found channel handle from author field: {channel_handle}")
-                break
-            if 'channelTitle' in item and item['channelTitle'] and item['channelTitle'].startswith('@'):
-                channel_handle = item['channelTitle'][1:]  # Remove the @
-                print(f"Found channel handle from channelTitle field: {channel_handle}")
-                break
-    
-    # Try to extract channel owner name from the most reliable fields
-    for item in data:
-        # Look for channel owner in various fields
-        # Try channel owner fields first (preferred over channel/uploader fields)
-        if 'ownerChannelName' in item and item['ownerChannelName'] and not item['ownerChannelName'].startswith('UC'):
-            channel_owner = item['ownerChannelName']
-            break
-        # Then try author fields which often contain the visible channel name
-        if 'author' in item and item['author'] and not item['author'].startswith('UC'):
-            channel_owner = item['author']
-            break
-        # Try the title fields
-        if 'channelTitle' in item and item['channelTitle'] and not item['channelTitle'].startswith('UC'):
-            channel_owner = item['channelTitle']
-            break
-        # Check for nested channel objects
-        if 'channel' in item and isinstance(item['channel'], dict):
-            if 'name' in item['channel'] and item['channel']['name'] and not item['channel']['name'].startswith('UC'):
-                channel_owner = item['channel']['name']
-                break
-            if 'title' in item['channel'] and item['channel']['title'] and not item['channel']['title'].startswith('UC'):
-                channel_owner = item['channel']['title']
-                break
+                url_handle = handle_match.group(1)[1:]
         
-        # Check for snippet which might contain channel information
-        if 'snippet' in item and isinstance(item['snippet'], dict):
-            if 'channelTitle' in item['snippet'] and item['snippet']['channelTitle'] and not item['snippet']['channelTitle'].startswith('UC'):
-                channel_owner = item['snippet']['channelTitle']
-                break
-    
-    # Now try to extract the channel identifier (which might be needed as fallback)
-    for item in data:
-        # Try multiple fields that might contain channel name
-        if 'channelTitle' in item and item['channelTitle']:
-            channel_name = item['channelTitle']
-            break
-        if 'channelId' in item and item['channelId']:
-            channel_name = item['channelId']
-            break
-        if 'authorId' in item and item['authorId']:
-            channel_name = item['authorId']
-            break
-        if 'ownerChannelId' in item and item['ownerChannelId']:
-            channel_name = item['ownerChannelId']
+        if author_handle is None:
+            for key in ('author', 'channelTitle'):
+                if _is_text(item.get(key), '@'):
+                    author_handle = (item[key][1:], key)
+                    break
+        
+        if channel_owner is None:
+            channel_owner = _identity_owner(item)
+        
+        if channel_id is None:
+            for key in ('channelTitle', 'channelId', 'authorId', 'ownerChannelId'):
+                if item.get(key):
+                    channel_id = item[key]
+                    break
+        
+        if url_channel_id is None and _is_text(channel_url):
+            match = CHANNEL_ID_URL_PATTERN.search(channel_url)
+            if match:
+                url_channel_id = match.group(2)
+        
+        # Nothing later items hold can change the result any more
+        if url_handle is not None and channel_owner is not None and channel_id is not None:
             break
     
-    # If no channel name was found, try to extract from URL or use default
-    if not channel_name:
-        for item in data:
-            if 'channelUrl' in item and item['channelUrl']:
-                # Try to extract from URL
-                url = item['channelUrl']
-                match = re.search(r'/(channel|c|user)/([^/]+)', url)
-                if match:
-                    channel_name = match.group(2)
-                    break
+    channel_handle = url_handle
+    if channel_handle:
+        print(f"Found channel handle from URL: {channel_handle}")
+    elif author_handle:
+        channel_handle, source = author_handle
+        print(f"Found channel handle from {source} field: {channel_handle}")
+    
+    # If no channel identifier was found, fall back to the one in the channel URL
+    channel_name = channel_id or url_channel_id
     
     # Prioritize using the channel handle as the filename if available
     if channel_handle:
@@ -599,174 +895,30 @@ def process_youtube_data(data):
     # Clean name for file naming
     file_name = re.sub(r'[\\/*?:"<>|]', "_", file_name)
     
-    # For all data items, record both the channel ID and the channel owner name
-    # to ensure consistent identification
-    for item in data:
-        processed_item = {}
-        
-        # Add channel name to every item
-        processed_item['channel_name'] = channel_name
-        if channel_owner:
-            processed_item['channel_owner'] = channel_owner
-        if channel_handle:
-            processed_item['channel_handle'] = channel_handle
-        
-        # Common fields
-        processed_item['platform'] = 'youtube'
-        processed_item['scrape_date'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        
-        # Map YouTube data to standardized format
-        # ID and URL
-        if 'id' in item:
-            processed_item['id'] = item['id']
-        
-        if 'url' in item:
-            processed_item['url'] = item['url']
-        
-        # Content type detection
-        if 'type' in item:
-            processed_item['content_type'] = item['type']
-        else:
-            # Try to determine content type from URL or other fields
-            is_channel = False
-            is_video = False
-            
-            if 'url' in item:
-                url = item['url']
-                if '/channel/' in url or '/c/' in url or '/user/' in url or '/@' in url:
-                    is_channel = True
-                elif 'watch?v=' in url or 'youtu.be/' in url:
-                    is_video = True
-            
-            if is_channel:
-                processed_item['content_type'] = 'channel'
-            elif is_video:
-                processed_item['content_type'] = 'video'
-            else:
-                processed_item['content_type'] = 'unknown'
-        
-        # Title and description
-        if 'title' in item:
-            processed_item['title'] = item['title']
-        
-        if 'description' in item:
-            processed_item['description'] = item['description']
-        
-        # Channel/creator info
-        if 'channelTitle' in item:
-            processed_item['creator_name'] = item['channelTitle']
-        elif 'author' in item:
-            processed_item['creator_name'] = item['author']
-        elif 'ownerChannelName' in item:
-            processed_item['creator_name'] = item['ownerChannelName']
-        
-        if 'channelId' in item:
-            processed_item['creator_id'] = item['channelId']
-        elif 'authorId' in item:
-            processed_item['creator_id'] = item['authorId']
-        elif 'ownerChannelId' in item:
-            processed_item['creator_id'] = item['ownerChannelId']
-        
-        if 'channelUrl' in item:
-            processed_item['creator_url'] = item['channelUrl']
-            channel_url = item['channelUrl']
-        elif 'authorUrl' in item:
-            processed_item['creator_url'] = item['authorUrl']
-            channel_url = item['authorUrl']
-        
-        # Publication date
-        if 'publishedAt' in item:
-            processed_item['published_date'] = item['publishedAt']
-        elif 'date' in item:
-            processed_item['published_date'] = item['date']
-        
-        # Engagement metrics - extract and normalize values
-        if 'viewCount' in item:
-            try:
-                processed_item['views'] = int(item['viewCount'])
-            except (ValueError, TypeError):
-                if isinstance(item['viewCount'], str):
-                    # Try to parse string with commas or other formatting
-                    try:
-                        processed_item['views'] = int(item['viewCount'].replace(',', ''))
-                    except ValueError:
-                        processed_item['views'] = 0
-                else:
-                    processed_item['views'] = 0
-        
-        # Look for likes data in various locations and formats
-        likes_value = None
-        
-        # Check direct like fields first
-        if 'likeCount' in item and item['likeCount'] is not None:
-            likes_value = item['likeCount']
-        elif 'likes' in item and item['likes'] is not None:
-            likes_value = item['likes']
-        # Check statistics object
-        elif 'statistics' in item and isinstance(item['statistics'], dict):
-            if 'likeCount' in item['statistics'] and item['statistics']['likeCount'] is not None:
-                likes_value = item['statistics']['likeCount']
-        # Check snippet object
-        elif 'snippet' in item and isinstance(item['snippet'], dict):
-            if 'likeCount' in item['snippet'] and item['snippet']['likeCount'] is not None:
-                likes_value = item['snippet']['likeCount']
-        # Check engagement object
-        elif 'engagement' in item and isinstance(item['engagement'], dict):
-            if 'likes' in item['engagement'] and item['engagement']['likes'] is not None:
-                likes_value = item['engagement']['likes']
-        
-        # Convert likes value to integer
-        if likes_value is not None:
-            try:
-                if isinstance(likes_value, str):
-                    # Clean string of any formatting
-                    likes_value = likes_value.replace(',', '')
-                processed_item['likes'] = int(float(likes_value))
-            except (ValueError, TypeError):
-                processed_item['likes'] = 0
-        
-        # Comment count
-        if 'commentCount' in item:
-            try:
-                processed_item['comments_count'] = int(item['commentCount'])
-            except (ValueError, TypeError):
-                if isinstance(item['commentCount'], str):
-                    try:
-                        processed_item['comments_count'] = int(item['commentCount'].replace(',', ''))
-                    except ValueError:
-                        processed_item['comments_count'] = 0
-                else:
-                    processed_item['comments_count'] = 0
-        
-        if 'subscriberCount' in item:
-            try:
-                processed_item['followers'] = int(item['subscriberCount'])
-            except (ValueError, TypeError):
-                if isinstance(item['subscriberCount'], str):
-                    try:
-                        processed_item['followers'] = int(item['subscriberCount'].replace(',', ''))
-                    except ValueError:
-                        processed_item['followers'] = 0
-                else:
-                    processed_item['followers'] = 0
-        
-        # Duration (for videos)
-        if 'duration' in item:
-            processed_item['duration'] = item['duration']
-        
-        # Thumbnail
-        if 'thumbnails' in item and item['thumbnails']:
-            # Find highest quality thumbnail
-            found = False
-            for quality in ['maxres', 'high', 'medium', 'default']:
-                if quality in item['thumbnails'] and item['thumbnails'][quality] and 'url' in item['thumbnails'][quality]:
-                    processed_item['thumbnail_url'] = item['thumbnails'][quality]['url']
-                    found = True
-                    break
-        
-        standardized_data.append(processed_item)
-    
-    return standardized_data, file_name
+    return {
+        'channel_name': channel_name,
+        'channel_owner': channel_owner,
+        'channel_handle': channel_handle,
+        'file_name': file_name
+    }
+
+def standardize_youtube_items(data, identity, keep_raw=YOUTUBE_KEEP_RAW):
+    """Map raw YouTube items to VideoRecords using a resolved channel identity."""
+    # Fields shared by every item of the batch, in output order
+    base = {'channel_name': identity['channel_name']}
+    if identity['channel_owner']:
+        base['channel_owner'] = identity['channel_owner']
+    if identity['channel_handle']:
+        base['channel_handle'] = identity['channel_handle']
+    base['platform'] = 'youtube'
+    base['scrape_date'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    
+    return [VideoRecord.from_payload(item, base, keep_raw) for item in data]
+
+def process_youtube_data(data, keep_raw=YOUTUBE_KEEP_RAW):
+    """Process YouTube data into VideoRecords, keeping the raw payloads only when asked for."""
+    identity = resolve_channel_identity(data)
+    return standardize_youtube_items(data, identity, keep_raw), identity['file_name']
 
 def main():
     parser = argparse.ArgumentParser(description="YouTube Scraper using Apify")
@@ -782,13 +934,9 @@ def main():
     formats = [fmt.strip().lower() for fmt in args.format.split(",")]
     
     # Try to extract channel handle from URL if it's a channel URL
-    channel_handle = None
-    if "youtube.com/" in url_or_query and "@" in url_or_query:
-        handle_match = re.search(r'youtube\.com/(@[^/\s?]+)', url_or_query)
-        if handle_match:
-            channel_handle = handle_match.group(1)
-            channel_handle = channel_handle[1:] if channel_handle.startswith('@') else channel_handle
-            print(f"Detected channel handle from URL: {channel_handle}")
+    channel_handle = extract_channel_handle(url_or_query)
+    if channel_handle:
+        print(f"Detected channel handle from URL: {channel_handle}")
     
     # Run the scraper to get raw data first
     raw_data = run_youtube_scraper(api_token, url_or_query)